@@ -0,0 +1,90 @@
+import atexit
+import socket
+import threading
+import time
+from typing import Optional, List
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BusinessAuditLog
+
+
+class BusinessAuditWriter:
+    """
+    Buffered writer for BusinessAuditLog (replaces per-write sp_LogBusinessAuditEvent calls).
+
+    Entries join the buffer only when the caller's transaction commits, and the buffer is
+    written with multi-row INSERTs once it reaches BATCH_SIZE entries or AUDIT_FLUSH_SECONDS
+    have passed (piggybacked on audit traffic), and at process exit. Entries still buffered
+    when a worker is killed are lost; the business rows themselves are unaffected.
+    """
+
+    BATCH_SIZE = 200
+    APPLICATION_NAME = 'WinStore API'
+
+    _buffer: List[BusinessAuditLog] = []
+    _lock = threading.Lock()
+    _last_flush = time.monotonic()
+    _host_name = socket.gethostname()[:128]
+
+    @classmethod
+    def log(cls, table_name: str, operation: str, record_id, user_id: Optional[int] = None,
+            business_context: Optional[str] = None, column_name: Optional[str] = None,
+            old_value: Optional[str] = None, new_value: Optional[str] = None,
+            username: Optional[str] = None, ip_address: Optional[str] = None) -> None:
+        """Queues one audit entry; it is dropped if the surrounding transaction rolls back."""
+        entry = BusinessAuditLog(
+            user_id=user_id, username=username, audit_timestamp=timezone.now(),
+            table_name=table_name, operation=operation, record_id=str(record_id),
+            column_name=column_name, old_value=old_value, new_value=new_value,
+            business_context=business_context, application_name=cls.APPLICATION_NAME,
+            host_name=cls._host_name, ip_address=ip_address,
+        )
+        transaction.on_commit(lambda: cls._enqueue([entry]))
+
+    @classmethod
+    def log_many(cls, entries: List[BusinessAuditLog]) -> None:
+        """Queues prepared entries (bulk paths); application and host names are filled in."""
+        for entry in entries:
+            entry.application_name = entry.application_name or cls.APPLICATION_NAME
+            entry.host_name = entry.host_name or cls._host_name
+            entry.audit_timestamp = entry.audit_timestamp or timezone.now()
+        transaction.on_commit(lambda: cls._enqueue(entries))
+
+    @classmethod
+    def flush(cls) -> int:
+        """
+        Writes every buffered entry.
+
+        Returns:
+            Number of entries written
+        """
+        with cls._lock:
+            batch, cls._buffer = cls._buffer, []
+            cls._last_flush = time.monotonic()
+        if not batch:
+            return 0
+        try:
+            BusinessAuditLog.objects.bulk_create(batch, batch_size=cls.BATCH_SIZE)
+        except Exception:
+            # Keep the entries for the next flush
+            with cls._lock:
+                cls._buffer[:0] = batch
+            raise
+        return len(batch)
+
+    @classmethod
+    def _enqueue(cls, entries: List[BusinessAuditLog]) -> None:
+        with cls._lock:
+            cls._buffer.extend(entries)
+            due = (
+                len(cls._buffer) >= cls.BATCH_SIZE
+                or time.monotonic() - cls._last_flush >= getattr(settings, 'AUDIT_FLUSH_SECONDS', 5)
+            )
+        if due:
+            cls.flush()
+
+
+atexit.register(BusinessAuditWriter.flush)
@@ -0,0 +1,54 @@
+import re
+
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.accounts.models import User
+
+# HASHBYTES('SHA2_256', ...) output written by sp_CreateUser; the password behind it is unknown
+SQL_DIGEST = re.compile(r'^(0x)?[0-9A-Fa-f]{64}$')
+
+
+class Command(BaseCommand):
+    help = ("One-off: replaces plain-text passwords (rows seeded by the data generators) with "
+            "Django hashes, and locks SQL-side digests that can no longer be verified.")
+
+    BATCH_SIZE = 500
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only count the rows that would change")
+
+    def handle(self, *args, **options):
+        hashed = locked = 0
+        batch = []
+        for user in User.objects.only('id', 'password').order_by('id').iterator(chunk_size=self.BATCH_SIZE):
+            try:
+                identify_hasher(user.password or '')
+                continue
+            except ValueError:
+                pass
+            if not user.password or SQL_DIGEST.match(user.password):
+                # Never hash a digest as if it were the password (that would allow pass-the-hash)
+                user.password = make_password(None)
+                locked += 1
+            else:
+                user.password = make_password(user.password)
+                hashed += 1
+            batch.append(user)
+            if len(batch) >= self.BATCH_SIZE:
+                self._save(batch, options['dry_run'])
+                batch = []
+        self._save(batch, options['dry_run'])
+
+        prefix = "Would update" if options['dry_run'] else "Updated"
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}: {hashed} plain-text passwords hashed, {locked} unverifiable values locked "
+            f"(those users must reset their password)."
+        ))
+
+    @staticmethod
+    def _save(batch, dry_run: bool):
+        if batch and not dry_run:
+            with transaction.atomic():
+                User.objects.bulk_update(batch, ['password'])
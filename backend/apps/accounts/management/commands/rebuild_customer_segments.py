@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.accounts.segments import CustomerSegmentService
+
+
+class Command(BaseCommand):
+    help = "Recomputes RFM segments and loyalty tiers for every user (run nightly)."
+
+    def handle(self, *args, **options):
+        written = CustomerSegmentService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Segmented {written} users."))
@@ -0,0 +1,72 @@
+from django.db import models
+
+
+class User(models.Model):
+    """
+    Storefront account (dbo.Users). The schema is owned by the SQL scripts,
+    so the model is unmanaged and only mirrors the existing table.
+    """
+    ROLE_CHOICES = [
+        ('Admin', 'Admin'),
+        ('Customer', 'Customer'),
+        ('Vendor', 'Vendor'),
+    ]
+
+    id = models.AutoField(primary_key=True, db_column='user_ID')
+    name = models.CharField(max_length=50, db_column='user_NAME')
+    password = models.CharField(max_length=255, db_column='user_PASS')
+    email = models.CharField(max_length=100, unique=True, null=True, db_column='user_EMAIL')
+    phone = models.CharField(max_length=20, db_column='user_PHONE')
+    role = models.CharField(max_length=50, choices=ROLE_CHOICES, db_column='user_ROLE')
+    created_at = models.DateTimeField(null=True, db_column='created_AT')
+    last_login = models.DateTimeField(null=True, db_column='last_login')
+
+    class Meta:
+        managed = False
+        db_table = 'Users'
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class BusinessAuditLog(models.Model):
+    """Application-level audit trail (02_audit/audit_setup.sql), written by BusinessAuditWriter."""
+    id = models.BigAutoField(primary_key=True, db_column='audit_ID')
+    user_id = models.IntegerField(null=True, db_column='user_ID')
+    username = models.CharField(max_length=100, null=True, db_column='username')
+    audit_timestamp = models.DateTimeField(db_column='audit_timestamp')
+    table_name = models.CharField(max_length=128, db_column='table_name')
+    operation = models.CharField(max_length=10, db_column='operation')
+    record_id = models.CharField(max_length=50, db_column='record_ID')
+    column_name = models.CharField(max_length=128, null=True, db_column='column_name')
+    old_value = models.TextField(null=True, db_column='old_value')
+    new_value = models.TextField(null=True, db_column='new_value')
+    business_context = models.CharField(max_length=4000, null=True, db_column='business_context')
+    application_name = models.CharField(max_length=128, null=True, db_column='application_name')
+    host_name = models.CharField(max_length=128, null=True, db_column='host_name')
+    ip_address = models.CharField(max_length=50, null=True, db_column='ip_address')
+
+    class Meta:
+        managed = False
+        db_table = 'BusinessAuditLog'
+
+
+class CustomerSegment(models.Model):
+    """Nightly RFM segment and loyalty tier per user (05_read_models.sql), written by CustomerSegmentService."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True,
+                                db_column='user_ID', related_name='segment')
+    last_order_date = models.DateTimeField(null=True, db_column='last_order_DATE')
+    recency_days = models.IntegerField(null=True, db_column='recency_DAYS')
+    order_count = models.IntegerField(default=0, db_column='order_COUNT')
+    total_spent = models.DecimalField(max_digits=14, decimal_places=2, default=0, db_column='total_SPENT')
+    r_score = models.SmallIntegerField(default=0, db_column='r_SCORE')
+    f_score = models.SmallIntegerField(default=0, db_column='f_SCORE')
+    m_score = models.SmallIntegerField(default=0, db_column='m_SCORE')
+    segment = models.CharField(max_length=30, db_column='rfm_SEGMENT')
+    loyalty_tier = models.CharField(max_length=20, db_column='loyalty_TIER')
+    is_dormant = models.BooleanField(default=False, db_column='is_DORMANT')
+    computed_at = models.DateTimeField(db_column='computed_AT')
+
+    class Meta:
+        managed = False
+        db_table = 'CustomerSegments'
@@ -0,0 +1,185 @@
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+from decimal import Decimal
+from typing import Optional, List, Dict
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+
+from .models import User, CustomerSegment
+from apps.orders.models import OrderStatusType
+
+
+@dataclass
+class SegmentColumns:
+    """Per-user aggregates as parallel arrays, one element per user in user_ID order."""
+    user_ids: np.ndarray       # int64
+    last_order: np.ndarray     # float64 epoch seconds, NaN without orders
+    frequency: np.ndarray      # int64 order count
+    monetary: np.ndarray       # float64 total spent
+
+
+class CustomerSegmentService:
+    """
+    Nightly RFM and loyalty segmentation for every user (replaces per-call
+    pkg_rgr_analytics.sp_DormantCustomersReport / f_CalculateLoyaltyTier).
+
+    One grouped query over Users LEFT JOIN Orders is streamed into column arrays; recency,
+    frequency and monetary scores (1-5 quintiles among buyers), segments and tiers are then
+    computed with whole-array NumPy operations, and CustomerSegments is rewritten with
+    multi-row INSERTs. Quintile breakpoints come from np.quantile (partition based), so the
+    run time grows linearly with the number of users.
+    """
+
+    BATCH_SIZE = 2000
+    # Orders that count as purchases; carts and cancellations do not
+    EXCLUDED_STATUS_KEYS = ('Cart', 'Cancelled')
+    # f_CalculateLoyaltyTier thresholds (total spent strictly above the bound)
+    LOYALTY_TIERS = ((5000, 'Platinum'), (2000, 'Gold'), (500, 'Silver'))
+    DEFAULT_TIER = 'Bronze'
+    # Evaluated in order; the first matching rule wins
+    SEGMENT_RULES = (
+        ('Champions', lambda r, f, m: (r >= 4) & (f >= 4) & (m >= 4)),
+        ('Loyal', lambda r, f, m: (r >= 3) & (f >= 4)),
+        ('Recent', lambda r, f, m: (r >= 4) & (f <= 2)),
+        ('CantLoseThem', lambda r, f, m: (r <= 2) & (f >= 4) & (m >= 4)),
+        ('AtRisk', lambda r, f, m: (r <= 2) & (f >= 3)),
+        ('Hibernating', lambda r, f, m: r <= 2),
+    )
+    DEFAULT_SEGMENT = 'Promising'
+    NO_PURCHASE_SEGMENT = 'NoPurchases'
+
+    @classmethod
+    def load_columns(cls) -> SegmentColumns:
+        """Streams the per-user aggregates (one grouped query) into arrays."""
+        purchase_ids = list(
+            OrderStatusType.objects.exclude(key__in=cls.EXCLUDED_STATUS_KEYS).values_list('id', flat=True)
+        )
+        purchases = Q(orders__order_status_id__in=purchase_ids)
+        rows = (
+            User.objects.order_by('id')
+            .values('id')
+            .annotate(
+                last_order=Max('orders__order_date', filter=purchases),
+                frequency=Count('orders__id', filter=purchases),
+                monetary=Sum('orders__order_amount', filter=purchases),
+            )
+            .values_list('id', 'last_order', 'frequency', 'monetary')
+            .iterator(chunk_size=cls.BATCH_SIZE)
+        )
+
+        # Grow-by-doubling buffers keep memory at a few dozen bytes per user
+        capacity, n = 1024, 0
+        user_ids = np.empty(capacity, dtype=np.int64)
+        last_order = np.empty(capacity, dtype=np.float64)
+        frequency = np.empty(capacity, dtype=np.int64)
+        monetary = np.empty(capacity, dtype=np.float64)
+        for user_id, last, freq, money in rows:
+            if n == capacity:
+                capacity *= 2
+                user_ids, last_order, frequency, monetary = (
+                    np.resize(a, capacity) for a in (user_ids, last_order, frequency, monetary)
+                )
+            user_ids[n] = user_id
+            last_order[n] = last.timestamp() if last is not None else np.nan
+            frequency[n] = freq
+            monetary[n] = money or 0
+            n += 1
+        return SegmentColumns(user_ids[:n], last_order[:n], frequency[:n], monetary[:n])
+
+    @classmethod
+    def score(cls, cols: SegmentColumns, now: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+        """
+        Vectorized RFM scoring.
+
+        Returns:
+            Dict of arrays aligned with cols: recency_days, r, f, m, segment, tier, dormant
+        """
+        now = now or timezone.now()
+        buyers = cols.frequency > 0
+        recency = np.where(buyers, (now.timestamp() - cols.last_order) / 86400.0, np.nan)
+        recency = np.floor(np.maximum(recency, 0))
+
+        r = np.zeros(len(cols.user_ids), dtype=np.int8)
+        f = np.zeros_like(r)
+        m = np.zeros_like(r)
+        if buyers.any():
+            # Most recent quintile scores 5, so recency is scored on its negation
+            r[buyers] = cls._quintiles(-recency[buyers])
+            f[buyers] = cls._quintiles(cols.frequency[buyers].astype(np.float64))
+            m[buyers] = cls._quintiles(cols.monetary[buyers])
+
+        names = [name for name, _ in cls.SEGMENT_RULES]
+        segment = np.select(
+            [~buyers] + [rule(r, f, m) for _, rule in cls.SEGMENT_RULES],
+            [cls.NO_PURCHASE_SEGMENT] + names,
+            default=cls.DEFAULT_SEGMENT,
+        )
+        tier = np.select(
+            [cols.monetary > bound for bound, _ in cls.LOYALTY_TIERS],
+            [name for _, name in cls.LOYALTY_TIERS],
+            default=cls.DEFAULT_TIER,
+        )
+        dormant_days = getattr(settings, 'SEGMENT_DORMANT_DAYS', 180)
+        dormant = buyers & (np.nan_to_num(recency, nan=0) > dormant_days)
+        return {'recency_days': recency, 'r': r, 'f': f, 'm': m,
+                'segment': segment, 'tier': tier, 'dormant': dormant}
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """
+        Recomputes CustomerSegments for every user.
+
+        Returns:
+            Number of users written
+        """
+        now = timezone.now()
+        cols = cls.load_columns()
+        scores = cls.score(cols, now)
+        buyers = cols.frequency > 0
+
+        written = 0
+        with transaction.atomic():
+            CustomerSegment.objects.all().delete()
+            for start in range(0, len(cols.user_ids), cls.BATCH_SIZE):
+                end = start + cls.BATCH_SIZE
+                batch: List[CustomerSegment] = []
+                for i in range(start, min(end, len(cols.user_ids))):
+                    bought = bool(buyers[i])
+                    batch.append(CustomerSegment(
+                        user_id=int(cols.user_ids[i]),
+                        last_order_date=(datetime.fromtimestamp(cols.last_order[i], dt_timezone.utc)
+                                         if bought else None),
+                        recency_days=int(scores['recency_days'][i]) if bought else None,
+                        order_count=int(cols.frequency[i]),
+                        total_spent=Decimal(f"{cols.monetary[i]:.2f}"),
+                        r_score=int(scores['r'][i]),
+                        f_score=int(scores['f'][i]),
+                        m_score=int(scores['m'][i]),
+                        segment=str(scores['segment'][i]),
+                        loyalty_tier=str(scores['tier'][i]),
+                        is_dormant=bool(scores['dormant'][i]),
+                        computed_at=now,
+                    ))
+                CustomerSegment.objects.bulk_create(batch)
+                written += len(batch)
+        return written
+
+    @staticmethod
+    def dormant_customers(min_days: Optional[int] = None) -> List[Dict]:
+        """sp_DormantCustomersReport equivalent, read from the nightly segments."""
+        qs = CustomerSegment.objects.filter(order_count__gt=0)
+        qs = qs.filter(recency_days__gt=min_days) if min_days is not None else qs.filter(is_dormant=True)
+        return list(
+            qs.order_by('-recency_days')
+            .values('user_id', 'user__name', 'user__email', 'last_order_date', 'loyalty_tier', 'segment')
+        )
+
+    @staticmethod
+    def _quintiles(values: np.ndarray) -> np.ndarray:
+        """1-5 score per value by quintile (higher is better)."""
+        breaks = np.quantile(values, [0.2, 0.4, 0.6, 0.8])
+        return (np.searchsorted(breaks, values, side='left') + 1).astype(np.int8)
@@ -0,0 +1,254 @@
+import asyncio
+import atexit
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional, Dict, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+from django.core.exceptions import ValidationError
+from django.db import transaction, IntegrityError
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+from .audit import BusinessAuditWriter
+from .models import User, BusinessAuditLog
+
+
+class AccountService:
+    """
+    Registration and login (replaces sp_CreateUser / sp_UpdateUserLastLogin).
+
+    Password hashing runs on a small per-process thread pool (PASSWORD_HASH_WORKERS), so a
+    burst of logins queues for the hasher instead of saturating every request thread, and
+    async views can await it without blocking the event loop. A successful verification is
+    remembered for AUTH_VERIFY_CACHE_SECONDS as a keyed digest of (user, stored hash,
+    password), so session refreshes skip the key derivation; changing the password changes
+    the stored hash and with it every cache key.
+
+    last_login is not written per login: logins are coalesced in memory (latest time per
+    user) and written with one batched UPDATE per chunk at most once per
+    LAST_LOGIN_FLUSH_SECONDS, piggybacked on login traffic, and at process exit.
+    """
+
+    # Keeps the IN (...) lists well below the MSSQL (2100) and Oracle (1000) bind limits
+    FLUSH_CHUNK_SIZE = 500
+    VERIFY_CACHE_SIZE = 10000
+    MIN_PASSWORD_LENGTH = 8
+
+    _pool: Optional[ThreadPoolExecutor] = None
+    _pool_lock = threading.Lock()
+    _verified: 'OrderedDict[bytes, float]' = OrderedDict()
+    _verified_lock = threading.Lock()
+    _pending_logins: Dict[int, datetime] = {}
+    _login_lock = threading.Lock()
+    _last_flush = time.monotonic()
+
+    @classmethod
+    def pool(cls) -> ThreadPoolExecutor:
+        with cls._pool_lock:
+            if cls._pool is None:
+                workers = getattr(settings, 'PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 2
+                cls._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+            return cls._pool
+
+    @classmethod
+    def create_user(cls, name: str, password: str, email: str, phone: str,
+                    role: str = 'Customer') -> User:
+        """
+        Registers a user with a salted password hash (Django's PASSWORD_HASHERS).
+
+        Raises:
+            ValidationError: If a field is invalid or the email is already registered
+        """
+        # Step 1: Same checks as sp_CreateUser
+        if not name or not name.strip():
+            raise ValidationError("User name cannot be empty")
+        if not password or len(password) < cls.MIN_PASSWORD_LENGTH:
+            raise ValidationError(f"Password must be at least {cls.MIN_PASSWORD_LENGTH} characters long")
+        if not email or '@' not in email or '.' not in email.split('@')[-1]:
+            raise ValidationError("Invalid email format")
+        if not phone or not phone.strip():
+            raise ValidationError("Phone number cannot be null or empty")
+        if role not in dict(User.ROLE_CHOICES):
+            raise ValidationError(f"Invalid role: {role}")
+        if User.objects.filter(email=email).exists():
+            raise ValidationError("User with this email already exists")
+
+        # Step 2: Hash off the request thread, then insert
+        encoded = cls.pool().submit(make_password, password).result()
+        try:
+            with transaction.atomic():
+                user = User.objects.create(
+                    name=name.strip(), password=encoded, email=email, phone=phone.strip(),
+                    role=role, created_at=timezone.now(),
+                )
+                BusinessAuditWriter.log('Users', 'INSERT', user.id, username='SYSTEM',
+                                        business_context='User registration')
+        except IntegrityError:
+            raise ValidationError("User with this email already exists")
+        return user
+
+    @classmethod
+    def authenticate(cls, email: str, password: str) -> Optional[User]:
+        """
+        Verifies the credentials and records the login.
+
+        Returns:
+            The user, or None if the email is unknown or the password does not match
+        """
+        user = User.objects.filter(email=email).only('id', 'name', 'email', 'role', 'password').first()
+        if user is None:
+            # Hash anyway so unknown emails cost the same as wrong passwords
+            cls.pool().submit(make_password, password).result()
+            return None
+        if not cls._verify_cached(user, password):
+            return None
+        cls.record_login(user.id)
+        return user
+
+    @classmethod
+    async def authenticate_async(cls, email: str, password: str) -> Optional[User]:
+        """authenticate() for async views: awaits the hash pool instead of blocking the loop."""
+        user = await sync_to_async(
+            lambda: User.objects.filter(email=email).only('id', 'name', 'email', 'role', 'password').first()
+        )()
+        if user is None:
+            await asyncio.wrap_future(cls.pool().submit(make_password, password))
+            return None
+        if not cls._cache_hit(cls._cache_key(user, password)):
+            ok, upgraded = await asyncio.wrap_future(cls.pool().submit(cls._verify, user.password, password))
+            if not ok:
+                return None
+            if upgraded is not None:
+                await sync_to_async(cls._store_upgrade)(user, upgraded)
+            cls._cache_put(cls._cache_key(user, password))
+        cls.record_login(user.id)
+        return user
+
+    @classmethod
+    def record_login(cls, user_id: int, at: Optional[datetime] = None) -> None:
+        """Queues a last_login update; repeated logins of one user collapse to the latest."""
+        at = at or timezone.now()
+        with cls._login_lock:
+            previous = cls._pending_logins.get(user_id)
+            if previous is None or at > previous:
+                cls._pending_logins[user_id] = at
+            due = time.monotonic() - cls._last_flush >= getattr(settings, 'LAST_LOGIN_FLUSH_SECONDS', 30)
+        if due:
+            cls.flush_logins()
+
+    @classmethod
+    def flush_logins(cls) -> int:
+        """
+        Writes every queued last_login in batched UPDATEs, with one audit entry per user
+        as sp_UpdateUserLastLogin logged.
+
+        Returns:
+            Number of users updated
+        """
+        with cls._login_lock:
+            pending, cls._pending_logins = cls._pending_logins, {}
+            cls._last_flush = time.monotonic()
+        if not pending:
+            return 0
+
+        user_ids = sorted(pending)
+        written = 0
+        for i in range(0, len(user_ids), cls.FLUSH_CHUNK_SIZE):
+            chunk = user_ids[i:i + cls.FLUSH_CHUNK_SIZE]
+            try:
+                written += User.objects.filter(id__in=chunk).update(last_login=Case(
+                    *[When(id=uid, then=Value(pending[uid])) for uid in chunk],
+                    output_field=DateTimeField(),
+                ))
+            except Exception:
+                # Requeue the unwritten logins unless a newer one arrived meanwhile
+                with cls._login_lock:
+                    for uid in user_ids[i:]:
+                        if uid not in cls._pending_logins:
+                            cls._pending_logins[uid] = pending[uid]
+                raise
+            BusinessAuditWriter.log_many([
+                BusinessAuditLog(
+                    user_id=uid, table_name='Users', operation='UPDATE', record_id=str(uid),
+                    column_name='last_login', new_value=pending[uid].strftime('%Y-%m-%d %H:%M:%S'),
+                    business_context='User login',
+                )
+                for uid in chunk
+            ])
+        return written
+
+    @classmethod
+    def _verify_cached(cls, user: User, password: str) -> bool:
+        digest = cls._cache_key(user, password)
+        if cls._cache_hit(digest):
+            return True
+        ok, upgraded = cls.pool().submit(cls._verify, user.password, password).result()
+        if not ok:
+            return False
+        if upgraded is not None:
+            cls._store_upgrade(user, upgraded)
+        cls._cache_put(cls._cache_key(user, password))
+        return True
+
+    @staticmethod
+    def _verify(encoded: Optional[str], password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Checks a password against the stored hash on a pool thread (no database access).
+        A stored value that is not a Django hash never matches (seeded plain text must be
+        converted with `manage.py hash_seeded_passwords`); hashes made with outdated hasher
+        parameters get a fresh hash on the first successful login.
+
+        Returns:
+            (matches, new encoded hash to store or None)
+        """
+        try:
+            identify_hasher(encoded or '')
+        except ValueError:
+            return False, None
+
+        upgraded = []
+        ok = check_password(password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+        return ok, (upgraded[0] if ok and upgraded else None)
+
+    @staticmethod
+    def _store_upgrade(user: User, upgraded: str) -> None:
+        # Guarded on the old value so a concurrent password change wins
+        User.objects.filter(id=user.id, password=user.password).update(password=upgraded)
+        user.password = upgraded
+
+    @staticmethod
+    def _cache_key(user: User, password: str) -> bytes:
+        message = f"{user.id}\0{user.password}\0{password}".encode()
+        return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).digest()
+
+    @classmethod
+    def _cache_hit(cls, digest: bytes) -> bool:
+        ttl = getattr(settings, 'AUTH_VERIFY_CACHE_SECONDS', 300)
+        with cls._verified_lock:
+            verified_at = cls._verified.get(digest)
+            if verified_at is None:
+                return False
+            if time.monotonic() - verified_at > ttl:
+                del cls._verified[digest]
+                return False
+            return True
+
+    @classmethod
+    def _cache_put(cls, digest: bytes) -> None:
+        with cls._verified_lock:
+            cls._verified[digest] = time.monotonic()
+            cls._verified.move_to_end(digest)
+            while len(cls._verified) > cls.VERIFY_CACHE_SIZE:
+                cls._verified.popitem(last=False)
+
+
+atexit.register(AccountService.flush_logins)
@@ -0,0 +1,370 @@
+import atexit
+import logging
+import threading
+import time
+from decimal import Decimal
+from typing import Optional, List, Dict, Any
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Order, OrderItem, OrderStatusType
+from .services import OrderService, OrderSummaryService
+from apps.products.models import Product
+from apps.products.stock import StockReservationService
+from apps.payments.currency import CurrencyService
+
+
+logger = logging.getLogger(__name__)
+
+# Cart contents are plain {product_id: quantity} dicts keyed by user ID.
+CartItems = Dict[int, int]
+
+
+class CartStore:
+    """
+    Keyed store for live cart state. Implementations must be safe to call from
+    concurrent request threads; persistence to Orders/OrderItems is not their concern.
+    """
+
+    @property
+    def shared(self) -> bool:
+        """True if every worker process sees the same carts."""
+        return True
+
+    def get(self, user_id: int) -> Optional[CartItems]:
+        raise NotImplementedError
+
+    def put(self, user_id: int, items: CartItems) -> None:
+        raise NotImplementedError
+
+    def delete(self, user_id: int) -> None:
+        raise NotImplementedError
+
+
+class InMemoryCartStore(CartStore):
+    """Process-local store. Suitable for a single worker and for tests; refused unless DEBUG."""
+
+    shared = False
+
+    def __init__(self):
+        self._carts: Dict[int, CartItems] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int) -> Optional[CartItems]:
+        with self._lock:
+            items = self._carts.get(user_id)
+            return dict(items) if items is not None else None
+
+    def put(self, user_id: int, items: CartItems) -> None:
+        with self._lock:
+            self._carts[user_id] = dict(items)
+
+    def delete(self, user_id: int) -> None:
+        with self._lock:
+            self._carts.pop(user_id, None)
+
+
+class CacheCartStore(CartStore):
+    """Store backed by the Django cache framework (e.g. Redis), shared by all workers."""
+
+    KEY_PREFIX = 'cart:'
+    TIMEOUT = 60 * 60 * 24 * 30
+
+    @property
+    def shared(self) -> bool:
+        # The default local-memory cache is per process, like InMemoryCartStore
+        return not isinstance(caches['default'], LocMemCache)
+
+    def get(self, user_id: int) -> Optional[CartItems]:
+        return cache.get(f"{self.KEY_PREFIX}{user_id}")
+
+    def put(self, user_id: int, items: CartItems) -> None:
+        cache.set(f"{self.KEY_PREFIX}{user_id}", dict(items), self.TIMEOUT)
+
+    def delete(self, user_id: int) -> None:
+        cache.delete(f"{self.KEY_PREFIX}{user_id}")
+
+
+class CartService:
+    """
+    Cart operations against the fast keyed store.
+
+    Add/remove calls never touch Orders/OrderItems. Changed carts are written behind to a
+    'Cart'-status order every CART_WRITE_BEHIND_SECONDS by a background thread per worker
+    (and on cart traffic if that falls behind), at process exit, and synchronously at
+    checkout. Outside DEBUG the store must be shared between workers.
+    """
+
+    # Keeps the IN (...) lists well below the MSSQL (2100) and Oracle (1000) bind limits
+    FLUSH_CHUNK_SIZE = 200
+
+    _store: Optional[CartStore] = None
+    _dirty: set = set()
+    _dirty_lock = threading.Lock()
+    _last_flush = time.monotonic()
+    _store_lock = threading.Lock()
+
+    @classmethod
+    def store(cls) -> CartStore:
+        """
+        Returns the configured CART_STORE, starting the write-behind thread on first use.
+
+        Raises:
+            ImproperlyConfigured: If the store is process-local and DEBUG is off
+        """
+        if cls._store is None:
+            with cls._store_lock:
+                if cls._store is None:
+                    store_path = getattr(settings, 'CART_STORE', 'apps.orders.cart.CacheCartStore')
+                    store = import_string(store_path)()
+                    if not store.shared and not settings.DEBUG:
+                        raise ImproperlyConfigured(
+                            f"{store_path} keeps carts per process; configure a shared cache (REDIS_URL) "
+                            "or another shared CART_STORE"
+                        )
+                    threading.Thread(target=cls._flush_forever, name='cart-write-behind', daemon=True).start()
+                    cls._store = store
+        return cls._store
+
+    @classmethod
+    def get_items(cls, user_id: int) -> CartItems:
+        """Returns the cart contents, falling back to the persisted Cart order after a store miss."""
+        items = cls.store().get(user_id)
+        if items is None:
+            items = cls._load_persisted(user_id)
+            cls.store().put(user_id, items)
+        return items
+
+    @classmethod
+    def get_cart(cls, user_id: int, currency: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Cart contents priced at current product prices (one query), optionally converted
+        from the base currency with today's cached rates.
+        """
+        items = cls.get_items(user_id)
+        prices = dict(Product.objects.filter(id__in=items.keys()).values_list('id', 'price'))
+        lines = [
+            {'product_id': pid, 'quantity': qty, 'price': prices[pid], 'line_total': prices[pid] * qty}
+            for pid, qty in items.items() if pid in prices
+        ]
+        currency = (currency or CurrencyService.base_currency()).upper()
+        if currency != CurrencyService.base_currency():
+            base = [CurrencyService.base_currency()] * len(lines)
+            for key in ('price', 'line_total'):
+                converted = CurrencyService.convert_many([line[key] for line in lines], base, currency)
+                for line, value in zip(lines, converted):
+                    line[key] = value
+        return {
+            'user_id': user_id,
+            'currency': currency,
+            'items': lines,
+            'amount': sum((line['line_total'] for line in lines), Decimal('0.00')),
+        }
+
+    @classmethod
+    def add_item(cls, user_id: int, product_id: int, quantity: int = 1) -> CartItems:
+        """
+        Adds quantity of a product to the cart.
+
+        Raises:
+            ValidationError: If the quantity is not positive or the product is unknown/inactive
+        """
+        if quantity <= 0:
+            raise ValidationError("Quantity must be positive")
+        if not Product.objects.filter(id=product_id, is_active=True).exists():
+            raise ValidationError("Product not found")
+
+        items = cls.get_items(user_id)
+        items[product_id] = items.get(product_id, 0) + quantity
+        cls._save(user_id, items)
+        return items
+
+    @classmethod
+    def set_quantity(cls, user_id: int, product_id: int, quantity: int) -> CartItems:
+        """Sets the quantity of a cart line; zero or less removes it."""
+        items = cls.get_items(user_id)
+        if quantity <= 0:
+            items.pop(product_id, None)
+        else:
+            items[product_id] = quantity
+        cls._save(user_id, items)
+        return items
+
+    @classmethod
+    def remove_item(cls, user_id: int, product_id: int) -> CartItems:
+        return cls.set_quantity(user_id, product_id, 0)
+
+    @classmethod
+    def checkout(cls, user_id: int, delivery_address: str) -> Order:
+        """
+        Persists the cart, takes its stock and moves its order from 'Cart' to 'Pending'.
+
+        Raises:
+            ValidationError: If the cart is empty or has no purchasable items, stock is
+                insufficient or the status transition is not allowed
+        """
+        items = cls.get_items(user_id)
+        if not items:
+            raise ValidationError("Cart is empty")
+
+        # Stock is held before the order transaction so a rollback releases it cleanly
+        hold_id = StockReservationService.reserve(items)
+        # Taken out of the store first so no worker's write-behind flush re-persists a
+        # 'Cart' order for it while it is being checked out
+        cls.store().delete(user_id)
+        with cls._dirty_lock:
+            cls._dirty.discard(user_id)
+        try:
+            with transaction.atomic():
+                order_ids = cls._persist({user_id: items})
+                if user_id not in order_ids:
+                    # Every product in the cart was deactivated or deleted
+                    raise ValidationError("Cart has no purchasable items")
+                order_id = order_ids[user_id]
+                Order.objects.filter(id=order_id).update(delivery_address=delivery_address)
+                order = OrderService.change_status(order_id, 'Pending')
+                # Last step of the transaction: an expired hold rolls the order back
+                StockReservationService.pin(hold_id)
+        except Exception:
+            StockReservationService.release(hold_id)
+            # The cart stays as it was; mark it dirty again so the write-behind keeps it
+            cls.store().put(user_id, items)
+            with cls._dirty_lock:
+                cls._dirty.add(user_id)
+            raise
+        StockReservationService.commit(hold_id)
+
+        # A read during checkout may have reloaded the old 'Cart' order into the store
+        cls.store().delete(user_id)
+        return order
+
+    @classmethod
+    def flush(cls) -> int:
+        """
+        Writes every cart changed by this worker to its 'Cart' order in set-based chunks.
+
+        Returns:
+            Number of carts written
+        """
+        with cls._dirty_lock:
+            user_ids = list(cls._dirty)
+            cls._dirty.clear()
+            cls._last_flush = time.monotonic()
+        if not user_ids:
+            return 0
+
+        written = 0
+        for i in range(0, len(user_ids), cls.FLUSH_CHUNK_SIZE):
+            chunk = user_ids[i:i + cls.FLUSH_CHUNK_SIZE]
+            carts = {}
+            for uid in chunk:
+                items = cls.store().get(uid)
+                if items is not None:
+                    carts[uid] = items
+            try:
+                cls._persist(carts)
+            except Exception:
+                # Keep the unwritten carts dirty so the next interval retries them
+                with cls._dirty_lock:
+                    cls._dirty.update(user_ids[i:])
+                raise
+            written += len(carts)
+        return written
+
+    @classmethod
+    def _flush_forever(cls) -> None:
+        interval = getattr(settings, 'CART_WRITE_BEHIND_SECONDS', 60)
+        while True:
+            time.sleep(interval)
+            try:
+                cls.flush()
+            except Exception:
+                logger.exception("Cart write-behind flush failed")
+            finally:
+                # This thread's connections; request threads manage their own
+                connections.close_all()
+
+    @classmethod
+    def _save(cls, user_id: int, items: CartItems) -> None:
+        cls.store().put(user_id, items)
+        with cls._dirty_lock:
+            cls._dirty.add(user_id)
+            due = time.monotonic() - cls._last_flush >= getattr(settings, 'CART_WRITE_BEHIND_SECONDS', 60)
+        if due:
+            cls.flush()
+
+    @staticmethod
+    def _load_persisted(user_id: int) -> CartItems:
+        cart_status_id = OrderStatusType.id_for('Cart')
+        rows = OrderItem.objects.filter(
+            order__user_id=user_id, order__order_status_id=cart_status_id
+        ).values_list('product_id', 'quantity')
+        items: CartItems = {}
+        for pid, qty in rows:
+            items[pid] = items.get(pid, 0) + qty
+        return items
+
+    @staticmethod
+    def _persist(carts: Dict[int, CartItems]) -> Dict[int, int]:
+        """
+        Replaces the items of each user's 'Cart' order with the given contents.
+        Empty carts delete their order. Returns {user_id: order_id} for non-empty carts.
+        """
+        if not carts:
+            return {}
+        cart_status_id = OrderStatusType.id_for('Cart')
+        user_ids = list(carts.keys())
+        product_ids = {pid for items in carts.values() for pid in items}
+        prices = dict(Product.objects.filter(id__in=product_ids).values_list('id', 'price'))
+
+        with transaction.atomic():
+            # Locked so a flush and a checkout of the same cart write its order one at a time
+            existing: Dict[int, int] = {}
+            for uid, oid in (
+                Order.objects.select_for_update()
+                .filter(user_id__in=user_ids, order_status_id=cart_status_id)
+                .order_by('user_id', '-id').values_list('user_id', 'id')
+            ):
+                existing.setdefault(uid, oid)
+
+            empty = [existing[uid] for uid, items in carts.items() if not items and uid in existing]
+            if empty:
+                Order.objects.filter(id__in=empty).delete()
+
+            order_ids: Dict[int, int] = {}
+            amounts: List[Order] = []
+            new_items: List[OrderItem] = []
+            for uid, items in carts.items():
+                lines = {pid: qty for pid, qty in items.items() if pid in prices}
+                if not lines:
+                    continue
+                amount = sum((prices[pid] * qty for pid, qty in lines.items()), Decimal('0.00'))
+                oid = existing.get(uid)
+                if oid is None:
+                    oid = Order.objects.create(
+                        user_id=uid, order_date=timezone.now(),
+                        order_status_id=cart_status_id, order_amount=amount,
+                    ).id
+                else:
+                    amounts.append(Order(id=oid, order_amount=amount))
+                order_ids[uid] = oid
+                new_items.extend(
+                    OrderItem(order_id=oid, product_id=pid, quantity=qty, price=prices[pid])
+                    for pid, qty in lines.items()
+                )
+
+            OrderItem.objects.filter(order_id__in=order_ids.values()).delete()
+            OrderItem.objects.bulk_create(new_items)
+            if amounts:
+                Order.objects.bulk_update(amounts, ['order_amount'])
+            OrderSummaryService.refresh(order_ids.values())
+        return order_ids
+
+
+atexit.register(CartService.flush)
@@ -0,0 +1,207 @@
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import islice
+from typing import Optional, List, Dict, Any, Iterable, Iterator, TextIO
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Order, DeliveryStatusType, DeliveryStatusTransition
+from .services import OrderSummaryService
+
+
+@dataclass
+class DeliveryEvent:
+    """A single carrier tracking event."""
+    tracking_number: str
+    status_key: str
+    event_time: datetime
+    carrier: Optional[str] = None
+    estimated_delivery_date: Optional[datetime] = None
+
+
+@dataclass
+class IngestStats:
+    received: int = 0
+    duplicates: int = 0
+    applied: int = 0
+    rejected: int = 0
+    unknown: int = 0
+    orders_updated: int = 0
+    rejections: List[str] = field(default_factory=list)
+
+    # Only the first few rejection reasons are kept so a bad feed cannot grow the stats unbounded
+    MAX_REJECTIONS = 100
+
+    def reject(self, reason: str) -> None:
+        self.rejected += 1
+        if len(self.rejections) < self.MAX_REJECTIONS:
+            self.rejections.append(reason)
+
+
+class DeliveryIngestService:
+    """
+    Applies carrier tracking events to Orders in set-based batches.
+
+    Events are consumed lazily in chunks of BATCH_SIZE, so memory is bounded by the chunk
+    size rather than the feed size. Within a chunk, events are grouped by tracking number,
+    exact repeats are dropped and the remaining events are replayed in time order against
+    the order's current delivery status using the DeliveryStatusTransitions matrix (ADR-006).
+    Each chunk costs one lookup query, one bulk UPDATE and one read model refresh.
+    """
+
+    BATCH_SIZE = 500
+    # Statuses an order without delivery status may enter (first carrier scan)
+    INITIAL_STATUS_KEYS = ('Preparing', 'Shipped')
+
+    @classmethod
+    def ingest(cls, events: Iterable[DeliveryEvent], stats: Optional[IngestStats] = None) -> IngestStats:
+        """
+        Applies a stream of events.
+
+        Args:
+            events: Events to apply
+            stats: Stats to accumulate into (e.g. already holding rejected malformed rows)
+
+        Returns:
+            IngestStats with counts of received, duplicate, applied, rejected and unknown events
+        """
+        stats = stats if stats is not None else IngestStats()
+        iterator = iter(events)
+        while True:
+            chunk = list(islice(iterator, cls.BATCH_SIZE))
+            if not chunk:
+                return stats
+            stats.received += len(chunk)
+            cls._apply_chunk(chunk, stats)
+
+    @classmethod
+    def ingest_file(cls, stream: TextIO, fmt: str = 'jsonl') -> IngestStats:
+        """
+        Applies events from a JSON Lines or CSV stream (columns as in DeliveryEvent).
+
+        Malformed rows are counted as rejected and skipped; the rest of the feed is still applied.
+        """
+        if fmt == 'jsonl':
+            rows: Iterator[Any] = (line for line in stream if line.strip())
+        elif fmt == 'csv':
+            rows = csv.DictReader(stream)
+        else:
+            raise ValidationError(f"Unsupported event format: {fmt}")
+        stats = IngestStats()
+
+        def events() -> Iterator[DeliveryEvent]:
+            for row_no, row in enumerate(rows, start=1):
+                try:
+                    event = cls._parse(json.loads(row) if fmt == 'jsonl' else row)
+                except ValidationError as e:
+                    reason = e.messages[0]
+                except KeyError as e:
+                    reason = f"missing field {e.args[0]!r}"
+                except (ValueError, TypeError, AttributeError) as e:
+                    # Undecodable JSON, a non-object row or a null field
+                    reason = f"malformed row ({e})"
+                else:
+                    yield event
+                    continue
+                stats.received += 1
+                stats.reject(f"row {row_no}: {reason}")
+
+        return cls.ingest(events(), stats)
+
+    @staticmethod
+    def _parse(row: Dict[str, Any]) -> DeliveryEvent:
+        event_time = parse_datetime(row['event_time'])
+        if event_time is None:
+            raise ValidationError(f"Invalid event_time: {row['event_time']!r}")
+        if timezone.is_naive(event_time):
+            event_time = timezone.make_aware(event_time)
+        estimated = parse_datetime(row['estimated_delivery_date']) if row.get('estimated_delivery_date') else None
+        if estimated is not None and timezone.is_naive(estimated):
+            estimated = timezone.make_aware(estimated)
+        return DeliveryEvent(
+            tracking_number=row['tracking_number'].strip(),
+            status_key=row['status'].strip(),
+            event_time=event_time,
+            carrier=row.get('carrier') or None,
+            estimated_delivery_date=estimated,
+        )
+
+    @classmethod
+    def _apply_chunk(cls, chunk: List[DeliveryEvent], stats: IngestStats) -> None:
+        # Step 1: Group by tracking number, dropping exact repeats
+        by_tracking: Dict[str, Dict[tuple, DeliveryEvent]] = {}
+        for event in chunk:
+            seen = by_tracking.setdefault(event.tracking_number, {})
+            key = (event.status_key, event.event_time)
+            if key in seen:
+                stats.duplicates += 1
+            else:
+                seen[key] = event
+
+        # Step 2: Load the current delivery state of every affected order in one query
+        orders = {
+            o.tracking_number: o
+            for o in Order.objects.filter(tracking_number__in=by_tracking.keys()).only(
+                'id', 'tracking_number', 'delivery_status_id', 'shipped_date',
+                'estimated_delivery_date', 'actual_delivery_date', 'shipping_carrier_name',
+            )
+        }
+
+        status_ids = dict(DeliveryStatusType.objects.values_list('key', 'id'))
+        allowed = DeliveryStatusTransition.allowed_pairs()
+        initial_ids = {status_ids[key] for key in cls.INITIAL_STATUS_KEYS if key in status_ids}
+        shipped_id, delivered_id = status_ids.get('Shipped'), status_ids.get('Delivered')
+
+        # Step 3: Replay each tracking number's events in time order against the transition matrix
+        changed: List[Order] = []
+        for tracking_number, seen in by_tracking.items():
+            order = orders.get(tracking_number)
+            if order is None:
+                stats.unknown += len(seen)
+                continue
+            dirty = False
+            for event in sorted(seen.values(), key=lambda e: e.event_time):
+                to_id = status_ids.get(event.status_key)
+                from_id = order.delivery_status_id
+                if to_id is None:
+                    stats.reject(f"{tracking_number}: unknown status {event.status_key!r}")
+                    continue
+                if to_id == from_id:
+                    stats.duplicates += 1
+                    continue
+                if (from_id is None and to_id not in initial_ids) or (
+                    from_id is not None and (from_id, to_id) not in allowed
+                ):
+                    stats.reject(f"{tracking_number}: transition {from_id} -> {event.status_key} not allowed")
+                    continue
+
+                order.delivery_status_id = to_id
+                if to_id == shipped_id and order.shipped_date is None:
+                    order.shipped_date = event.event_time
+                if to_id == delivered_id:
+                    order.actual_delivery_date = event.event_time
+                if event.carrier:
+                    order.shipping_carrier_name = event.carrier
+                if event.estimated_delivery_date:
+                    order.estimated_delivery_date = event.estimated_delivery_date
+                stats.applied += 1
+                dirty = True
+            if dirty:
+                changed.append(order)
+
+        if not changed:
+            return
+
+        # Step 4: One set-based UPDATE for the chunk, then refresh the read model
+        with transaction.atomic():
+            Order.objects.bulk_update(changed, [
+                'delivery_status', 'shipped_date', 'estimated_delivery_date',
+                'actual_delivery_date', 'shipping_carrier_name',
+            ])
+            OrderSummaryService.refresh([o.id for o in changed])
+        stats.orders_updated += len(changed)
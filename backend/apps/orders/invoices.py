@@ -0,0 +1,205 @@
+import gzip
+import hashlib
+import json
+from collections import defaultdict
+from typing import Optional, List, Dict, Any, Iterable, Iterator
+
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, F, Max, Sum
+
+from .models import Order, OrderItem, OrderStatusType
+
+
+class InvoiceService:
+    """
+    Renders invoices (the three result sets of sp_GenerateOrderInvoice) in the application layer.
+
+    Completed orders are immutable, so their invoices are rendered once into a compact
+    gzip'ed JSON artifact keyed by order ID and content version, and repeat downloads are
+    served from storage without re-running the joins. The version is a digest of the
+    invoice-relevant order columns and payment state only; storing a new version deletes
+    the order's superseded artifacts. Orders in any other status are rendered live and
+    never cached.
+    """
+
+    STORAGE_PREFIX = 'invoices'
+    CACHEABLE_STATUS_KEYS = ('Completed',)
+    BATCH_SIZE = 500
+
+    @classmethod
+    def get_invoice(cls, order_id: int) -> bytes:
+        """
+        Returns the gzip'ed JSON invoice for an order, rendering and caching it if needed.
+
+        Raises:
+            ValidationError: If the order does not exist
+        """
+        versions = cls._versions([order_id])
+        version = versions.get(order_id)
+        if version is not None:
+            path = cls._artifact_path(order_id, version)
+            if default_storage.exists(path):
+                with default_storage.open(path, 'rb') as f:
+                    return f.read()
+
+        invoices = cls._build_invoices([order_id])
+        if order_id not in invoices:
+            raise ValidationError("Order not found")
+
+        payload = cls._encode(invoices[order_id])
+        if version is not None:
+            cls._store(order_id, version, payload)
+        return payload
+
+    @classmethod
+    def render_batch(cls, order_ids: Optional[Iterable[int]] = None) -> int:
+        """
+        Renders artifacts for every cacheable order (or the given subset) that does not have one yet.
+        Intended for month-end runs; each chunk costs three set-based queries regardless of its size.
+
+        Returns:
+            Number of artifacts written
+        """
+        written = 0
+        for chunk in cls._cacheable_chunks(order_ids):
+            versions = cls._versions(chunk)
+            pending = [
+                oid for oid, version in versions.items()
+                if not default_storage.exists(cls._artifact_path(oid, version))
+            ]
+            if not pending:
+                continue
+            for oid, invoice in cls._build_invoices(pending).items():
+                cls._store(oid, versions[oid], cls._encode(invoice))
+                written += 1
+        return written
+
+    @classmethod
+    def _cacheable_chunks(cls, order_ids: Optional[Iterable[int]]) -> Iterator[List[int]]:
+        status_ids = [OrderStatusType.id_for(key) for key in cls.CACHEABLE_STATUS_KEYS]
+        qs = Order.objects.filter(order_status_id__in=status_ids)
+        if order_ids is not None:
+            ids = sorted(set(order_ids))
+            for i in range(0, len(ids), cls.BATCH_SIZE):
+                yield list(qs.filter(id__in=ids[i:i + cls.BATCH_SIZE]).values_list('id', flat=True))
+            return
+
+        # Keyset pagination over the Orders primary key
+        last_id = 0
+        while True:
+            chunk = list(
+                qs.filter(id__gt=last_id).order_by('id')
+                .values_list('id', flat=True)[:cls.BATCH_SIZE]
+            )
+            if not chunk:
+                return
+            yield chunk
+            last_id = chunk[-1]
+
+    @classmethod
+    def _versions(cls, order_ids: List[int]) -> Dict[int, str]:
+        """
+        Content versions of the cacheable orders among order_ids; other orders are omitted.
+        Only columns that appear on the invoice feed the digest, so unrelated writes (such
+        as a read model refresh) never force a re-render.
+        """
+        from apps.payments.models import Payment
+
+        status_ids = [OrderStatusType.id_for(key) for key in cls.CACHEABLE_STATUS_KEYS]
+        orders = list(Order.objects.filter(id__in=order_ids, order_status_id__in=status_ids).values_list(
+            'id', 'order_status_id', 'order_amount', 'promo_savings', 'delivery_address'
+        ))
+        if not orders:
+            return {}
+        payments = {
+            row[0]: row[1:]
+            for row in Payment.objects.filter(order_id__in=[o[0] for o in orders]).values('order_id')
+            .annotate(n=Count('id'), total=Sum('payment_amount'), changed=Max('updated_at'))
+            .values_list('order_id', 'n', 'total', 'changed')
+        }
+        return {
+            oid: hashlib.blake2b(repr((columns, payments.get(oid))).encode('utf-8'), digest_size=8).hexdigest()
+            for oid, *columns in orders
+        }
+
+    @staticmethod
+    def _build_invoices(order_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        from apps.payments.models import Payment
+
+        headers = Order.objects.filter(id__in=order_ids).values(
+            'id', 'order_date', 'order_amount', 'promo_savings', 'delivery_address',
+            'user_id', 'user__name', 'user__email', 'user__phone',
+            order_status_name=F('order_status__name_ru'),
+        )
+        items: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for row in OrderItem.objects.filter(order_id__in=order_ids).order_by('order_id', 'id').values(
+            'id', 'order_id', 'product_id', 'product__name', 'quantity', 'price'
+        ):
+            items[row['order_id']].append({
+                'order_item_id': row['id'],
+                'product_id': row['product_id'],
+                'product_name': row['product__name'],
+                'quantity': row['quantity'],
+                'price': row['price'],
+                'line_total': row['price'] * row['quantity'],
+            })
+        payments: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for row in Payment.objects.filter(order_id__in=order_ids).order_by('order_id', 'payment_date').values(
+            'id', 'order_id', 'payment_date', 'payment_method', 'payment_status__name_ru',
+            'payment_amount', 'currency', 'transaction_id'
+        ):
+            payments[row['order_id']].append({
+                'payment_id': row['id'],
+                'payment_date': row['payment_date'],
+                'payment_method': row['payment_method'],
+                'payment_status': row['payment_status__name_ru'],
+                'payment_amount': row['payment_amount'],
+                'currency': row['currency'],
+                'transaction_id': row['transaction_id'],
+            })
+
+        invoices = {}
+        for h in headers:
+            savings = h['promo_savings'] or 0
+            invoices[h['id']] = {
+                'order': {
+                    'order_id': h['id'],
+                    'order_date': h['order_date'],
+                    'order_amount': h['order_amount'],
+                    'promo_savings': savings,
+                    'total_amount': h['order_amount'] - savings,
+                    'order_status': h['order_status_name'],
+                    'user_id': h['user_id'],
+                    'user_name': h['user__name'],
+                    'user_email': h['user__email'],
+                    'user_phone': h['user__phone'],
+                    'delivery_address': h['delivery_address'],
+                },
+                'items': items.get(h['id'], []),
+                'payments': payments.get(h['id'], []),
+            }
+        return invoices
+
+    @staticmethod
+    def _encode(invoice: Dict[str, Any]) -> bytes:
+        raw = json.dumps(invoice, cls=DjangoJSONEncoder, separators=(',', ':'), ensure_ascii=False)
+        return gzip.compress(raw.encode('utf-8'), mtime=0)
+
+    @classmethod
+    def _artifact_path(cls, order_id: int, version: str) -> str:
+        return f"{cls.STORAGE_PREFIX}/{order_id}/{version}.json.gz"
+
+    @classmethod
+    def _store(cls, order_id: int, version: str, payload: bytes) -> None:
+        path = cls._artifact_path(order_id, version)
+        if not default_storage.exists(path):
+            default_storage.save(path, ContentFile(payload))
+        # Drop artifacts of superseded versions
+        directory = f"{cls.STORAGE_PREFIX}/{order_id}"
+        _, files = default_storage.listdir(directory)
+        for name in files:
+            if f"{directory}/{name}" != path:
+                default_storage.delete(f"{directory}/{name}")
@@ -0,0 +1,27 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from apps.orders.delivery import DeliveryIngestService
+
+
+class Command(BaseCommand):
+    help = "Applies carrier tracking events from JSON Lines or CSV files (or stdin) to Orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help="Event files; reads stdin when omitted or '-'")
+        parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+
+    def handle(self, *args, **options):
+        for path in options['paths'] or ['-']:
+            if path == '-':
+                stats = DeliveryIngestService.ingest_file(sys.stdin, options['format'])
+            else:
+                with open(path, encoding='utf-8', newline='') as f:
+                    stats = DeliveryIngestService.ingest_file(f, options['format'])
+            self.stdout.write(self.style.SUCCESS(
+                f"{path}: {stats.received} events, {stats.applied} applied, {stats.duplicates} duplicates, "
+                f"{stats.rejected} rejected, {stats.unknown} unknown; {stats.orders_updated} orders updated."
+            ))
+            for reason in stats.rejections:
+                self.stdout.write(self.style.WARNING(f"  {reason}"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.services import OrderSummaryService
+
+
+class Command(BaseCommand):
+    help = "Recomputes OrderSummary for every order (backfill after bulk loads or repair)."
+
+    def handle(self, *args, **options):
+        written = OrderSummaryService.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt order summaries for {written} orders."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.invoices import InvoiceService
+
+
+class Command(BaseCommand):
+    help = "Renders cached invoice artifacts for completed orders (e.g. as a month-end job)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--order-ids', nargs='*', type=int,
+                            help='Render only these orders (default: every completed order)')
+
+    def handle(self, *args, **options):
+        written = InvoiceService.render_batch(options['order_ids'])
+        self.stdout.write(self.style.SUCCESS(f"Rendered {written} invoice artifacts."))
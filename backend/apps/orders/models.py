@@ -0,0 +1,165 @@
+from typing import Dict, FrozenSet, Tuple
+
+from django.db import models
+
+from apps.accounts.models import User
+from apps.products.models import Product
+
+
+# Status keys are reference data (02_reference_data.sql) and never change at runtime,
+# so key -> ID lookups are resolved once per process.
+_STATUS_ID_CACHE: Dict[Tuple[str, str], int] = {}
+_TRANSITION_CACHE: Dict[str, FrozenSet[Tuple[int, int]]] = {}
+
+
+class StatusType(models.Model):
+    """Common shape of the *StatusTypes lookup tables (ADR-003)."""
+    id = models.AutoField(primary_key=True, db_column='status_ID')
+    key = models.CharField(max_length=50, unique=True, db_column='status_KEY')
+    name_ru = models.CharField(max_length=100, db_column='status_NAME_RU')
+    name_en = models.CharField(max_length=100, null=True, db_column='status_NAME_EN')
+    display_order = models.IntegerField(default=0, db_column='display_ORDER')
+
+    class Meta:
+        abstract = True
+
+    def __str__(self) -> str:
+        return self.key
+
+    @classmethod
+    def id_for(cls, key: str) -> int:
+        """Resolves a status key (e.g. 'Pending') to its ID, raising DoesNotExist for unknown keys."""
+        cache_key = (cls._meta.db_table, key)
+        if cache_key not in _STATUS_ID_CACHE:
+            _STATUS_ID_CACHE[cache_key] = cls.objects.values_list('id', flat=True).get(key=key)
+        return _STATUS_ID_CACHE[cache_key]
+
+
+class StatusTransition(models.Model):
+    """
+    Common shape of the *StatusTransitions tables (ADR-006).
+    The tables have a composite (from, to) key; as with inspectdb output,
+    the first column is declared as the primary key and the pair as unique.
+    """
+    is_allowed = models.BooleanField(default=True, db_column='is_allowed')
+    transition_name = models.CharField(max_length=100, null=True, db_column='transition_name')
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def is_allowed_transition(cls, from_status_id: int, to_status_id: int) -> bool:
+        return cls.objects.filter(
+            from_status_id=from_status_id,
+            to_status_id=to_status_id,
+            is_allowed=True,
+        ).exists()
+
+    @classmethod
+    def allowed_pairs(cls) -> FrozenSet[Tuple[int, int]]:
+        """All allowed (from_status_id, to_status_id) pairs, loaded once per process for batch validation."""
+        table = cls._meta.db_table
+        if table not in _TRANSITION_CACHE:
+            _TRANSITION_CACHE[table] = frozenset(
+                cls.objects.filter(is_allowed=True).values_list('from_status_id', 'to_status_id')
+            )
+        return _TRANSITION_CACHE[table]
+
+
+class OrderStatusType(StatusType):
+    class Meta:
+        managed = False
+        db_table = 'OrderStatusTypes'
+
+
+class DeliveryStatusType(StatusType):
+    class Meta:
+        managed = False
+        db_table = 'DeliveryStatusTypes'
+
+
+class OrderStatusTransition(StatusTransition):
+    from_status = models.ForeignKey(OrderStatusType, on_delete=models.DO_NOTHING, primary_key=True,
+                                    db_column='from_status_ID', related_name='+')
+    to_status = models.ForeignKey(OrderStatusType, on_delete=models.DO_NOTHING,
+                                  db_column='to_status_ID', related_name='+')
+
+    class Meta:
+        managed = False
+        db_table = 'OrderStatusTransitions'
+        unique_together = (('from_status', 'to_status'),)
+
+
+class DeliveryStatusTransition(StatusTransition):
+    from_status = models.ForeignKey(DeliveryStatusType, on_delete=models.DO_NOTHING, primary_key=True,
+                                    db_column='from_status_ID', related_name='+')
+    to_status = models.ForeignKey(DeliveryStatusType, on_delete=models.DO_NOTHING,
+                                  db_column='to_status_ID', related_name='+')
+
+    class Meta:
+        managed = False
+        db_table = 'DeliveryStatusTransitions'
+        unique_together = (('from_status', 'to_status'),)
+
+
+class Order(models.Model):
+    id = models.AutoField(primary_key=True, db_column='order_ID')
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, db_column='user_ID', related_name='orders')
+    order_date = models.DateTimeField(null=True, db_column='order_DATE')
+    order_status = models.ForeignKey(OrderStatusType, on_delete=models.DO_NOTHING, null=True,
+                                     db_column='order_STATUS_ID', related_name='+')
+    order_amount = models.DecimalField(max_digits=10, decimal_places=2, db_column='order_AMOUNT')
+    promo_id = models.IntegerField(null=True, db_column='promo_ID')
+    promo_savings = models.DecimalField(max_digits=10, decimal_places=2, default=0, db_column='promo_SAVINGS')
+    # Delivery information (ADR-002: single delivery per order)
+    delivery_address = models.CharField(max_length=500, null=True, db_column='delivery_ADDRESS')
+    shipped_date = models.DateTimeField(null=True, db_column='shipped_DATE')
+    estimated_delivery_date = models.DateTimeField(null=True, db_column='estimated_delivery_DATE')
+    actual_delivery_date = models.DateTimeField(null=True, db_column='actual_delivery_DATE')
+    delivery_status = models.ForeignKey(DeliveryStatusType, on_delete=models.DO_NOTHING, null=True,
+                                        db_column='delivery_STATUS_ID', related_name='+')
+    shipping_carrier_name = models.CharField(max_length=255, null=True, db_column='shipping_carrier_NAME')
+    tracking_number = models.CharField(max_length=100, null=True, db_column='tracking_NUMBER')
+
+    class Meta:
+        managed = False
+        db_table = 'Orders'
+
+
+class OrderItem(models.Model):
+    id = models.AutoField(primary_key=True, db_column='OrderItems_ID')
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, db_column='order_ID', related_name='items')
+    product = models.ForeignKey(Product, on_delete=models.DO_NOTHING, db_column='product_ID', related_name='+')
+    quantity = models.IntegerField(db_column='quantity')
+    price = models.DecimalField(max_digits=10, decimal_places=2, db_column='price')
+
+    class Meta:
+        managed = False
+        db_table = 'OrderItems'
+
+
+class OrderSummary(models.Model):
+    """
+    Denormalized order read model (05_read_models.sql): one narrow row per order
+    with current statuses, totals, payment state and item count. Rows are
+    rewritten by OrderSummaryService whenever the order or its payments change,
+    so dashboard lists never join Orders/OrderItems/Payments at read time.
+    """
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, primary_key=True,
+                                 db_column='order_ID', related_name='summary')
+    user_id = models.IntegerField(db_column='user_ID')
+    order_date = models.DateTimeField(null=True, db_column='order_DATE')
+    order_status_id = models.IntegerField(null=True, db_column='order_STATUS_ID')
+    delivery_status_id = models.IntegerField(null=True, db_column='delivery_STATUS_ID')
+    payment_status_id = models.IntegerField(null=True, db_column='payment_STATUS_ID')
+    order_amount = models.DecimalField(max_digits=10, decimal_places=2, db_column='order_AMOUNT')
+    promo_savings = models.DecimalField(max_digits=10, decimal_places=2, db_column='promo_SAVINGS')
+    paid_amount = models.DecimalField(max_digits=10, decimal_places=2, db_column='paid_AMOUNT')
+    refunded_amount = models.DecimalField(max_digits=10, decimal_places=2, db_column='refunded_AMOUNT')
+    item_count = models.IntegerField(db_column='item_COUNT')
+    total_quantity = models.IntegerField(db_column='total_QUANTITY')
+    updated_at = models.DateTimeField(db_column='updated_AT')
+
+    class Meta:
+        managed = False
+        db_table = 'OrderSummary'
@@ -0,0 +1,237 @@
+from decimal import Decimal
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from django.db import transaction
+from django.db.models import Count, Sum, Q
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from .models import Order, OrderItem, OrderStatusType, OrderStatusTransition, OrderSummary
+from apps.products.models import Product
+
+
+class OrderSummaryService:
+    """
+    Maintains the OrderSummary read model.
+    Every service that writes Orders, OrderItems or Payments calls refresh() inside
+    its own transaction, so the read model is never behind the committed data.
+    Orders written outside the services are backfilled with rebuild().
+    """
+
+    # Keeps the IN (...) lists well below the MSSQL (2100) and Oracle (1000) bind limits
+    REFRESH_CHUNK_SIZE = 500
+
+    @classmethod
+    def refresh(cls, order_ids: Iterable[int]) -> int:
+        """
+        Recomputes read model rows for the given orders with set-based queries.
+
+        Args:
+            order_ids: IDs of orders whose rows must be rebuilt
+
+        Returns:
+            Number of read model rows written
+        """
+        ids = sorted(set(order_ids))
+        written = 0
+        for i in range(0, len(ids), cls.REFRESH_CHUNK_SIZE):
+            written += cls._refresh_chunk(ids[i:i + cls.REFRESH_CHUNK_SIZE])
+        return written
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """
+        Backfills the read model for every order (e.g. orders written by the data
+        generators or stored procedures), keyset-paging Orders by ID so each chunk is
+        recomputed with the same set-based queries as refresh().
+
+        Returns:
+            Number of read model rows written
+        """
+        written = 0
+        last_id = 0
+        while True:
+            ids = list(
+                Order.objects.filter(id__gt=last_id).order_by('id')
+                .values_list('id', flat=True)[:cls.REFRESH_CHUNK_SIZE]
+            )
+            if not ids:
+                return written
+            written += cls._refresh_chunk(ids)
+            last_id = ids[-1]
+
+    @classmethod
+    def _refresh_chunk(cls, ids: List[int]) -> int:
+        from apps.payments.models import Payment, PaymentStatusType
+
+        # Step 1: Base order columns
+        orders = Order.objects.filter(id__in=ids).values(
+            'id', 'user_id', 'order_date', 'order_status_id', 'delivery_status_id',
+            'order_amount', 'promo_savings',
+        )
+
+        # Step 2: Item aggregates, one grouped query
+        items = {
+            row['order_id']: row
+            for row in OrderItem.objects.filter(order_id__in=ids)
+            .values('order_id')
+            .annotate(item_count=Count('id'), total_quantity=Sum('quantity'))
+        }
+
+        # Step 3: Payment aggregates and the latest payment status per order
+        # Refunds are separate 'Refund' ledger rows; a refunded charge still counts as paid
+        refunded_id = PaymentStatusType.id_for('Refunded')
+        captured_ids = [PaymentStatusType.id_for(key) for key in ('Completed', 'PartiallyRefunded', 'Refunded')]
+        payments = {
+            row['order_id']: row
+            for row in Payment.objects.filter(order_id__in=ids)
+            .values('order_id')
+            .annotate(
+                paid=Sum('payment_amount', filter=Q(payment_status_id__in=captured_ids) & ~Q(payment_method='Refund')),
+                refunded=Sum('payment_amount', filter=Q(payment_status_id=refunded_id, payment_method='Refund')),
+            )
+        }
+        latest_status: Dict[int, Optional[int]] = {}
+        for order_id, status_id in (
+            Payment.objects.filter(order_id__in=ids)
+            .exclude(payment_method='Refund')
+            .order_by('order_id', '-payment_date', '-id')
+            .values_list('order_id', 'payment_status_id')
+        ):
+            latest_status.setdefault(order_id, status_id)
+
+        # Step 4: Build rows and swap them in atomically
+        now = timezone.now()
+        rows = []
+        for o in orders:
+            item_row = items.get(o['id'], {})
+            pay_row = payments.get(o['id'], {})
+            rows.append(OrderSummary(
+                order_id=o['id'],
+                user_id=o['user_id'],
+                order_date=o['order_date'],
+                order_status_id=o['order_status_id'],
+                delivery_status_id=o['delivery_status_id'],
+                payment_status_id=latest_status.get(o['id']),
+                order_amount=o['order_amount'],
+                promo_savings=o['promo_savings'] or Decimal('0.00'),
+                paid_amount=pay_row.get('paid') or Decimal('0.00'),
+                refunded_amount=pay_row.get('refunded') or Decimal('0.00'),
+                item_count=item_row.get('item_count') or 0,
+                total_quantity=item_row.get('total_quantity') or 0,
+                updated_at=now,
+            ))
+
+        with transaction.atomic():
+            OrderSummary.objects.filter(order_id__in=ids).delete()
+            OrderSummary.objects.bulk_create(rows)
+        return len(rows)
+
+    @staticmethod
+    def list_orders(status_key: Optional[str] = None, user_id: Optional[int] = None,
+                    before: Optional[Tuple[Any, int]] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Dashboard list query served entirely from the OrderSummary table.
+
+        Args:
+            status_key: Optional order status filter (uses IX_OrderSummary_Status_Date)
+            user_id: Optional customer filter (uses IX_OrderSummary_User_Date)
+            before: Keyset cursor (order_date, order_id) of the last row of the previous page
+            limit: Page size
+
+        Returns:
+            List of read model rows as dicts, newest first
+        """
+        qs = OrderSummary.objects.all()
+        if status_key:
+            qs = qs.filter(order_status_id=OrderStatusType.id_for(status_key))
+        if user_id is not None:
+            qs = qs.filter(user_id=user_id)
+        if before is not None:
+            last_date, last_id = before
+            qs = qs.filter(Q(order_date__lt=last_date) | Q(order_date=last_date, order_id__lt=last_id))
+        return list(qs.order_by('-order_date', '-order_id').values()[:limit])
+
+
+class OrderService:
+    """
+    Service for order writes. Order amount calculation and status validation live here
+    rather than in triggers (ADR-001).
+    """
+
+    @classmethod
+    def create_order(cls, user_id: int, items: List[Tuple[int, int]],
+                     delivery_address: Optional[str] = None, status_key: str = 'Cart') -> Order:
+        """
+        Creates an order with its items at current product prices.
+
+        Args:
+            user_id: Owner of the order
+            items: List of (product_id, quantity) pairs
+            delivery_address: Optional delivery address
+            status_key: Initial order status key
+
+        Returns:
+            The created Order
+
+        Raises:
+            ValidationError: If the item list is empty or references unknown/inactive products
+        """
+        if not items:
+            raise ValidationError("Order must contain at least one item")
+        if any(qty <= 0 for _pid, qty in items):
+            raise ValidationError("Item quantity must be positive")
+
+        # Step 1: Fetch current prices in one query
+        product_ids = {pid for pid, _qty in items}
+        prices = dict(
+            Product.objects.filter(id__in=product_ids, is_active=True).values_list('id', 'price')
+        )
+        missing = product_ids - prices.keys()
+        if missing:
+            raise ValidationError(f"Unknown or inactive products: {sorted(missing)}")
+
+        amount = sum((prices[pid] * qty for pid, qty in items), Decimal('0.00'))
+
+        with transaction.atomic():
+            # Step 2: Order header with the final amount (no follow-up UPDATE)
+            order = Order.objects.create(
+                user_id=user_id,
+                order_date=timezone.now(),
+                order_status_id=OrderStatusType.id_for(status_key),
+                order_amount=amount,
+                delivery_address=delivery_address,
+            )
+
+            # Step 3: Items in one bulk statement
+            OrderItem.objects.bulk_create([
+                OrderItem(order_id=order.id, product_id=pid, quantity=qty, price=prices[pid])
+                for pid, qty in items
+            ])
+
+            OrderSummaryService.refresh([order.id])
+        return order
+
+    @classmethod
+    def change_status(cls, order_id: int, new_status_key: str) -> Order:
+        """
+        Moves an order to a new status if the transition matrix allows it.
+
+        Raises:
+            ValidationError: If the order does not exist or the transition is not allowed
+        """
+        new_status_id = OrderStatusType.id_for(new_status_key)
+        with transaction.atomic():
+            try:
+                order = Order.objects.select_for_update().get(id=order_id)
+            except Order.DoesNotExist:
+                raise ValidationError("Order not found")
+
+            if not OrderStatusTransition.is_allowed_transition(order.order_status_id, new_status_id):
+                raise ValidationError(
+                    f"Order status transition to '{new_status_key}' is not allowed"
+                )
+
+            Order.objects.filter(id=order_id).update(order_status_id=new_status_id)
+            order.order_status_id = new_status_id
+            OrderSummaryService.refresh([order_id])
+        return order
@@ -0,0 +1,169 @@
+import bisect
+import csv
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Optional, List, Dict, Any, Sequence, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import ExchangeRate
+
+CENT = Decimal('0.01')
+
+
+class RateTable:
+    """
+    In-memory time-versioned rates: per currency, valid_from dates (as ordinals) sorted
+    ascending with the matching rate to the base currency. A lookup is one bisect.
+    """
+
+    def __init__(self, rows: Sequence[Tuple[str, date, Decimal]]):
+        versions: Dict[str, List[Tuple[int, Decimal]]] = {}
+        for currency, valid_from, rate in rows:
+            versions.setdefault(currency.strip().upper(), []).append((valid_from.toordinal(), Decimal(rate)))
+        self._days: Dict[str, List[int]] = {}
+        self._rates: Dict[str, List[Decimal]] = {}
+        for currency, entries in versions.items():
+            entries.sort()
+            self._days[currency] = [d for d, _ in entries]
+            self._rates[currency] = [r for _, r in entries]
+
+    def rate(self, currency: str, on: date) -> Optional[Decimal]:
+        days = self._days.get(currency)
+        if not days:
+            return None
+        i = bisect.bisect_right(days, on.toordinal()) - 1
+        return self._rates[currency][i] if i >= 0 else None
+
+    def currencies(self) -> List[str]:
+        return list(self._days.keys())
+
+
+class CurrencyService:
+    """
+    Currency conversion without database round trips on the request path.
+
+    Rates come from EXCHANGE_RATES_FILE (CSV: currency, valid_from, rate_to_base) when set,
+    otherwise from the ExchangeRates table, and are reloaded at most once per day. Each
+    day's {currency: rate} snapshot is cached, so converting a result set costs one
+    dict lookup per distinct currency, not one per row.
+    """
+
+    DAY_CACHE_SIZE = 64
+
+    _table: Optional[RateTable] = None
+    _loaded_on: Optional[date] = None
+    _day_cache: 'OrderedDict[date, Dict[str, Decimal]]' = OrderedDict()
+    _lock = threading.Lock()
+
+    @staticmethod
+    def base_currency() -> str:
+        return getattr(settings, 'BASE_CURRENCY', 'USD')
+
+    @classmethod
+    def rates_for(cls, on: Optional[date] = None) -> Dict[str, Decimal]:
+        """Returns the {currency: rate_to_base} snapshot valid on the given day (default: today)."""
+        on = on or timezone.localdate()
+        with cls._lock:
+            cls._ensure_loaded()
+            rates = cls._day_cache.get(on)
+            if rates is None:
+                rates = {c: r for c in cls._table.currencies() if (r := cls._table.rate(c, on)) is not None}
+                cls._day_cache[on] = rates
+                if len(cls._day_cache) > cls.DAY_CACHE_SIZE:
+                    cls._day_cache.popitem(last=False)
+            else:
+                cls._day_cache.move_to_end(on)
+            return rates
+
+    @classmethod
+    def convert(cls, amount: Decimal, from_currency: str, to_currency: str,
+                on: Optional[date] = None) -> Decimal:
+        return cls.convert_many([amount], [from_currency], to_currency, on)[0]
+
+    @classmethod
+    def convert_many(cls, amounts: Sequence[Decimal], currencies: Sequence[str], to_currency: str,
+                     on: Optional[date] = None) -> List[Decimal]:
+        """
+        Converts a whole column of amounts to to_currency with one factor per distinct
+        source currency, rounded to cents.
+
+        Raises:
+            ValidationError: If a currency has no rate on that day
+        """
+        rates = cls.rates_for(on)
+        factors = {c: cls._factor(rates, c, to_currency) for c in set(currencies)}
+        return [(a * factors[c]).quantize(CENT, ROUND_HALF_UP) for a, c in zip(amounts, currencies)]
+
+    @classmethod
+    def convert_rows(cls, rows: List[Dict[str, Any]], amount_key: str, currency_key: str,
+                     to_currency: str, date_key: Optional[str] = None,
+                     out_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Converts a values() result set in place. With date_key, each row converts at the rate
+        of its own day (e.g. payment_date); rows are grouped by day so every day costs one
+        cached snapshot lookup.
+        """
+        out_key = out_key or amount_key
+        by_day: Dict[Optional[date], List[int]] = {}
+        for i, row in enumerate(rows):
+            day = row[date_key] if date_key else None
+            if isinstance(day, datetime):
+                day = timezone.localtime(day).date() if timezone.is_aware(day) else day.date()
+            elif isinstance(day, str):
+                day = parse_date(day)
+            by_day.setdefault(day, []).append(i)
+
+        for day, indexes in by_day.items():
+            converted = cls.convert_many(
+                [rows[i][amount_key] for i in indexes], [rows[i][currency_key] for i in indexes],
+                to_currency, day,
+            )
+            for i, value in zip(indexes, converted):
+                rows[i][out_key] = value
+        return rows
+
+    @classmethod
+    def reload(cls) -> None:
+        """Drops the loaded table and day snapshots; the next lookup reloads them."""
+        with cls._lock:
+            cls._table, cls._loaded_on = None, None
+            cls._day_cache.clear()
+
+    @classmethod
+    def _ensure_loaded(cls) -> None:
+        today = timezone.localdate()
+        if cls._table is not None and cls._loaded_on == today:
+            return
+        cls._table = RateTable(cls._load_rows())
+        cls._loaded_on = today
+        cls._day_cache.clear()
+
+    @staticmethod
+    def _load_rows() -> List[Tuple[str, date, Decimal]]:
+        path = getattr(settings, 'EXCHANGE_RATES_FILE', None)
+        if path:
+            with open(path, encoding='utf-8', newline='') as f:
+                return [
+                    (row['currency'], parse_date(row['valid_from']), Decimal(row['rate_to_base']))
+                    for row in csv.DictReader(f)
+                ]
+        return list(ExchangeRate.objects.values_list('currency', 'valid_from', 'rate_to_base'))
+
+    @classmethod
+    def _factor(cls, rates: Dict[str, Decimal], from_currency: str, to_currency: str) -> Decimal:
+        from_currency, to_currency = from_currency.strip().upper(), to_currency.strip().upper()
+        if from_currency == to_currency:
+            return Decimal('1')
+        base = cls.base_currency()
+        from_rate = Decimal('1') if from_currency == base else rates.get(from_currency)
+        to_rate = Decimal('1') if to_currency == base else rates.get(to_currency)
+        if from_rate is None or to_rate is None:
+            missing = from_currency if from_rate is None else to_currency
+            raise ValidationError(f"No exchange rate for {missing}")
+        return from_rate / to_rate
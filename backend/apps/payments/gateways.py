@@ -0,0 +1,40 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional
+
+
+@dataclass
+class GatewayResult:
+    approved: bool
+    gateway_reference: Optional[str] = None
+    message: Optional[str] = None
+
+
+class PaymentGateway:
+    """
+    Asynchronous payment gateway client. Implementations must treat idempotency_key as the
+    gateway-side idempotency key, so a retried charge never captures funds twice.
+    """
+
+    async def charge(self, idempotency_key: str, amount: Decimal, currency: str, method: str) -> GatewayResult:
+        raise NotImplementedError
+
+
+class StubGateway(PaymentGateway):
+    """
+    Local gateway for development and tests. Responds after a fixed latency and declines
+    a deterministic share of keys, so retries of the same key always get the same answer.
+    """
+
+    def __init__(self, latency_seconds: float = 0.2, decline_rate: float = 0.05):
+        self.latency_seconds = latency_seconds
+        self.decline_rate = decline_rate
+
+    async def charge(self, idempotency_key: str, amount: Decimal, currency: str, method: str) -> GatewayResult:
+        await asyncio.sleep(self.latency_seconds)
+        bucket = int(hashlib.sha1(idempotency_key.encode('utf-8')).hexdigest()[:8], 16) / 0xFFFFFFFF
+        if amount <= 0 or bucket < self.decline_rate:
+            return GatewayResult(approved=False, message='Declined by stub gateway')
+        return GatewayResult(approved=True, gateway_reference=f"STUB-{idempotency_key}")
@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.payments.rollups import PaymentRollupService
+
+
+class Command(BaseCommand):
+    help = "Recomputes PaymentRollup rows from Payments for a date range (backfill or repair)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', required=True, help='First day (YYYY-MM-DD)')
+        parser.add_argument('--end', help='Last day, inclusive (default: today)')
+
+    def handle(self, *args, **options):
+        start = parse_date(options['start'])
+        end = parse_date(options['end']) if options['end'] else timezone.localdate()
+        if start is None or end is None or end < start:
+            raise CommandError("Invalid date range")
+        written = PaymentRollupService.rebuild(start, end + timedelta(days=1))
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup rows for {start} .. {end}."))
@@ -0,0 +1,47 @@
+import csv
+import sys
+from dataclasses import asdict
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.payments.reconciliation import Discrepancy, PaymentReconciliationService
+
+
+class Command(BaseCommand):
+    help = "Reconciles a PSP settlement CSV against Payments and writes discrepancies as CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Settlement file (transaction_id, amount, currency, status)')
+        parser.add_argument('--apply', action='store_true', help='Apply status corrections')
+        parser.add_argument('--date', help='Settlement day (YYYY-MM-DD); also reports unsettled payments')
+        parser.add_argument('--output', help='Discrepancy CSV (default: stdout)')
+
+    def handle(self, *args, **options):
+        window = None
+        if options['date']:
+            day = parse_date(options['date'])
+            if day is None:
+                raise CommandError(f"Invalid date: {options['date']}")
+            start = timezone.make_aware(datetime.combine(day, time.min))
+            window = (start, start + timedelta(days=1))
+
+        out = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            writer = csv.DictWriter(out, fieldnames=list(Discrepancy.__dataclass_fields__))
+            writer.writeheader()
+            with open(options['path'], encoding='utf-8', newline='') as f:
+                stats = PaymentReconciliationService.reconcile(
+                    f, apply=options['apply'], window=window,
+                    on_discrepancy=lambda d: writer.writerow(asdict(d)),
+                )
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+        self.stderr.write(self.style.SUCCESS(
+            f"{stats.lines} lines, {stats.matched} matched, {stats.discrepancies} discrepancies "
+            f"({stats.malformed} malformed lines), {stats.corrected} corrected."
+        ))
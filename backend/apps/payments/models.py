@@ -0,0 +1,104 @@
+from django.db import models
+
+from apps.orders.models import Order, StatusType, StatusTransition
+
+
+class PaymentStatusType(StatusType):
+    class Meta:
+        managed = False
+        db_table = 'PaymentStatusTypes'
+
+
+class PaymentStatusTransition(StatusTransition):
+    from_status = models.ForeignKey(PaymentStatusType, on_delete=models.DO_NOTHING, primary_key=True,
+                                    db_column='from_status_ID', related_name='+')
+    to_status = models.ForeignKey(PaymentStatusType, on_delete=models.DO_NOTHING,
+                                  db_column='to_status_ID', related_name='+')
+
+    class Meta:
+        managed = False
+        db_table = 'PaymentStatusTransitions'
+        unique_together = (('from_status', 'to_status'),)
+
+
+class Payment(models.Model):
+    id = models.AutoField(primary_key=True, db_column='payment_ID')
+    order = models.ForeignKey(Order, on_delete=models.DO_NOTHING, db_column='order_ID', related_name='payments')
+    payment_date = models.DateTimeField(db_column='payment_DATE')
+    payment_method = models.CharField(max_length=50, db_column='payment_METHOD')
+    payment_status = models.ForeignKey(PaymentStatusType, on_delete=models.DO_NOTHING, null=True,
+                                       db_column='payment_STATUS_ID', related_name='+')
+    payment_amount = models.DecimalField(max_digits=10, decimal_places=2, db_column='payment_AMOUNT')
+    currency = models.CharField(max_length=3, db_column='currency')
+    transaction_id = models.CharField(max_length=100, unique=True, db_column='transaction_ID')
+    created_at = models.DateTimeField(auto_now_add=True, db_column='created_at')
+    updated_at = models.DateTimeField(auto_now=True, db_column='updated_at')
+
+    class Meta:
+        managed = False
+        db_table = 'Payments'
+
+
+class RefundItem(models.Model):
+    """
+    Order line returned by a line-item refund. Composite key (payment_ID, product_ID);
+    as with the transition tables, the first column is declared as the primary key.
+    """
+    payment = models.ForeignKey(Payment, on_delete=models.CASCADE, primary_key=True,
+                                db_column='payment_ID', related_name='refund_items')
+    order = models.ForeignKey(Order, on_delete=models.DO_NOTHING, db_column='order_ID', related_name='+')
+    product_id = models.IntegerField(db_column='product_ID')
+    quantity = models.IntegerField(db_column='quantity')
+
+    class Meta:
+        managed = False
+        db_table = 'RefundItems'
+        unique_together = (('payment', 'product_id'),)
+
+
+class SettlementStaging(models.Model):
+    """
+    Transaction IDs of a settlement file under reconciliation, keyed by run. Composite key
+    (run_ID, transaction_ID, chunk_NO); the first column is declared as the primary key.
+    """
+    run_id = models.CharField(max_length=32, primary_key=True, db_column='run_ID')
+    transaction_id = models.CharField(max_length=100, db_column='transaction_ID')
+    chunk_no = models.IntegerField(db_column='chunk_NO')
+
+    class Meta:
+        managed = False
+        db_table = 'SettlementStaging'
+        unique_together = (('run_id', 'transaction_id', 'chunk_no'),)
+
+
+class PaymentRollup(models.Model):
+    """
+    Hourly payment aggregates (05_read_models.sql). The table has a composite key;
+    as with the transition tables, the first column is declared as the primary key
+    and the full key as unique.
+    """
+    bucket_date = models.DateField(primary_key=True, db_column='bucket_DATE')
+    bucket_hour = models.IntegerField(db_column='bucket_HOUR')
+    payment_method = models.CharField(max_length=50, db_column='payment_METHOD')
+    payment_status_id = models.IntegerField(db_column='payment_STATUS_ID')
+    currency = models.CharField(max_length=3, db_column='currency')
+    payment_count = models.IntegerField(default=0, db_column='payment_COUNT')
+    total_amount = models.DecimalField(max_digits=18, decimal_places=2, default=0, db_column='total_AMOUNT')
+    updated_at = models.DateTimeField(db_column='updated_AT')
+
+    class Meta:
+        managed = False
+        db_table = 'PaymentRollup'
+        unique_together = (('bucket_date', 'bucket_hour', 'payment_method', 'payment_status_id', 'currency'),)
+
+
+class ExchangeRate(models.Model):
+    """Time-versioned exchange rate (02_reference_data.sql); composite key as in PaymentRollup."""
+    currency = models.CharField(max_length=3, primary_key=True, db_column='currency')
+    valid_from = models.DateField(db_column='valid_FROM')
+    rate_to_base = models.DecimalField(max_digits=18, decimal_places=8, db_column='rate_TO_BASE')
+
+    class Meta:
+        managed = False
+        db_table = 'ExchangeRates'
+        unique_together = (('currency', 'valid_from'),)
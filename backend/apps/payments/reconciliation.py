@@ -0,0 +1,274 @@
+import csv
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import count, islice
+from typing import Optional, List, Dict, Set, Tuple, Callable, Iterator, TextIO
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import Payment, PaymentStatusType, PaymentStatusTransition, SettlementStaging
+from .rollups import PaymentRollupService
+from apps.orders.services import OrderSummaryService
+
+
+@dataclass
+class SettlementLine:
+    transaction_id: str
+    amount: Decimal
+    currency: str
+    status: str
+
+
+@dataclass
+class Discrepancy:
+    kind: str
+    transaction_id: str
+    payment_id: Optional[int] = None
+    expected: Optional[str] = None
+    actual: Optional[str] = None
+
+
+@dataclass
+class ReconciliationStats:
+    lines: int = 0
+    matched: int = 0
+    discrepancies: int = 0
+    corrected: int = 0
+    malformed: int = 0
+    by_kind: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+class PaymentReconciliationService:
+    """
+    Reconciles a PSP settlement file against Payments (replaces the cursor loop in
+    sp_ReconcilePaymentStatuses).
+
+    The file is streamed in chunks of CHUNK_SIZE lines, and each chunk's transaction IDs are
+    written to SettlementStaging under a per-run key. Payments for a chunk are fetched with a
+    semi-join against the staged chunk, and duplicates from earlier chunks are found the same
+    way, so memory stays bounded by the chunk size however large the file is. Discrepancies
+    are handed to a callback as they are found instead of being collected, and status
+    corrections for a chunk are applied with one UPDATE per target status. With a settlement
+    window, a keyset-paged anti-join of Payments against the staged run reports completed
+    payments the PSP never settled. The run's staging rows are deleted afterwards.
+    """
+
+    CHUNK_SIZE = 5000
+    # Keeps the IN (...) lists well below the MSSQL (2100) and Oracle (1000) bind limits
+    LOOKUP_CHUNK_SIZE = 500
+    PAGE_SIZE = 2000
+
+    # PSP settlement status -> PaymentStatusTypes key
+    SETTLEMENT_STATUS_MAP = {
+        'settled': 'Completed',
+        'failed': 'Failed',
+        'refunded': 'Refunded',
+        'partially_refunded': 'PartiallyRefunded',
+    }
+
+    @classmethod
+    def reconcile(cls, stream: TextIO, apply: bool = False,
+                  window: Optional[Tuple[datetime, datetime]] = None,
+                  on_discrepancy: Optional[Callable[[Discrepancy], None]] = None) -> ReconciliationStats:
+        """
+        Reconciles a CSV settlement stream (transaction_id, amount, currency, status).
+
+        Args:
+            stream: Open settlement file
+            apply: Apply status corrections; otherwise only report
+            window: Optional (start, end) of payment_date covered by the file; enables the
+                missing-in-settlement pass
+            on_discrepancy: Called once per discrepancy; malformed rows are reported as
+                malformed_line and skipped
+
+        Returns:
+            ReconciliationStats
+        """
+        stats = ReconciliationStats()
+        run_id = uuid.uuid4().hex
+
+        def emit(d: Discrepancy) -> None:
+            stats.discrepancies += 1
+            stats.by_kind[d.kind] += 1
+            if on_discrepancy is not None:
+                on_discrepancy(d)
+
+        lines = cls._read_lines(stream, stats, emit)
+        try:
+            for chunk_no in count():
+                chunk = list(islice(lines, cls.CHUNK_SIZE))
+                if not chunk:
+                    break
+                stats.lines += len(chunk)
+                cls._reconcile_chunk(run_id, chunk_no, chunk, apply, stats, emit)
+
+            if window is not None:
+                cls._report_unsettled(run_id, window, emit)
+        finally:
+            SettlementStaging.objects.filter(run_id=run_id).delete()
+        return stats
+
+    @classmethod
+    def _read_lines(cls, stream: TextIO, stats: ReconciliationStats,
+                    emit: Callable[[Discrepancy], None]) -> Iterator[SettlementLine]:
+        """
+        Parses settlement rows. A malformed row is reported as a malformed_line discrepancy
+        (with its file line number) and skipped, so the rest of the file is still reconciled.
+        """
+        reader = csv.DictReader(stream)
+        for row in reader:
+            try:
+                line = cls._parse_line(row)
+            except ValidationError as e:
+                reason = e.messages[0]
+            except KeyError as e:
+                reason = f"missing column {e.args[0]!r}"
+            except (TypeError, AttributeError) as e:
+                # A short row leaves trailing columns as None
+                reason = f"malformed row ({e})"
+            else:
+                yield line
+                continue
+            stats.lines += 1
+            stats.malformed += 1
+            tx_id = (row.get('transaction_id') or '').strip()
+            emit(Discrepancy('malformed_line', tx_id, actual=f"line {reader.line_num}: {reason}"))
+
+    @staticmethod
+    def _parse_line(row: Dict[str, Optional[str]]) -> SettlementLine:
+        transaction_id = row['transaction_id'].strip()
+        if not transaction_id:
+            raise ValidationError("Empty transaction_id")
+        try:
+            amount = Decimal(row['amount'])
+        except (InvalidOperation, TypeError):
+            raise ValidationError(f"Invalid settlement amount {row['amount']!r}")
+        return SettlementLine(
+            transaction_id=transaction_id,
+            amount=amount,
+            currency=row['currency'].strip().upper(),
+            status=row['status'].strip().lower(),
+        )
+
+    @classmethod
+    def _reconcile_chunk(cls, run_id: str, chunk_no: int, chunk: List[SettlementLine], apply: bool,
+                         stats: ReconciliationStats, emit: Callable[[Discrepancy], None]) -> None:
+        # Step 1: Settlement lines keyed by transaction ID, staged for the set-based lookups
+        build: Dict[str, SettlementLine] = {}
+        for line in chunk:
+            if line.transaction_id in build:
+                emit(Discrepancy('duplicate_in_settlement', line.transaction_id))
+            build[line.transaction_id] = line
+        SettlementStaging.objects.bulk_create(
+            [SettlementStaging(run_id=run_id, transaction_id=tx_id, chunk_no=chunk_no) for tx_id in build],
+            batch_size=cls.LOOKUP_CHUNK_SIZE,
+        )
+        staged = SettlementStaging.objects.filter(run_id=run_id, chunk_no=chunk_no).values('transaction_id')
+
+        # Lines already seen in an earlier chunk of the file
+        for tx_id in SettlementStaging.objects.filter(
+            run_id=run_id, chunk_no__lt=chunk_no, transaction_id__in=staged,
+        ).values_list('transaction_id', flat=True).distinct():
+            emit(Discrepancy('duplicate_in_settlement', tx_id))
+
+        # Step 2: Payments of the chunk, semi-joined on the unique transaction_ID index
+        payments: Dict[str, Tuple[int, int, Decimal, str, int]] = {}
+        for row in Payment.objects.filter(transaction_id__in=staged).values_list(
+            'transaction_id', 'id', 'order_id', 'payment_amount', 'currency', 'payment_status_id'
+        ):
+            payments[row[0]] = row[1:]
+
+        # Step 3: Compare and collect corrections grouped by target status
+        status_ids = dict(PaymentStatusType.objects.values_list('key', 'id'))
+        key_by_id = {v: k for k, v in status_ids.items()}
+        corrections: Dict[int, List[Tuple[int, int, int]]] = defaultdict(list)
+        for tx_id, line in build.items():
+            payment = payments.get(tx_id)
+            if payment is None:
+                emit(Discrepancy('missing_in_db', tx_id, expected=str(line.amount)))
+                continue
+            payment_id, order_id, amount, currency, status_id = payment
+            clean = True
+            if amount != line.amount:
+                emit(Discrepancy('amount_mismatch', tx_id, payment_id, str(line.amount), str(amount)))
+                clean = False
+            if currency != line.currency:
+                emit(Discrepancy('currency_mismatch', tx_id, payment_id, line.currency, currency))
+                clean = False
+
+            target_key = cls.SETTLEMENT_STATUS_MAP.get(line.status)
+            if target_key is None:
+                emit(Discrepancy('unknown_settlement_status', tx_id, payment_id, line.status))
+                continue
+            target_id = status_ids[target_key]
+            if status_id != target_id:
+                emit(Discrepancy('status_mismatch', tx_id, payment_id, target_key, key_by_id.get(status_id)))
+                # Amount or currency disagreements need a human; only clean lines are auto-corrected
+                if clean and cls._reachable(status_id, target_id):
+                    corrections[target_id].append((payment_id, order_id, status_id))
+                clean = False
+            if clean:
+                stats.matched += 1
+
+        if apply and corrections:
+            stats.corrected += cls._apply_corrections(corrections)
+
+    @staticmethod
+    def _reachable(from_id: Optional[int], to_id: int) -> bool:
+        """True if the transition matrix allows from_id -> to_id as a single step."""
+        if from_id is None:
+            return False
+        return (from_id, to_id) in PaymentStatusTransition.allowed_pairs()
+
+    @classmethod
+    def _apply_corrections(cls, corrections: Dict[int, List[Tuple[int, int, int]]]) -> int:
+        corrected = 0
+        order_ids: Set[int] = set()
+        now = timezone.now()
+        with transaction.atomic():
+            for target_id, rows in corrections.items():
+                # The status guard keeps a concurrent status change from being overwritten
+                by_from: Dict[int, List[int]] = defaultdict(list)
+                for payment_id, order_id, from_id in rows:
+                    by_from[from_id].append(payment_id)
+                    order_ids.add(order_id)
+                for from_id, payment_ids in by_from.items():
+                    for i in range(0, len(payment_ids), cls.LOOKUP_CHUNK_SIZE):
+                        qs = Payment.objects.filter(
+                            id__in=payment_ids[i:i + cls.LOOKUP_CHUNK_SIZE],
+                            payment_status_id=from_id,
+                        )
+                        deltas = PaymentRollupService.deltas_for_move(qs, target_id)
+                        corrected += qs.update(payment_status_id=target_id, updated_at=now)
+                        PaymentRollupService.apply_deltas(deltas)
+            OrderSummaryService.refresh(order_ids)
+        return corrected
+
+    @classmethod
+    def _report_unsettled(cls, run_id: str, window: Tuple[datetime, datetime],
+                          emit: Callable[[Discrepancy], None]) -> None:
+        """Keyset-pages completed payments in the window that are absent from the staged file."""
+        start, end = window
+        settled = SettlementStaging.objects.filter(run_id=run_id, transaction_id=OuterRef('transaction_id'))
+        qs = Payment.objects.filter(
+            ~Exists(settled),
+            payment_date__gte=start, payment_date__lt=end,
+            payment_status_id=PaymentStatusType.id_for('Completed'),
+        ).exclude(payment_method='Refund')
+        last_id = 0
+        while True:
+            page = list(
+                qs.filter(id__gt=last_id).order_by('id')
+                .values_list('id', 'transaction_id', 'payment_amount')[:cls.PAGE_SIZE]
+            )
+            if not page:
+                return
+            for payment_id, tx_id, amount in page:
+                emit(Discrepancy('missing_in_settlement', tx_id, payment_id, actual=str(amount)))
+            last_id = page[-1][0]
@@ -0,0 +1,240 @@
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_HALF_UP
+from itertools import islice
+from typing import Optional, List, Dict, Tuple, Iterable
+
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.utils import timezone
+
+from .models import Payment, PaymentStatusType, PaymentStatusTransition, RefundItem
+from .rollups import PaymentRollupService
+from apps.orders.models import Order, OrderItem, OrderStatusType, OrderStatusTransition
+from apps.orders.services import OrderSummaryService
+
+CENT = Decimal('0.01')
+
+
+@dataclass
+class RefundRequest:
+    """
+    A refund for one order. With neither amount nor items, the whole refundable balance
+    is returned; amount refunds a fixed sum; items refunds {product_id: quantity} lines
+    at their purchase price less the order's promo discount.
+    """
+    order_id: int
+    amount: Optional[Decimal] = None
+    items: Optional[Dict[int, int]] = None
+    idempotency_key: Optional[str] = None
+
+
+@dataclass
+class RefundResult:
+    refunded: Dict[int, Decimal] = field(default_factory=dict)
+    skipped: Dict[int, str] = field(default_factory=dict)
+
+
+class RefundService:
+    """
+    Processes refunds in batches (e.g. a product recall) instead of one INSERT per order.
+
+    Refunds are 'Refund' ledger rows in Payments, as written by the data generators.
+    For every chunk of orders the pipeline runs a fixed number of statements: order
+    headers, one grouped payment aggregate, one line-price query and one grouped query
+    of already refunded quantities, multi-row INSERTs of ledger rows and RefundItems,
+    guarded UPDATEs of the original payments per status pair, and a single set-based
+    order transition to 'Refunded' for fully refunded orders. A line can only be
+    refunded up to its ordered quantity less what earlier refunds returned.
+
+    Each chunk runs in one transaction that first locks its Orders rows in id order, so
+    concurrent batches touching the same order are serialized and cannot both refund the
+    same remaining balance. Amounts stay exact Decimal arithmetic over the chunk's
+    prefetched aggregates; no per-order query is issued.
+    """
+
+    # Keeps the IN (...) lists well below the MSSQL (2100) and Oracle (1000) bind limits
+    CHUNK_SIZE = 500
+
+    @classmethod
+    def refund_batch(cls, requests: Iterable[RefundRequest]) -> RefundResult:
+        """
+        Refunds a batch of orders.
+
+        Returns:
+            RefundResult with the refunded amount per order and the reason for every skipped order
+        """
+        result = RefundResult()
+        iterator = iter(requests)
+        while True:
+            chunk = list(islice(iterator, cls.CHUNK_SIZE))
+            if not chunk:
+                return result
+            cls._refund_chunk(chunk, result)
+
+    @classmethod
+    def refund_order(cls, order_id: int, amount: Optional[Decimal] = None,
+                     items: Optional[Dict[int, int]] = None,
+                     idempotency_key: Optional[str] = None) -> Optional[Decimal]:
+        """Single-order convenience wrapper; returns the refunded amount or None if skipped."""
+        result = cls.refund_batch([RefundRequest(order_id, amount, items, idempotency_key)])
+        return result.refunded.get(order_id)
+
+    @classmethod
+    def _refund_chunk(cls, chunk: List[RefundRequest], result: RefundResult) -> None:
+        requests: Dict[int, RefundRequest] = {}
+        for req in chunk:
+            if req.order_id in requests or req.order_id in result.refunded:
+                result.skipped[req.order_id] = "Duplicate refund request in batch"
+            else:
+                requests[req.order_id] = req
+
+        # Everything from the first read to the last write runs under row locks on the
+        # chunk's orders, so concurrent refunds of an order see each other's ledger rows
+        with transaction.atomic():
+            cls._refund_locked(requests, result)
+
+    @classmethod
+    def _refund_locked(cls, requests: Dict[int, RefundRequest], result: RefundResult) -> None:
+        ids = sorted(requests.keys())
+        captured_ids = [PaymentStatusType.id_for(key) for key in ('Completed', 'PartiallyRefunded', 'Refunded')]
+        refunded_status_id = PaymentStatusType.id_for('Refunded')
+        partial_status_id = PaymentStatusType.id_for('PartiallyRefunded')
+
+        # Step 1: Order headers (locked in id order) and the promo discount factor per order
+        headers = {
+            row[0]: row[1:]
+            for row in Order.objects.select_for_update().filter(id__in=ids).order_by('id')
+            .values_list('id', 'order_amount', 'promo_savings')
+        }
+
+        # Step 2: Captured and refunded totals plus the latest charge, per order
+        totals = {
+            row['order_id']: row
+            for row in Payment.objects.filter(order_id__in=ids).values('order_id').annotate(
+                captured=Sum('payment_amount', filter=Q(payment_status_id__in=captured_ids) & ~Q(payment_method='Refund')),
+                refunded=Sum('payment_amount', filter=Q(payment_status_id=refunded_status_id, payment_method='Refund')),
+            )
+        }
+        charges: Dict[int, Tuple[int, str, int]] = {}
+        for order_id, payment_id, currency, status_id in (
+            Payment.objects.filter(order_id__in=ids, payment_status_id__in=captured_ids)
+            .exclude(payment_method='Refund')
+            .order_by('order_id', '-payment_date', '-id')
+            .values_list('order_id', 'id', 'currency', 'payment_status_id')
+        ):
+            charges.setdefault(order_id, (payment_id, currency, status_id))
+
+        # Step 3: Purchase prices for line-item refunds
+        lines: Dict[int, Dict[int, Tuple[Decimal, int]]] = defaultdict(dict)
+        item_order_ids = [oid for oid, req in requests.items() if req.items]
+        if item_order_ids:
+            for order_id, product_id, price, quantity in OrderItem.objects.filter(
+                order_id__in=item_order_ids
+            ).values_list('order_id', 'product_id', 'price', 'quantity'):
+                _, ordered = lines[order_id].get(product_id, (price, 0))
+                lines[order_id][product_id] = (price, ordered + quantity)
+            # Quantities returned by earlier line-item refunds are no longer refundable
+            for order_id, product_id, refunded_qty in (
+                RefundItem.objects.filter(order_id__in=item_order_ids)
+                .values('order_id', 'product_id').annotate(total=Sum('quantity'))
+                .values_list('order_id', 'product_id', 'total')
+            ):
+                price, ordered = lines[order_id].get(product_id, (Decimal('0.00'), 0))
+                lines[order_id][product_id] = (price, ordered - refunded_qty)
+
+        used_keys = set(Payment.objects.filter(
+            transaction_id__in=[req.idempotency_key for req in requests.values() if req.idempotency_key]
+        ).values_list('transaction_id', flat=True))
+
+        # Step 4: Amounts for the whole chunk
+        now = timezone.now()
+        ledger: List[Payment] = []
+        amounts: Dict[int, Decimal] = {}
+        fully_refunded: List[int] = []
+        charge_updates: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        refund_lines: Dict[str, Tuple[int, Dict[int, int]]] = {}
+        for order_id, req in requests.items():
+            header, charge = headers.get(order_id), charges.get(order_id)
+            if header is None:
+                result.skipped[order_id] = "Order not found"
+                continue
+            if charge is None:
+                result.skipped[order_id] = "Order has no captured payment"
+                continue
+            if req.idempotency_key and req.idempotency_key in used_keys:
+                result.skipped[order_id] = "Refund already processed"
+                continue
+
+            row = totals.get(order_id, {})
+            refundable = (row.get('captured') or Decimal('0.00')) - (row.get('refunded') or Decimal('0.00'))
+            if req.items:
+                order_amount, savings = header
+                factor = (order_amount - (savings or 0)) / order_amount if order_amount else Decimal('0')
+                gross = Decimal('0.00')
+                for product_id, qty in req.items.items():
+                    price, remaining = lines[order_id].get(product_id, (Decimal('0.00'), 0))
+                    if qty <= 0 or qty > remaining:
+                        gross = None
+                        break
+                    gross += price * qty
+                if gross is None:
+                    result.skipped[order_id] = "Refunded quantity exceeds the ordered quantity not yet refunded"
+                    continue
+                amount = (gross * factor).quantize(CENT, ROUND_HALF_UP)
+            elif req.amount is not None:
+                amount = req.amount.quantize(CENT, ROUND_HALF_UP)
+            else:
+                amount = refundable
+            if amount <= 0 or amount > refundable:
+                result.skipped[order_id] = f"Refund amount {amount} outside the refundable balance {refundable}"
+                continue
+
+            payment_id, currency, status_id = charge
+            full = amount == refundable
+            ledger.append(Payment(
+                order_id=order_id,
+                payment_date=now,
+                payment_method='Refund',
+                payment_status_id=refunded_status_id,
+                payment_amount=amount,
+                currency=currency,
+                transaction_id=req.idempotency_key or f"RF-{order_id}-{uuid.uuid4().hex[:16]}",
+            ))
+            target_id = refunded_status_id if full else partial_status_id
+            if status_id != target_id and (status_id, target_id) in PaymentStatusTransition.allowed_pairs():
+                charge_updates[(status_id, target_id)].append(payment_id)
+            if full:
+                fully_refunded.append(order_id)
+            amounts[order_id] = amount
+            if req.items:
+                refund_lines[ledger[-1].transaction_id] = (order_id, req.items)
+
+        if not ledger:
+            return
+
+        # Step 5: Ledger rows, original charges and orders, still under the order locks
+        refunded_order_id = OrderStatusType.id_for('Refunded')
+        order_from_ids = [src for src, dst in OrderStatusTransition.allowed_pairs() if dst == refunded_order_id]
+        Payment.objects.bulk_create(ledger)
+        if refund_lines:
+            payment_ids = dict(Payment.objects.filter(
+                transaction_id__in=list(refund_lines)
+            ).values_list('transaction_id', 'id'))
+            RefundItem.objects.bulk_create([
+                RefundItem(payment_id=payment_ids[tx], order_id=order_id, product_id=pid, quantity=qty)
+                for tx, (order_id, items) in refund_lines.items() for pid, qty in items.items()
+            ])
+        deltas = [PaymentRollupService.deltas_for(ledger)]
+        for (from_id, to_id), payment_ids in charge_updates.items():
+            qs = Payment.objects.filter(id__in=payment_ids, payment_status_id=from_id)
+            deltas.append(PaymentRollupService.deltas_for_move(qs, to_id))
+            qs.update(payment_status_id=to_id, updated_at=now)
+        PaymentRollupService.apply_deltas(*deltas)
+        if fully_refunded:
+            Order.objects.filter(id__in=fully_refunded, order_status_id__in=order_from_ids).update(
+                order_status_id=refunded_order_id
+            )
+        OrderSummaryService.refresh(amounts.keys())
+        result.refunded.update(amounts)
@@ -0,0 +1,179 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+from django.db import transaction, IntegrityError
+from django.db.models import Count, F, Sum, QuerySet
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .currency import CurrencyService
+from .models import Payment, PaymentRollup
+
+# (bucket_date, bucket_hour, payment_method, payment_status_id, currency)
+RollupKey = Tuple[date, int, str, int, str]
+# RollupKey -> (payment count delta, amount delta)
+RollupDeltas = Dict[RollupKey, Tuple[int, Decimal]]
+
+
+class PaymentRollupService:
+    """
+    Maintains the PaymentRollup table incrementally (replaces query-time aggregation over
+    vw_PaymentSummary for finance dashboards).
+
+    Writers compute deltas for the payments they insert or move between statuses and apply
+    them in the same transaction: one guarded UPDATE per touched bucket, or an INSERT for a
+    new bucket. rebuild() recomputes a date range from Payments for backfills and repairs.
+    """
+
+    GROUP_FIELDS = {
+        'date': 'bucket_date',
+        'hour': 'bucket_hour',
+        'method': 'payment_method',
+        'status': 'payment_status_id',
+        'currency': 'currency',
+    }
+
+    @staticmethod
+    def key(payment_date: datetime, method: str, status_id: int, currency: str) -> RollupKey:
+        local = timezone.localtime(payment_date) if timezone.is_aware(payment_date) else payment_date
+        return local.date(), local.hour, method, status_id, currency.strip().upper()
+
+    @classmethod
+    def deltas_for(cls, payments: Iterable[Payment], sign: int = 1) -> RollupDeltas:
+        """Deltas for payment instances in their current status (sign=-1 removes them)."""
+        deltas: RollupDeltas = {}
+        for p in payments:
+            if p.payment_status_id is None:
+                continue
+            k = cls.key(p.payment_date, p.payment_method, p.payment_status_id, p.currency)
+            count, amount = deltas.get(k, (0, Decimal('0.00')))
+            deltas[k] = (count + sign, amount + sign * p.payment_amount)
+        return deltas
+
+    @classmethod
+    def deltas_for_move(cls, payments: QuerySet, to_status_id: int) -> RollupDeltas:
+        """
+        Deltas for moving the payments in a queryset to another status, computed with one
+        grouped query. Call it before the UPDATE, with the same status guard as the UPDATE.
+        """
+        deltas: RollupDeltas = defaultdict(lambda: (0, Decimal('0.00')))
+        for row in cls._grouped(payments):
+            from_key = cls.key(row['bucket'], row['payment_method'], row['payment_status_id'], row['currency'])
+            to_key = from_key[:3] + (to_status_id,) + from_key[4:]
+            for k, sign in ((from_key, -1), (to_key, 1)):
+                count, amount = deltas[k]
+                deltas[k] = (count + sign * row['n'], amount + sign * row['amount'])
+        return dict(deltas)
+
+    @classmethod
+    def apply_deltas(cls, *deltas: RollupDeltas) -> None:
+        """Applies one or more delta maps; must run inside the writer's transaction."""
+        merged: Dict[RollupKey, Tuple[int, Decimal]] = {}
+        for d in deltas:
+            for k, (count, amount) in d.items():
+                c, a = merged.get(k, (0, Decimal('0.00')))
+                merged[k] = (c + count, a + amount)
+
+        now = timezone.now()
+        # Sorted keys give concurrent writers the same lock order
+        for k in sorted(merged):
+            count, amount = merged[k]
+            if count == 0 and amount == 0:
+                continue
+            bucket = cls._bucket(k)
+            if bucket.update(payment_count=F('payment_count') + count,
+                             total_amount=F('total_amount') + amount, updated_at=now):
+                continue
+            try:
+                with transaction.atomic():
+                    PaymentRollup.objects.create(
+                        bucket_date=k[0], bucket_hour=k[1], payment_method=k[2], payment_status_id=k[3],
+                        currency=k[4], payment_count=count, total_amount=amount, updated_at=now,
+                    )
+            except IntegrityError:
+                # A concurrent writer created the bucket first
+                bucket.update(payment_count=F('payment_count') + count,
+                              total_amount=F('total_amount') + amount, updated_at=now)
+
+    @classmethod
+    def rebuild(cls, start: date, end: date) -> int:
+        """
+        Recomputes the rollup for payment dates in [start, end), one day per transaction.
+
+        Returns:
+            Number of rollup rows written
+        """
+        written = 0
+        day = start
+        while day < end:
+            lower = timezone.make_aware(datetime.combine(day, time.min))
+            rows: List[PaymentRollup] = []
+            now = timezone.now()
+            for row in cls._grouped(Payment.objects.filter(payment_date__gte=lower,
+                                                           payment_date__lt=lower + timedelta(days=1))):
+                k = cls.key(row['bucket'], row['payment_method'], row['payment_status_id'], row['currency'])
+                rows.append(PaymentRollup(
+                    bucket_date=k[0], bucket_hour=k[1], payment_method=k[2], payment_status_id=k[3],
+                    currency=k[4], payment_count=row['n'], total_amount=row['amount'], updated_at=now,
+                ))
+            with transaction.atomic():
+                PaymentRollup.objects.filter(bucket_date=day).delete()
+                PaymentRollup.objects.bulk_create(rows)
+            written += len(rows)
+            day += timedelta(days=1)
+        return written
+
+    @classmethod
+    def totals(cls, start: date, end: date, group_by: Iterable[str] = ('date',),
+               convert_to: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Dashboard totals for [start, end) grouped by any of: date, hour, method, status, currency.
+
+        Args:
+            convert_to: Sum amounts in this currency, converting each day at that day's rate;
+                without it amounts are never summed across currencies, so rows are always
+                also grouped by currency
+
+        Returns:
+            List of dicts with the group columns, payment_count and total_amount
+        """
+        fields = [cls.GROUP_FIELDS[g] for g in group_by]
+        qs = PaymentRollup.objects.filter(bucket_date__gte=start, bucket_date__lt=end)
+        if convert_to is None:
+            if 'currency' not in fields:
+                fields.append('currency')
+            return list(
+                qs.values(*fields)
+                .annotate(payment_count=Sum('payment_count'), total_amount=Sum('total_amount'))
+                .order_by(*fields)
+            )
+
+        # Convert at (day, currency) grain, then fold into the requested groups
+        fine = sorted(set(fields) | {'bucket_date', 'currency'})
+        rows = list(qs.values(*fine).annotate(payment_count=Sum('payment_count'), total_amount=Sum('total_amount')))
+        CurrencyService.convert_rows(rows, 'total_amount', 'currency', convert_to, date_key='bucket_date')
+        grouped: Dict[Tuple, Dict[str, Any]] = {}
+        for row in rows:
+            k = tuple(row[f] for f in fields)
+            acc = grouped.setdefault(k, dict(zip(fields, k), payment_count=0, total_amount=Decimal('0.00')))
+            acc['payment_count'] += row['payment_count']
+            acc['total_amount'] += row['total_amount']
+        return [grouped[k] for k in sorted(grouped)]
+
+    @staticmethod
+    def _grouped(payments: QuerySet) -> QuerySet:
+        return (
+            payments.exclude(payment_status_id=None)
+            .annotate(bucket=TruncHour('payment_date'))
+            .values('bucket', 'payment_method', 'payment_status_id', 'currency')
+            .annotate(n=Count('id'), amount=Sum('payment_amount'))
+            .order_by()
+        )
+
+    @staticmethod
+    def _bucket(k: RollupKey) -> QuerySet:
+        return PaymentRollup.objects.filter(
+            bucket_date=k[0], bucket_hour=k[1], payment_method=k[2], payment_status_id=k[3], currency=k[4]
+        )
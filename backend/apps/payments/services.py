@@ -0,0 +1,200 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from decimal import Decimal
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction, IntegrityError
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .gateways import PaymentGateway
+from .models import Payment, PaymentStatusType, PaymentStatusTransition
+from .rollups import PaymentRollupService
+from apps.orders.models import Order
+from apps.orders.services import OrderSummaryService
+
+logger = logging.getLogger(__name__)
+
+
+class PaymentService:
+    """
+    Service for payment writes. Status changes are validated against the
+    PaymentStatusTransitions matrix (ADR-006) before they are applied.
+
+    Gateway calls run on a per-process asyncio loop in a background thread, so a
+    checkout request returns as soon as the Pending payment is recorded. The client's
+    idempotency key is stored as transaction_ID, whose unique index dedupes retries.
+    """
+
+    _gateway: Optional[PaymentGateway] = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _loop_lock = threading.Lock()
+    _semaphore: Optional[asyncio.Semaphore] = None
+
+    @classmethod
+    def create_payment(cls, order_id: int, method: str, amount: Decimal,
+                       currency: str, transaction_id: str) -> Payment:
+        """
+        Registers a new Pending payment for an order.
+
+        Raises:
+            ValidationError: If the order does not exist or the amount is negative
+        """
+        if amount < 0:
+            raise ValidationError("Payment amount cannot be negative")
+        if not Order.objects.filter(id=order_id).exists():
+            raise ValidationError("Order not found")
+
+        with transaction.atomic():
+            payment = Payment.objects.create(
+                order_id=order_id,
+                payment_date=timezone.now(),
+                payment_method=method,
+                payment_status_id=PaymentStatusType.id_for('Pending'),
+                payment_amount=amount,
+                currency=currency.upper(),
+                transaction_id=transaction_id,
+            )
+            PaymentRollupService.apply_deltas(PaymentRollupService.deltas_for([payment]))
+            OrderSummaryService.refresh([order_id])
+        return payment
+
+    @classmethod
+    def update_status(cls, payment_id: int, new_status_key: str) -> Payment:
+        """
+        Moves a payment to a new status if the transition matrix allows it.
+
+        Raises:
+            ValidationError: If the payment does not exist or the transition is not allowed
+        """
+        new_status_id = PaymentStatusType.id_for(new_status_key)
+        with transaction.atomic():
+            try:
+                payment = Payment.objects.select_for_update().get(id=payment_id)
+            except Payment.DoesNotExist:
+                raise ValidationError("Payment not found")
+
+            if not PaymentStatusTransition.is_allowed_transition(payment.payment_status_id, new_status_id):
+                raise ValidationError(
+                    f"Payment status transition to '{new_status_key}' is not allowed"
+                )
+
+            removed = PaymentRollupService.deltas_for([payment], sign=-1)
+            payment.payment_status_id = new_status_id
+            payment.save(update_fields=['payment_status', 'updated_at'])
+            PaymentRollupService.apply_deltas(removed, PaymentRollupService.deltas_for([payment]))
+            OrderSummaryService.refresh([payment.order_id])
+        return payment
+
+    @classmethod
+    def submit_payment(cls, order_id: int, method: str, amount: Decimal,
+                       currency: str, idempotency_key: str) -> Payment:
+        """
+        Records a payment and charges it through the gateway in the background.
+        Retrying with the same idempotency key returns the existing payment and never
+        creates a second one; an unfinished charge is dispatched again. The charge is
+        dispatched only once the caller's transaction commits.
+
+        Returns:
+            The payment as recorded; poll it (or the order summary) for the final status
+
+        Raises:
+            ValidationError: If the order does not exist, the amount is negative or the key
+                belongs to a payment for another order, amount or currency
+        """
+        payment = Payment.objects.filter(transaction_id=idempotency_key).first()
+        if payment is None:
+            try:
+                payment = cls.create_payment(order_id, method, amount, currency, idempotency_key)
+            except IntegrityError:
+                # A concurrent retry with the same key won the insert
+                payment = Payment.objects.get(transaction_id=idempotency_key)
+        if payment.order_id != order_id:
+            raise ValidationError("Idempotency key was already used for another order")
+        if payment.payment_amount != amount or payment.currency != currency.upper():
+            raise ValidationError("Idempotency key was already used for another amount or currency")
+
+        if payment.payment_status_id in cls._unfinished_status_ids():
+            # Inside an outer atomic() the background loop must not see an uncommitted payment
+            payment_id = payment.id
+            transaction.on_commit(lambda: cls._dispatch(payment_id))
+        return payment
+
+    @classmethod
+    async def process_payment(cls, payment_id: int) -> Payment:
+        """
+        Charges a Pending payment and applies Processing -> Completed/Failed.
+        Safe to await directly from async views; submit_payment() schedules it in the background.
+        """
+        payment = await sync_to_async(cls._start_processing)(payment_id)
+        if payment is None:
+            return await sync_to_async(Payment.objects.get)(id=payment_id)
+
+        result = await cls.gateway().charge(
+            payment.transaction_id, payment.payment_amount, payment.currency, payment.payment_method
+        )
+        return await sync_to_async(cls._finish_processing)(
+            payment_id, 'Completed' if result.approved else 'Failed'
+        )
+
+    @classmethod
+    def gateway(cls) -> PaymentGateway:
+        if cls._gateway is None:
+            gateway_path = getattr(settings, 'PAYMENT_GATEWAY', 'apps.payments.gateways.StubGateway')
+            cls._gateway = import_string(gateway_path)()
+        return cls._gateway
+
+    @staticmethod
+    def _unfinished_status_ids() -> set:
+        return {PaymentStatusType.id_for('Pending'), PaymentStatusType.id_for('Processing')}
+
+    @classmethod
+    def _start_processing(cls, payment_id: int) -> Optional[Payment]:
+        """Moves Pending -> Processing; returns None if the payment is already finished."""
+        payment = Payment.objects.get(id=payment_id)
+        if payment.payment_status_id == PaymentStatusType.id_for('Pending'):
+            return cls.update_status(payment_id, 'Processing')
+        if payment.payment_status_id == PaymentStatusType.id_for('Processing'):
+            # Resumed after a lost response; the gateway dedupes on the idempotency key
+            return payment
+        return None
+
+    @classmethod
+    def _finish_processing(cls, payment_id: int, status_key: str) -> Payment:
+        payment = Payment.objects.get(id=payment_id)
+        if payment.payment_status_id != PaymentStatusType.id_for('Processing'):
+            # A concurrent dispatch of the same payment has already applied the result
+            return payment
+        return cls.update_status(payment_id, status_key)
+
+    @classmethod
+    def _dispatch(cls, payment_id: int) -> None:
+        future = asyncio.run_coroutine_threadsafe(cls._process_bounded(payment_id), cls._event_loop())
+        future.add_done_callback(lambda f: cls._log_failure(payment_id, f))
+
+    @classmethod
+    async def _process_bounded(cls, payment_id: int) -> Payment:
+        if cls._semaphore is None:
+            # Created on the loop thread so it binds to the gateway loop
+            cls._semaphore = asyncio.Semaphore(getattr(settings, 'PAYMENT_GATEWAY_CONCURRENCY', 100))
+        async with cls._semaphore:
+            return await cls.process_payment(payment_id)
+
+    @classmethod
+    def _event_loop(cls) -> asyncio.AbstractEventLoop:
+        with cls._loop_lock:
+            if cls._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name='payment-gateway', daemon=True).start()
+                cls._loop = loop
+            return cls._loop
+
+    @staticmethod
+    def _log_failure(payment_id: int, future: Future) -> None:
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Gateway processing failed for payment %s", payment_id, exc_info=future.exception())
@@ -0,0 +1,27 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from apps.products.reviews import ReviewService
+
+
+class Command(BaseCommand):
+    help = "Imports syndicated product reviews from JSON Lines or CSV files (or stdin)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', help="Review files; reads stdin when omitted or '-'")
+        parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+
+    def handle(self, *args, **options):
+        for path in options['paths'] or ['-']:
+            if path == '-':
+                stats = ReviewService.import_file(sys.stdin, options['format'])
+            else:
+                with open(path, encoding='utf-8', newline='') as f:
+                    stats = ReviewService.import_file(f, options['format'])
+            self.stdout.write(self.style.SUCCESS(
+                f"{path}: {stats.received} reviews, {stats.inserted} inserted, {stats.updated} updated, "
+                f"{stats.rejected} rejected."
+            ))
+            for reason in stats.rejections:
+                self.stdout.write(self.style.WARNING(f"  {reason}"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.products.reviews import ReviewService
+
+
+class Command(BaseCommand):
+    help = "Recomputes ProductRatingSummary from the Review table in one pass."
+
+    def handle(self, *args, **options):
+        written = ReviewService.rebuild_summaries()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt rating summaries for {written} products."))
@@ -0,0 +1,87 @@
+from django.db import models
+
+from apps.accounts.models import User
+
+
+class Category(models.Model):
+    id = models.AutoField(primary_key=True, db_column='category_ID')
+    name = models.CharField(max_length=100, unique=True, db_column='category_NAME')
+    description = models.CharField(max_length=500, null=True, db_column='category_DESCRIPT')
+
+    class Meta:
+        managed = False
+        db_table = 'Categories'
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Vendor(models.Model):
+    id = models.AutoField(primary_key=True, db_column='ven_ID')
+    name = models.CharField(max_length=100, db_column='ven_NAME')
+    country = models.CharField(max_length=100, db_column='ven_COUNTRY')
+    description = models.CharField(max_length=500, null=True, db_column='ven_DESCRIPT')
+
+    class Meta:
+        managed = False
+        db_table = 'Vendors'
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Product(models.Model):
+    id = models.AutoField(primary_key=True, db_column='product_ID')
+    category = models.ForeignKey(Category, on_delete=models.DO_NOTHING, db_column='category_ID', related_name='products')
+    vendor = models.ForeignKey(Vendor, on_delete=models.DO_NOTHING, db_column='ven_ID', related_name='products')
+    name = models.CharField(max_length=255, db_column='product_NAME')
+    description = models.TextField(db_column='product_DESCRIPT')
+    price = models.DecimalField(max_digits=10, decimal_places=2, db_column='product_PRICE')
+    stock = models.IntegerField(db_column='product_STOCK')
+    created_at = models.DateTimeField(null=True, db_column='created_AT')
+    updated_at = models.DateTimeField(null=True, db_column='updated_AT')
+    is_featured = models.BooleanField(default=False, db_column='is_featured')
+    is_active = models.BooleanField(default=True, db_column='is_active')
+
+    class Meta:
+        managed = False
+        db_table = 'Products'
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class Review(models.Model):
+    id = models.AutoField(primary_key=True, db_column='rew_ID')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_column='user_ID', related_name='reviews')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, db_column='product_ID', related_name='reviews')
+    rating = models.IntegerField(db_column='rew_RATING')
+    comment = models.CharField(max_length=1000, null=True, db_column='rew_COMMENT')
+    review_date = models.DateTimeField(null=True, db_column='rew_DATE')
+
+    class Meta:
+        managed = False
+        db_table = 'Review'
+        unique_together = (('user', 'product'),)
+
+
+class ProductRatingSummary(models.Model):
+    """Per-product review aggregate (05_read_models.sql), maintained by ReviewService."""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True,
+                                   db_column='product_ID', related_name='rating_summary')
+    review_count = models.IntegerField(default=0, db_column='review_COUNT')
+    rating_sum = models.IntegerField(default=0, db_column='rating_SUM')
+    rating_1 = models.IntegerField(default=0, db_column='rating_1')
+    rating_2 = models.IntegerField(default=0, db_column='rating_2')
+    rating_3 = models.IntegerField(default=0, db_column='rating_3')
+    rating_4 = models.IntegerField(default=0, db_column='rating_4')
+    rating_5 = models.IntegerField(default=0, db_column='rating_5')
+    updated_at = models.DateTimeField(db_column='updated_AT')
+
+    class Meta:
+        managed = False
+        db_table = 'ProductRatingSummary'
+
+    @property
+    def average(self):
+        return self.rating_sum / self.review_count if self.review_count else None
@@ -0,0 +1,425 @@
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import datetime, timezone as dt_timezone
+from itertools import islice
+from typing import Optional, List, Dict, Any, Iterable, Iterator, TextIO, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction, IntegrityError
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import Product, Review, ProductRatingSummary
+from apps.accounts.audit import BusinessAuditWriter
+from apps.accounts.models import User, BusinessAuditLog
+
+
+@dataclass
+class ReviewRow:
+    """One review to write, e.g. a line of a marketplace syndication feed."""
+    user_id: int
+    product_id: int
+    rating: int
+    comment: Optional[str] = None
+
+
+@dataclass
+class ImportStats:
+    received: int = 0
+    inserted: int = 0
+    updated: int = 0
+    rejected: int = 0
+    rejections: List[str] = field(default_factory=list)
+
+    # Only the first few rejection reasons are kept so a bad feed cannot grow the stats unbounded
+    MAX_REJECTIONS = 100
+
+    def reject(self, reason: str) -> None:
+        self.rejected += 1
+        if len(self.rejections) < self.MAX_REJECTIONS:
+            self.rejections.append(reason)
+
+
+# (review ID, user ID, product ID, review date, previous rating or None for an insert)
+Merged = Tuple[int, int, int, datetime, Optional[int]]
+
+
+class ReviewService:
+    """
+    Review writes and reads (replaces sp_AddProductReview / the review part of sp_GetProductDetails).
+
+    A write is a single upsert statement that also hands back the review ID and the previous
+    rating: MERGE ... OUTPUT on MSSQL, a PL/SQL block with RETURNING ... INTO on Oracle. The
+    ID goes to the batched BusinessAuditWriter, so no statement re-reads Review for the audit
+    record. Every write adjusts ProductRatingSummary in the same transaction, so listing pages
+    read ratings from one narrow row per product and never aggregate Review. Review text is
+    served page by page with a (rew_DATE, rew_ID) keyset over IX_Review_Product_Date.
+    """
+
+    REBUILD_BATCH_SIZE = 1000
+    # Keeps the IN (...) lists well below the MSSQL (2100) and Oracle (1000) bind limits
+    CHUNK_SIZE = 500
+    # 4 binds per MERGE source row stays below the MSSQL 2100 parameter limit
+    MERGE_CHUNK_SIZE = 500
+    AUDIT_CONTEXT = 'Product review management'
+
+    @classmethod
+    def upsert_review(cls, user_id: int, product_id: int, rating: int,
+                      comment: Optional[str] = None) -> Review:
+        """
+        Adds a review or replaces the user's existing review of the product.
+
+        Raises:
+            ValidationError: If the rating is out of range or the product does not exist
+        """
+        if rating is None or not 1 <= rating <= 5:
+            raise ValidationError("Rating must be between 1 and 5")
+        if not Product.objects.filter(id=product_id).exists():
+            raise ValidationError("Invalid or non-existent product ID")
+
+        row = ReviewRow(user_id, product_id, rating, comment)
+        with transaction.atomic():
+            if connection.vendor == 'oracle':
+                merged = [cls._merge_oracle(row)]
+            else:
+                merged = cls._merge([row])
+            cls._after_merge([row], merged)
+        review_id, _, _, review_date, _ = merged[0]
+        return Review(id=review_id, user_id=user_id, product_id=product_id, rating=rating,
+                      comment=comment, review_date=review_date)
+
+    @classmethod
+    def import_reviews(cls, rows: Iterable[ReviewRow], stats: Optional[ImportStats] = None) -> ImportStats:
+        """
+        Bulk upsert for syndication feeds, one transaction per chunk. Within a chunk the last
+        row per (user, product) wins; rows with an unknown user or product or a rating outside
+        1-5 are rejected.
+
+        Args:
+            rows: Reviews to write
+            stats: Stats to accumulate into (e.g. already holding rejected malformed rows)
+
+        Returns:
+            ImportStats with counts of received, inserted, updated and rejected rows
+        """
+        stats = stats if stats is not None else ImportStats()
+        iterator = iter(rows)
+        while True:
+            chunk = list(islice(iterator, cls.MERGE_CHUNK_SIZE))
+            if not chunk:
+                return stats
+            stats.received += len(chunk)
+            cls._import_chunk(chunk, stats)
+
+    @classmethod
+    def import_file(cls, stream: TextIO, fmt: str = 'jsonl') -> ImportStats:
+        """
+        Imports reviews from a JSON Lines or CSV stream (columns as in ReviewRow).
+
+        Malformed rows are counted as rejected and skipped; the rest of the feed is still imported.
+        """
+        if fmt == 'jsonl':
+            rows: Iterator[Any] = (line for line in stream if line.strip())
+        elif fmt == 'csv':
+            rows = csv.DictReader(stream)
+        else:
+            raise ValidationError(f"Unsupported review format: {fmt}")
+        stats = ImportStats()
+
+        def reviews() -> Iterator[ReviewRow]:
+            for row_no, row in enumerate(rows, start=1):
+                try:
+                    review = cls._parse(json.loads(row) if fmt == 'jsonl' else row)
+                except KeyError as e:
+                    reason = f"missing field {e.args[0]!r}"
+                except (ValueError, TypeError, AttributeError) as e:
+                    # Undecodable JSON, a non-object row, a null field or a non-integer ID/rating
+                    reason = f"malformed row ({e})"
+                else:
+                    yield review
+                    continue
+                stats.received += 1
+                stats.reject(f"row {row_no}: {reason}")
+
+        return cls.import_reviews(reviews(), stats)
+
+    @staticmethod
+    def _parse(row: Dict[str, Any]) -> ReviewRow:
+        return ReviewRow(int(row['user_id']), int(row['product_id']), int(row['rating']), row.get('comment') or None)
+
+    @classmethod
+    def apply_rating_change(cls, product_id: int, old_rating: Optional[int], new_rating: Optional[int]) -> None:
+        """
+        Adjusts the product's aggregate for one review: old_rating=None is an insert,
+        new_rating=None a delete. Runs inside the writer's transaction.
+        """
+        cls.apply_rating_changes([(product_id, old_rating, new_rating)])
+
+    @staticmethod
+    def apply_rating_changes(changes: Iterable[Tuple[int, Optional[int], Optional[int]]]) -> None:
+        """
+        Batched apply_rating_change: the changes are folded per product first, so every
+        touched product costs one UPDATE (or one INSERT for its first review).
+        """
+        deltas: Dict[int, Dict[str, int]] = {}
+        for product_id, old_rating, new_rating in changes:
+            if old_rating == new_rating:
+                continue
+            d = deltas.setdefault(product_id, {'review_count': 0, 'rating_sum': 0})
+            if old_rating is not None:
+                d[f'rating_{old_rating}'] = d.get(f'rating_{old_rating}', 0) - 1
+            if new_rating is not None:
+                d[f'rating_{new_rating}'] = d.get(f'rating_{new_rating}', 0) + 1
+            d['review_count'] += (new_rating is not None) - (old_rating is not None)
+            d['rating_sum'] += (new_rating or 0) - (old_rating or 0)
+
+        now = timezone.now()
+        # Sorted IDs give concurrent writers the same lock order
+        for product_id in sorted(deltas):
+            d = {name: delta for name, delta in deltas[product_id].items() if delta}
+            if not d:
+                continue
+            updates = {name: F(name) + delta for name, delta in d.items()}
+            summary = ProductRatingSummary.objects.filter(product_id=product_id)
+            if summary.update(updated_at=now, **updates):
+                continue
+            try:
+                with transaction.atomic():
+                    ProductRatingSummary.objects.create(
+                        product_id=product_id, updated_at=now,
+                        **{name: max(delta, 0) for name, delta in d.items()},
+                    )
+            except IntegrityError:
+                # A concurrent writer created the row first
+                summary.update(updated_at=now, **updates)
+
+    @classmethod
+    def ratings_for(cls, product_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Rating count, average and 1-5 histogram for listing pages, without touching Review.
+        Products without reviews are omitted.
+        """
+        ids = sorted(set(product_ids))
+        ratings: Dict[int, Dict[str, Any]] = {}
+        for i in range(0, len(ids), cls.CHUNK_SIZE):
+            for s in ProductRatingSummary.objects.filter(product_id__in=ids[i:i + cls.CHUNK_SIZE], review_count__gt=0):
+                ratings[s.product_id] = {
+                    'count': s.review_count,
+                    'average': round(s.average, 2),
+                    'histogram': [s.rating_1, s.rating_2, s.rating_3, s.rating_4, s.rating_5],
+                }
+        return ratings
+
+    @staticmethod
+    def list_reviews(product_id: int, before: Optional[Tuple[datetime, int]] = None,
+                     limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        A page of a product's reviews, newest first.
+
+        Args:
+            before: Keyset cursor (review_date, review_id) of the last row of the previous page
+        """
+        qs = Review.objects.filter(product_id=product_id)
+        if before is not None:
+            review_date, review_id = before
+            qs = qs.filter(Q(review_date__lt=review_date) | Q(review_date=review_date, id__lt=review_id))
+        return list(
+            qs.order_by('-review_date', '-id')
+            .values('id', 'user_id', 'user__name', 'rating', 'comment', 'review_date')[:limit]
+        )
+
+    @classmethod
+    def rebuild_summaries(cls) -> int:
+        """
+        Recomputes ProductRatingSummary with a single grouped pass over Review, streaming the
+        per-product rows into batched inserts.
+
+        Returns:
+            Number of products with reviews
+        """
+        rows = (
+            Review.objects.values('product_id')
+            .annotate(
+                review_count=Count('id'),
+                rating_sum=Sum('rating'),
+                **{f'rating_{r}': Count('id', filter=Q(rating=r)) for r in range(1, 6)},
+            )
+            .order_by()
+            .iterator(chunk_size=cls.REBUILD_BATCH_SIZE)
+        )
+        now = timezone.now()
+        written = 0
+        with transaction.atomic():
+            ProductRatingSummary.objects.all().delete()
+            batch: List[ProductRatingSummary] = []
+            for row in rows:
+                batch.append(ProductRatingSummary(updated_at=now, **row))
+                if len(batch) >= cls.REBUILD_BATCH_SIZE:
+                    ProductRatingSummary.objects.bulk_create(batch)
+                    written += len(batch)
+                    batch = []
+            if batch:
+                ProductRatingSummary.objects.bulk_create(batch)
+                written += len(batch)
+        return written
+
+    @classmethod
+    def _import_chunk(cls, chunk: List[ReviewRow], stats: ImportStats) -> None:
+        # Step 1: Validate ratings and keep the last row per (user, product)
+        rows: Dict[Tuple[int, int], ReviewRow] = {}
+        for row in chunk:
+            if row.rating is None or not 1 <= row.rating <= 5:
+                stats.reject(f"user {row.user_id}, product {row.product_id}: rating must be between 1 and 5")
+                continue
+            rows[(row.user_id, row.product_id)] = row
+
+        # Step 2: Drop rows for unknown users or products (one query each)
+        users = set(User.objects.filter(id__in={u for u, _ in rows}).values_list('id', flat=True))
+        products = set(Product.objects.filter(id__in={p for _, p in rows}).values_list('id', flat=True))
+        valid: List[ReviewRow] = []
+        for (user_id, product_id), row in rows.items():
+            if user_id not in users:
+                stats.reject(f"user {user_id}, product {product_id}: unknown user")
+            elif product_id not in products:
+                stats.reject(f"user {user_id}, product {product_id}: unknown product")
+            else:
+                valid.append(row)
+        if not valid:
+            return
+
+        # Step 3: Upsert, aggregates and audit in one transaction
+        with transaction.atomic():
+            merged = cls._merge(valid)
+            cls._after_merge(valid, merged)
+        inserted = sum(1 for *_, old_rating in merged if old_rating is None)
+        stats.inserted += inserted
+        stats.updated += len(merged) - inserted
+
+    @classmethod
+    def _merge(cls, rows: List[ReviewRow]) -> List[Merged]:
+        """Upserts rows with distinct (user, product) keys; returns one Merged per row."""
+        if connection.vendor == 'microsoft':
+            return cls._merge_mssql(rows)
+        return cls._merge_orm(rows)
+
+    @staticmethod
+    def _merge_mssql(rows: List[ReviewRow]) -> List[Merged]:
+        values = ', '.join(['(%s, %s, %s, %s)'] * len(rows))
+        params = [p for r in rows for p in (r.user_id, r.product_id, r.rating, r.comment)]
+        with connection.cursor() as cursor:
+            # HOLDLOCK keeps concurrent MERGEs of the same key from both taking the INSERT branch
+            cursor.execute(
+                "MERGE dbo.Review WITH (HOLDLOCK) AS t "
+                f"USING (VALUES {values}) AS s (user_ID, product_ID, rew_RATING, rew_COMMENT) "
+                "ON t.user_ID = s.user_ID AND t.product_ID = s.product_ID "
+                "WHEN MATCHED THEN UPDATE SET "
+                "rew_RATING = s.rew_RATING, rew_COMMENT = s.rew_COMMENT, rew_DATE = SYSUTCDATETIME() "
+                "WHEN NOT MATCHED THEN INSERT (user_ID, product_ID, rew_RATING, rew_COMMENT, rew_DATE) "
+                "VALUES (s.user_ID, s.product_ID, s.rew_RATING, s.rew_COMMENT, SYSUTCDATETIME()) "
+                "OUTPUT inserted.rew_ID, inserted.user_ID, inserted.product_ID, inserted.rew_DATE, deleted.rew_RATING;",
+                params,
+            )
+            output = cursor.fetchall()
+        return [
+            (review_id, user_id, product_id,
+             timezone.make_aware(review_date, dt_timezone.utc) if timezone.is_naive(review_date) else review_date,
+             old_rating)
+            for review_id, user_id, product_id, review_date, old_rating in output
+        ]
+
+    @staticmethod
+    def _merge_oracle(row: ReviewRow) -> Merged:
+        # Oracle's MERGE has no RETURNING clause, so the upsert is one anonymous block whose
+        # INSERT branch returns the trigger-assigned ID (TRG_REVIEWS_BI) into a bind variable.
+        # The trailing newline keeps the block's final ';', which PL/SQL requires.
+        now = timezone.now()
+        with connection.cursor() as cursor:
+            review_id, old_rating = cursor.var(int), cursor.var(int)
+            cursor.execute(
+                "DECLARE\n"
+                "  v_id  Review.rew_ID%%TYPE;\n"
+                "  v_old Review.rew_RATING%%TYPE;\n"
+                "BEGIN\n"
+                "  BEGIN\n"
+                "    SELECT rew_ID, rew_RATING INTO v_id, v_old FROM Review\n"
+                "     WHERE user_ID = %s AND product_ID = %s FOR UPDATE;\n"
+                "    UPDATE Review SET rew_RATING = %s, rew_COMMENT = %s, rew_DATE = %s WHERE rew_ID = v_id;\n"
+                "  EXCEPTION WHEN NO_DATA_FOUND THEN\n"
+                "    INSERT INTO Review (user_ID, product_ID, rew_RATING, rew_COMMENT, rew_DATE)\n"
+                "    VALUES (%s, %s, %s, %s, %s) RETURNING rew_ID INTO v_id;\n"
+                "  END;\n"
+                "  %s := v_id;\n"
+                "  %s := v_old;\n"
+                "END;\n",
+                [row.user_id, row.product_id, row.rating, row.comment, now,
+                 row.user_id, row.product_id, row.rating, row.comment, now,
+                 review_id, old_rating],
+            )
+            return review_id.getvalue(), row.user_id, row.product_id, now, old_rating.getvalue()
+
+    @staticmethod
+    def _merge_orm(rows: List[ReviewRow]) -> List[Merged]:
+        # Set-based fallback (Oracle bulk imports, other backends): one locking read, one
+        # bulk UPDATE and one multi-row INSERT per chunk.
+        now = timezone.now()
+        keys = {(r.user_id, r.product_id) for r in rows}
+        existing: Dict[Tuple[int, int], Tuple[int, int]] = {
+            (user_id, product_id): (review_id, rating)
+            for review_id, user_id, product_id, rating in Review.objects.select_for_update().filter(
+                user_id__in={u for u, _ in keys}, product_id__in={p for _, p in keys}
+            ).values_list('id', 'user_id', 'product_id', 'rating')
+            if (user_id, product_id) in keys
+        }
+
+        updates = [
+            Review(id=existing[(r.user_id, r.product_id)][0], rating=r.rating, comment=r.comment, review_date=now)
+            for r in rows if (r.user_id, r.product_id) in existing
+        ]
+        creates = [
+            Review(user_id=r.user_id, product_id=r.product_id, rating=r.rating, comment=r.comment, review_date=now)
+            for r in rows if (r.user_id, r.product_id) not in existing
+        ]
+        if updates:
+            Review.objects.bulk_update(updates, ['rating', 'comment', 'review_date'])
+        new_ids: Dict[Tuple[int, int], int] = {}
+        if creates:
+            Review.objects.bulk_create(creates)
+            new_ids = {(r.user_id, r.product_id): r.id for r in creates if r.id is not None}
+            if len(new_ids) < len(creates):
+                # Oracle's bulk INSERT does not hand back trigger-assigned IDs
+                new_ids.update({
+                    (user_id, product_id): review_id
+                    for review_id, user_id, product_id in Review.objects.filter(
+                        user_id__in={r.user_id for r in creates}, product_id__in={r.product_id for r in creates}
+                    ).values_list('id', 'user_id', 'product_id')
+                    if (user_id, product_id) in keys and (user_id, product_id) not in existing
+                })
+
+        merged: List[Merged] = []
+        for r in rows:
+            key = (r.user_id, r.product_id)
+            if key in existing:
+                review_id, old_rating = existing[key]
+                merged.append((review_id, r.user_id, r.product_id, now, old_rating))
+            else:
+                merged.append((new_ids[key], r.user_id, r.product_id, now, None))
+        return merged
+
+    @classmethod
+    def _after_merge(cls, rows: List[ReviewRow], merged: List[Merged]) -> None:
+        """Aggregate deltas and audit entries for a merged chunk; runs in the writer's transaction."""
+        ratings = {(r.user_id, r.product_id): r.rating for r in rows}
+        cls.apply_rating_changes(
+            (product_id, old_rating, ratings[(user_id, product_id)])
+            for _, user_id, product_id, _, old_rating in merged
+        )
+        BusinessAuditWriter.log_many([
+            BusinessAuditLog(
+                user_id=user_id, audit_timestamp=review_date, table_name='Review', operation='UPSERT',
+                record_id=str(review_id), column_name='rew_RATING',
+                old_value=str(old_rating) if old_rating is not None else None,
+                new_value=str(ratings[(user_id, product_id)]), business_context=cls.AUDIT_CONTEXT,
+            )
+            for review_id, user_id, product_id, review_date, old_rating in merged
+        ])
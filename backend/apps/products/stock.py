@@ -0,0 +1,210 @@
+import atexit
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Product
+
+
+@dataclass
+class _Hold:
+    items: Dict[int, int]
+    expires_at: float
+    # Pinned holds belong to an order being written and no longer expire
+    pinned: bool = False
+
+
+class StockReservationService:
+    """
+    Time-limited stock holds served from per-product in-memory counters.
+
+    Each worker claims stock from Products.product_STOCK in blocks with a conditional
+    UPDATE (product_STOCK >= claim), so the hot row is touched once per block instead of
+    once per order. Holds and commits are pure in-memory operations against the claimed
+    allotment; unused allotment goes back to the table on periodic reconciliation and at
+    shutdown. Because units leave product_STOCK before they can be held, the sum of all
+    holds can never exceed the stock in the database: the engine cannot oversell.
+    Callers pin a hold inside the transaction that writes its order, so an order is only
+    persisted together with a hold that can no longer expire.
+    A crashed worker under-reports its unused allotment until stock is recounted.
+    """
+
+    _allotted: Dict[int, int] = {}
+    _holds: Dict[str, _Hold] = {}
+    _lock = threading.Lock()
+    _last_reconcile = time.monotonic()
+
+    # Keeps the IN (...) lists well below the MSSQL (2100) and Oracle (1000) bind limits
+    RECONCILE_CHUNK_SIZE = 500
+    # Rounds of claiming when concurrent holds use up a fresh claim before it can be held
+    CLAIM_ATTEMPTS = 3
+
+    @classmethod
+    def reserve(cls, items: Dict[int, int], ttl_seconds: int = None) -> str:
+        """
+        Places a hold on the given {product_id: quantity} map.
+
+        Must be called outside a transaction: a claim from the database has to commit on
+        its own, otherwise a caller rollback would leave the in-memory counters ahead of
+        the table.
+
+        Returns:
+            Hold ID to pass to commit() or release()
+
+        Raises:
+            ValidationError: If any product does not have enough stock
+        """
+        if transaction.get_connection().in_atomic_block:
+            raise RuntimeError("StockReservationService.reserve() must not run inside a transaction")
+        if any(qty <= 0 for qty in items.values()):
+            raise ValidationError("Reserved quantity must be positive")
+        ttl = ttl_seconds if ttl_seconds is not None else getattr(settings, 'STOCK_HOLD_SECONDS', 900)
+
+        for _ in range(cls.CLAIM_ATTEMPTS):
+            with cls._lock:
+                cls._expire_holds()
+                shortfall = {
+                    pid: qty - cls._allotted.get(pid, 0)
+                    for pid, qty in items.items() if qty > cls._allotted.get(pid, 0)
+                }
+                if not shortfall:
+                    for pid, qty in items.items():
+                        cls._allotted[pid] -= qty
+                    hold_id = uuid.uuid4().hex
+                    cls._holds[hold_id] = _Hold(dict(items), time.monotonic() + ttl)
+                    break
+            # The database is only touched with the lock released
+            cls._claim(shortfall)
+        else:
+            raise ValidationError("Insufficient stock: concurrent orders took the available units")
+
+        cls._maybe_reconcile()
+        return hold_id
+
+    @classmethod
+    def pin(cls, hold_id: str) -> None:
+        """
+        Stops a hold from expiring. Call it inside the transaction that writes the order, so
+        the order only commits if its stock is still held; then commit() after it.
+
+        Raises:
+            ValidationError: If the hold is unknown or has expired
+        """
+        with cls._lock:
+            hold = cls._holds.get(hold_id)
+            if hold is None or (not hold.pinned and hold.expires_at < time.monotonic()):
+                if hold is not None:
+                    cls._return_to_allotment(cls._holds.pop(hold_id).items)
+                raise ValidationError("Stock reservation has expired")
+            hold.pinned = True
+
+    @classmethod
+    def commit(cls, hold_id: str) -> None:
+        """
+        Turns a hold into a sale. The units already left product_STOCK when they were
+        claimed, so no database write is needed here. Pinned holds are accepted even
+        after their TTL.
+
+        Raises:
+            ValidationError: If the hold is unknown or has expired unpinned
+        """
+        with cls._lock:
+            hold = cls._holds.pop(hold_id, None)
+            if hold is None or (not hold.pinned and hold.expires_at < time.monotonic()):
+                if hold is not None:
+                    cls._return_to_allotment(hold.items)
+                raise ValidationError("Stock reservation has expired")
+
+    @classmethod
+    def release(cls, hold_id: str) -> None:
+        """Returns a hold's units to the allotment. Unknown or expired holds are ignored."""
+        with cls._lock:
+            hold = cls._holds.pop(hold_id, None)
+            if hold is not None:
+                cls._return_to_allotment(hold.items)
+
+    @classmethod
+    def reconcile(cls) -> int:
+        """
+        Returns every idle allotted unit to Products.product_STOCK in batched UPDATEs.
+
+        Returns:
+            Number of products updated
+        """
+        with cls._lock:
+            cls._expire_holds()
+            idle = {pid: qty for pid, qty in cls._allotted.items() if qty > 0}
+            for pid in idle:
+                cls._allotted[pid] = 0
+            cls._last_reconcile = time.monotonic()
+
+        pids = sorted(idle)
+        try:
+            for i in range(0, len(pids), cls.RECONCILE_CHUNK_SIZE):
+                chunk = pids[i:i + cls.RECONCILE_CHUNK_SIZE]
+                Product.objects.filter(id__in=chunk).update(stock=F('stock') + Case(
+                    *[When(id=pid, then=Value(idle[pid])) for pid in chunk],
+                    default=Value(0), output_field=IntegerField(),
+                ))
+                for pid in chunk:
+                    idle.pop(pid)
+        finally:
+            # Units that could not be written back stay allotted to this worker
+            if idle:
+                with cls._lock:
+                    cls._return_to_allotment(idle)
+        return len(pids)
+
+    @classmethod
+    def _claim(cls, shortfall: Dict[int, int]) -> None:
+        """
+        Moves stock from the table into this worker's allotment. Called without _lock, so
+        other threads keep serving holds while the conditional UPDATEs run.
+        """
+        block = getattr(settings, 'STOCK_ALLOTMENT_BLOCK', 20)
+        stock = dict(Product.objects.filter(id__in=shortfall.keys()).values_list('id', 'stock'))
+        claimed: Dict[int, int] = {}
+        missing: List[int] = []
+        try:
+            for pid, need in shortfall.items():
+                # Never take more than a quarter of what is left, so other workers can still sell
+                wanted = max(need, min(block, stock.get(pid, 0) // 4))
+                for amount in dict.fromkeys((wanted, need)):
+                    if Product.objects.filter(id=pid, stock__gte=amount).update(stock=F('stock') - amount):
+                        claimed[pid] = amount
+                        break
+                else:
+                    missing.append(pid)
+        finally:
+            # Whatever left the table is this worker's now, even if a later product failed
+            with cls._lock:
+                cls._return_to_allotment(claimed)
+        if missing:
+            raise ValidationError(f"Insufficient stock for products: {sorted(missing)}")
+
+    @classmethod
+    def _return_to_allotment(cls, items: Dict[int, int]) -> None:
+        for pid, qty in items.items():
+            cls._allotted[pid] = cls._allotted.get(pid, 0) + qty
+
+    @classmethod
+    def _expire_holds(cls) -> None:
+        now = time.monotonic()
+        for hold_id in [h for h, hold in cls._holds.items() if not hold.pinned and hold.expires_at < now]:
+            cls._return_to_allotment(cls._holds.pop(hold_id).items)
+
+    @classmethod
+    def _maybe_reconcile(cls) -> None:
+        interval = getattr(settings, 'STOCK_RECONCILE_SECONDS', 30)
+        if time.monotonic() - cls._last_reconcile >= interval:
+            cls.reconcile()
+
+
+atexit.register(StockReservationService.reconcile)
@@ -0,0 +1,65 @@
+from django.db import models
+
+from apps.accounts.models import User
+from apps.products.models import Product
+
+
+class Promotion(models.Model):
+    id = models.AutoField(primary_key=True, db_column='promo_ID')
+    promo_code = models.CharField(max_length=50, unique=True, db_column='promo_CODE')
+    name = models.CharField(max_length=100, db_column='promo_NAME')
+    description = models.CharField(max_length=500, null=True, db_column='promo_DESCRIPT')
+    discount_type = models.CharField(max_length=10, db_column='discount_TYPE')
+    discount_value = models.DecimalField(max_digits=10, decimal_places=2, db_column='discount_VALUE')
+    min_purchase = models.DecimalField(max_digits=10, decimal_places=2, default=0, db_column='min_purchase')
+    valid_from = models.DateTimeField(db_column='valid_FROM')
+    valid_to = models.DateTimeField(db_column='valid_TO')
+    max_uses = models.IntegerField(null=True, db_column='max_USES')
+    current_uses = models.IntegerField(default=0, db_column='current_USES')
+    is_active = models.BooleanField(default=True, db_column='is_ACTIVE')
+    created_at = models.DateTimeField(null=True, db_column='created_AT')
+    created_by = models.ForeignKey(User, on_delete=models.DO_NOTHING, null=True,
+                                   db_column='created_BY', related_name='+')
+
+    class Meta:
+        managed = False
+        db_table = 'Promotions'
+
+    def __str__(self) -> str:
+        return self.promo_code
+
+
+class PromotionApplication(models.Model):
+    id = models.AutoField(primary_key=True, db_column='app_ID')
+    promo = models.ForeignKey(Promotion, on_delete=models.CASCADE, db_column='promo_ID', related_name='applications')
+    target_type = models.CharField(max_length=10, db_column='target_TYPE')
+    target_id = models.IntegerField(null=True, db_column='target_ID')
+
+    class Meta:
+        managed = False
+        db_table = 'PromotionApplications'
+
+
+class Wishlist(models.Model):
+    id = models.AutoField(primary_key=True, db_column='wishlist_ID')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_column='user_ID', related_name='wishlist')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, db_column='product_ID', related_name='+')
+    added_at = models.DateTimeField(null=True, db_column='added_AT')
+    notes = models.CharField(max_length=500, null=True, db_column='notes')
+
+    class Meta:
+        managed = False
+        db_table = 'Wishlist'
+        unique_together = (('user', 'product'),)
+
+
+class ProductWishlistCount(models.Model):
+    """Most-wishlisted counter per product (05_read_models.sql), maintained by WishlistService."""
+    product = models.OneToOneField(Product, on_delete=models.CASCADE, primary_key=True,
+                                   db_column='product_ID', related_name='wishlist_count')
+    wishlist_count = models.IntegerField(default=0, db_column='wishlist_COUNT')
+    updated_at = models.DateTimeField(db_column='updated_AT')
+
+    class Meta:
+        managed = False
+        db_table = 'ProductWishlistCounts'
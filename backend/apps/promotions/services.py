@@ -1,10 +1,12 @@
 from decimal import Decimal
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Tuple, Union
-from django.db import transaction
+from typing import Optional, List, Dict, Any, Tuple, Union, Iterable
+from django.db import transaction, IntegrityError
+from django.db.models import Count, F, Q
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 
-from .models import Promotion, PromotionApplication
+from .models import Promotion, PromotionApplication, Wishlist, ProductWishlistCount
 from apps.orders.models import Order, OrderItem
 from apps.products.models import Product, Category
 
@@ -138,5 +140,182 @@ class PromotionService:
 class WishlistService:
     """
     Service for handling wishlist-related business logic.
+    
+    Adds and removes are set-based: one existence query per chunk (served by
+    IX_Wishlist_UserID_Covering), one multi-row INSERT or DELETE, and one counter
+    adjustment per touched product in ProductWishlistCounts.
     """
-    # Implementation for wishlist management...
+    
+    # Keeps the IN (...) lists well below the MSSQL (2100) and Oracle (1000) bind limits
+    CHUNK_SIZE = 500
+    
+    @classmethod
+    def add_items(cls, user_id: int, product_ids: Iterable[int], notes: Optional[str] = None) -> List[int]:
+        """
+        Adds products to a user's wishlist, skipping ones already present.
+        
+        Returns:
+            IDs of the products that were actually added
+            
+        Raises:
+            ValidationError: If any product does not exist or is inactive
+        """
+        added = cls.add_many({user_id: product_ids}, notes)
+        return added.get(user_id, [])
+    
+    @classmethod
+    def add_many(cls, entries: Dict[int, Iterable[int]], notes: Optional[str] = None) -> Dict[int, List[int]]:
+        """
+        Bulk add for many users at once (imports, data generation).
+        
+        Args:
+            entries: {user_id: product IDs}; duplicates within the input are ignored
+            notes: Optional note stored on every new row
+            
+        Returns:
+            {user_id: IDs of the products that were added}
+        """
+        # Step 1: Dedupe the input itself
+        wanted = {uid: set(pids) for uid, pids in entries.items()}
+        all_products = {pid for pids in wanted.values() for pid in pids}
+        if not all_products:
+            return {}
+        
+        # Step 2: Validate products in one query per chunk
+        product_list = sorted(all_products)
+        active = set()
+        for i in range(0, len(product_list), cls.CHUNK_SIZE):
+            active.update(Product.objects.filter(
+                id__in=product_list[i:i + cls.CHUNK_SIZE], is_active=True
+            ).values_list('id', flat=True))
+        missing = all_products - active
+        if missing:
+            raise ValidationError(f"Products not found: {sorted(missing)}")
+        
+        # Step 3: Drop pairs that already exist and insert the rest
+        try:
+            return cls._insert_new(wanted, notes)
+        except IntegrityError:
+            # A concurrent add won the unique constraint; the retry sees its rows
+            return cls._insert_new(wanted, notes)
+    
+    @classmethod
+    def remove_items(cls, user_id: int, product_ids: Iterable[int]) -> int:
+        """
+        Removes products from a user's wishlist.
+        
+        Returns:
+            Number of rows removed
+        """
+        pids = sorted(set(product_ids))
+        removed = 0
+        with transaction.atomic():
+            for i in range(0, len(pids), cls.CHUNK_SIZE):
+                chunk = pids[i:i + cls.CHUNK_SIZE]
+                present = list(Wishlist.objects.filter(user_id=user_id, product_id__in=chunk)
+                               .values_list('product_id', flat=True))
+                if not present:
+                    continue
+                Wishlist.objects.filter(user_id=user_id, product_id__in=present).delete()
+                cls._adjust_counters({pid: -1 for pid in present})
+                removed += len(present)
+        return removed
+    
+    @staticmethod
+    def list_items(user_id: int, before: Optional[Tuple[datetime, int]] = None,
+                   limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        A page of a user's wishlist, newest first. Selects only the columns carried by
+        IX_Wishlist_UserID_Covering, so the page is served from the index.
+        
+        Args:
+            before: Keyset cursor (added_at, product_id) of the last row of the previous page
+        """
+        qs = Wishlist.objects.filter(user_id=user_id)
+        if before is not None:
+            added_at, product_id = before
+            qs = qs.filter(Q(added_at__lt=added_at) | Q(added_at=added_at, product_id__lt=product_id))
+        return list(qs.order_by('-added_at', '-product_id').values('product_id', 'added_at', 'notes')[:limit])
+    
+    @staticmethod
+    def most_wishlisted(limit: int = 20) -> List[Dict[str, Any]]:
+        """Top products by wishlist count, read from ProductWishlistCounts."""
+        return list(
+            ProductWishlistCount.objects.filter(wishlist_count__gt=0)
+            .order_by('-wishlist_count', 'product_id')
+            .values('product_id', 'product__name', 'wishlist_count')[:limit]
+        )
+    
+    @staticmethod
+    def rebuild_counters() -> int:
+        """Recomputes ProductWishlistCounts from Wishlist with one grouped query."""
+        now = timezone.now()
+        rows = [
+            ProductWishlistCount(product_id=pid, wishlist_count=count, updated_at=now)
+            for pid, count in Wishlist.objects.values('product_id').annotate(n=Count('id'))
+            .order_by().values_list('product_id', 'n')
+        ]
+        with transaction.atomic():
+            ProductWishlistCount.objects.all().delete()
+            ProductWishlistCount.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+    
+    @classmethod
+    def _insert_new(cls, wanted: Dict[int, set], notes: Optional[str]) -> Dict[int, List[int]]:
+        now = timezone.now()
+        added: Dict[int, List[int]] = {}
+        with transaction.atomic():
+            # Existing (user, product) pairs for the whole request, one query per chunk of users
+            user_ids = list(wanted.keys())
+            existing = set()
+            for i in range(0, len(user_ids), cls.CHUNK_SIZE):
+                existing.update(Wishlist.objects.filter(
+                    user_id__in=user_ids[i:i + cls.CHUNK_SIZE]
+                ).values_list('user_id', 'product_id'))
+
+            rows: List[Wishlist] = []
+            for uid, pids in wanted.items():
+                new = [pid for pid in sorted(pids) if (uid, pid) not in existing]
+                if new:
+                    added[uid] = new
+                    rows.extend(Wishlist(user_id=uid, product_id=pid, added_at=now, notes=notes) for pid in new)
+            
+            if rows:
+                Wishlist.objects.bulk_create(rows, batch_size=cls.CHUNK_SIZE)
+                deltas: Dict[int, int] = {}
+                for row in rows:
+                    deltas[row.product_id] = deltas.get(row.product_id, 0) + 1
+                cls._adjust_counters(deltas)
+        return added
+    
+    @classmethod
+    def _adjust_counters(cls, deltas: Dict[int, int]) -> None:
+        """Applies +/- deltas to ProductWishlistCounts, creating missing rows."""
+        now = timezone.now()
+        by_delta: Dict[int, List[int]] = {}
+        for pid, delta in deltas.items():
+            if delta:
+                by_delta.setdefault(delta, []).append(pid)
+        
+        # One UPDATE per distinct delta (usually just +1 or -1)
+        for delta, pids in by_delta.items():
+            for i in range(0, len(pids), cls.CHUNK_SIZE):
+                chunk = pids[i:i + cls.CHUNK_SIZE]
+                present = set(ProductWishlistCount.objects.filter(product_id__in=chunk)
+                              .values_list('product_id', flat=True))
+                ProductWishlistCount.objects.filter(product_id__in=present).update(
+                    wishlist_count=F('wishlist_count') + delta, updated_at=now
+                )
+                new_rows = [
+                    ProductWishlistCount(product_id=pid, wishlist_count=max(delta, 0), updated_at=now)
+                    for pid in chunk if pid not in present
+                ]
+                if new_rows:
+                    try:
+                        with transaction.atomic():
+                            ProductWishlistCount.objects.bulk_create(new_rows)
+                    except IntegrityError:
+                        # Created concurrently; fall back to incrementing
+                        ProductWishlistCount.objects.filter(
+                            product_id__in=[r.product_id for r in new_rows]
+                        ).update(wishlist_count=F('wishlist_count') + delta, updated_at=now)
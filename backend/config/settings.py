@@ -163,3 +163,50 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True # For development only
+
+# Shared cache: Redis when REDIS_URL is set, otherwise process-local memory (DEBUG only
+# for anything that must be shared between workers, such as carts).
+REDIS_URL = os.environ.get('REDIS_URL')
+CACHES = {
+    'default': (
+        {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL}
+        if REDIS_URL else
+        {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    ),
+}
+
+# Cart state (apps/orders/cart.py): live carts stay in this store and are written
+# behind to 'Cart' orders once per interval, at exit and at checkout.
+CART_STORE = os.environ.get('CART_STORE', 'apps.orders.cart.CacheCartStore')
+CART_WRITE_BEHIND_SECONDS = int(os.environ.get('CART_WRITE_BEHIND_SECONDS', '60'))
+
+# Stock reservations (apps/products/stock.py): each worker claims stock in blocks and
+# serves time-limited holds from memory; idle units are returned on reconciliation.
+STOCK_ALLOTMENT_BLOCK = int(os.environ.get('STOCK_ALLOTMENT_BLOCK', '20'))
+STOCK_HOLD_SECONDS = int(os.environ.get('STOCK_HOLD_SECONDS', '900'))
+STOCK_RECONCILE_SECONDS = int(os.environ.get('STOCK_RECONCILE_SECONDS', '30'))
+
+# Payment gateway (apps/payments/gateways.py): charges run on a background asyncio loop,
+# at most PAYMENT_GATEWAY_CONCURRENCY at a time per worker.
+PAYMENT_GATEWAY = os.environ.get('PAYMENT_GATEWAY', 'apps.payments.gateways.StubGateway')
+PAYMENT_GATEWAY_CONCURRENCY = int(os.environ.get('PAYMENT_GATEWAY_CONCURRENCY', '100'))
+
+# Currency conversion (apps/payments/currency.py): rates are read from this CSV
+# (currency, valid_from, rate_to_base) if set, otherwise from the ExchangeRates table.
+BASE_CURRENCY = os.environ.get('BASE_CURRENCY', 'USD')
+EXCHANGE_RATES_FILE = os.environ.get('EXCHANGE_RATES_FILE') or None
+
+# Business audit (apps/accounts/audit.py): audit entries are buffered per worker and
+# written in batches at least this often.
+AUDIT_FLUSH_SECONDS = int(os.environ.get('AUDIT_FLUSH_SECONDS', '5'))
+
+# Accounts (apps/accounts/services.py): password hashing runs on this many threads per
+# worker (default: CPU count); verified logins are remembered briefly and last_login
+# writes are coalesced and flushed at most once per interval.
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '0')) or None
+AUTH_VERIFY_CACHE_SECONDS = int(os.environ.get('AUTH_VERIFY_CACHE_SECONDS', '300'))
+LAST_LOGIN_FLUSH_SECONDS = int(os.environ.get('LAST_LOGIN_FLUSH_SECONDS', '30'))
+
+# Customer segmentation (apps/accounts/segments.py): buyers whose last purchase is older
+# than this are flagged dormant by the nightly rebuild_customer_segments run.
+SEGMENT_DORMANT_DAYS = int(os.environ.get('SEGMENT_DORMANT_DAYS', '180'))
@@ -233,6 +233,13 @@ CREATE TABLE ProductAttributes (
     CONSTRAINT FK_ProductAttributes_Products FOREIGN KEY (product_ID) REFERENCES Products(product_ID) ON DELETE CASCADE
 );
 
+-- Product Key Staging: (product_NAME, ven_ID) candidates of one generator chunk, joined
+-- against Products to skip existing products with a fixed statement (rows vanish at commit)
+CREATE GLOBAL TEMPORARY TABLE ProductKeyStaging (
+    product_NAME NVARCHAR2(255) NOT NULL,
+    ven_ID NUMBER NOT NULL
+) ON COMMIT DELETE ROWS;
+
 -- Wishlist Table: Stores user wishlist items
 CREATE TABLE Wishlist (
     wishlist_ID NUMBER PRIMARY KEY,
@@ -324,6 +331,31 @@ CREATE TABLE Payments (
     -- Foreign key to payment status table will be added after that table is created
 );
 
+-- Refund Items Table: Order lines returned by a line-item refund (one row per refund payment and product)
+CREATE TABLE RefundItems (
+    payment_ID NUMBER NOT NULL,
+    order_ID NUMBER NOT NULL,
+    product_ID NUMBER NOT NULL,
+    quantity NUMBER NOT NULL CHECK (quantity > 0),
+    CONSTRAINT PK_RefundItems PRIMARY KEY (payment_ID, product_ID),
+    CONSTRAINT FK_RefundItems_Payments FOREIGN KEY (payment_ID) REFERENCES Payments(payment_ID) ON DELETE CASCADE,
+    CONSTRAINT FK_RefundItems_Orders FOREIGN KEY (order_ID) REFERENCES Orders(order_ID)
+);
+
+-- Quantity already refunded per order line
+CREATE INDEX IX_RefundItems_Order_Product ON RefundItems(order_ID, product_ID, quantity);
+
+-- Settlement Staging Table: Transaction IDs of a PSP settlement file being reconciled (one run per file, removed afterwards)
+CREATE TABLE SettlementStaging (
+    run_ID NCHAR(32) NOT NULL,
+    transaction_ID NVARCHAR2(100) NOT NULL,
+    chunk_NO NUMBER NOT NULL,
+    CONSTRAINT PK_SettlementStaging PRIMARY KEY (run_ID, transaction_ID, chunk_NO)
+);
+
+-- Lines of one chunk of a run
+CREATE INDEX IX_SettlementStaging_Run_Chunk ON SettlementStaging(run_ID, chunk_NO, transaction_ID);
+
 -- Reviews Table: Stores user reviews for products
 CREATE TABLE Review (
     rew_ID NUMBER PRIMARY KEY,
@@ -238,6 +238,22 @@ INSERT INTO DeliveryStatusTypes
 VALUES
 ('Returned', N'Возвращен', N'Заказ был возвращен на склад.', N'Returned', N'The order has been returned to the warehouse.', 70);
 
+-- =====================================================================
+-- Exchange Rates
+-- =====================================================================
+-- Time-versioned rates: a row is valid from valid_FROM until the next row
+-- for the same currency. Loaded into memory by apps/payments/currency.py.
+CREATE TABLE ExchangeRates (
+    currency NCHAR(3) NOT NULL,
+    valid_FROM DATE NOT NULL,
+    rate_TO_BASE NUMBER(18,8) NOT NULL,         -- Units of the base currency (USD) per unit of currency
+    CONSTRAINT PK_ExchangeRates PRIMARY KEY (currency, valid_FROM),
+    CONSTRAINT CHK_ExchangeRates_Rate CHECK (rate_TO_BASE > 0)
+);
+
+INSERT INTO ExchangeRates (currency, valid_FROM, rate_TO_BASE)
+VALUES ('USD', DATE '2000-01-01', 1.0);
+
 COMMIT;
 
 PROMPT Reference tables created and populated successfully.;
@@ -27,6 +27,8 @@ CREATE INDEX IX_Orders_UserID ON Orders(user_ID);
 CREATE INDEX IX_Orders_OrderStatusID ON Orders(order_STATUS_ID);
 CREATE INDEX IX_Orders_DeliveryStatusID ON Orders(delivery_STATUS_ID);
 CREATE INDEX IX_Orders_Status_Date_New ON Orders(order_STATUS_ID, order_DATE);
+-- Carrier event ingest looks orders up by tracking number (apps/orders/delivery.py)
+CREATE INDEX IX_Orders_TrackingNumber ON Orders(tracking_NUMBER, delivery_STATUS_ID);
 
 -- OrderItems Indexes
 CREATE INDEX IX_OrderItems_OrderID ON OrderItems(order_ID);
@@ -41,6 +43,8 @@ CREATE INDEX IX_Payments_Status_Date_New ON Payments(payment_STATUS_ID, payment_
 -- Review Indexes
 CREATE INDEX IX_Review_UserID ON Review(user_ID);
 CREATE INDEX IX_Review_ProductID ON Review(product_ID);
+-- Keyset-paginated review lists per product (apps/products/reviews.py)
+CREATE INDEX IX_Review_Product_Date ON Review(product_ID, rew_DATE DESC, rew_ID DESC, user_ID, rew_RATING);
 
 -- Wishlist Indexes
 CREATE INDEX IX_Wishlist_UserID_DateAdded ON Wishlist(user_ID, added_AT);
@@ -0,0 +1,129 @@
+-- =====================================================================
+-- WinStore - Read Models (Oracle Version)
+-- =====================================================================
+-- Description: Creates denormalized read model tables that are maintained
+--              by the application layer on each write (no triggers).
+--              Dashboards and Directus lists read these narrow tables
+--              instead of joining the normalized schema at query time.
+-- Author:      WinStore Development Team
+-- Created:     2026-10-19
+-- Modified:    2026-10-19
+-- Version:     1.4.0
+-- =====================================================================
+-- Dependencies: 01_core_schema.sql, 02_reference_data.sql
+-- =====================================================================
+
+-- =====================================================================
+-- Order Summary Read Model
+-- =====================================================================
+-- One row per order; rewritten by OrderSummaryService (apps/orders/services.py)
+-- whenever the order, its items or its payments change.
+CREATE TABLE OrderSummary (
+    order_ID NUMBER NOT NULL,
+    user_ID NUMBER NOT NULL,
+    order_DATE TIMESTAMP NULL,
+    order_STATUS_ID NUMBER NULL,
+    delivery_STATUS_ID NUMBER NULL,
+    payment_STATUS_ID NUMBER NULL,              -- Status of the latest non-refund payment
+    order_AMOUNT NUMBER(10,2) NOT NULL,
+    promo_SAVINGS NUMBER(10,2) DEFAULT 0 NOT NULL,
+    paid_AMOUNT NUMBER(10,2) DEFAULT 0 NOT NULL,
+    refunded_AMOUNT NUMBER(10,2) DEFAULT 0 NOT NULL,
+    item_COUNT NUMBER DEFAULT 0 NOT NULL,
+    total_QUANTITY NUMBER DEFAULT 0 NOT NULL,
+    updated_AT TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL,
+    CONSTRAINT PK_OrderSummary PRIMARY KEY (order_ID),
+    CONSTRAINT FK_OrderSummary_Orders FOREIGN KEY (order_ID) REFERENCES Orders(order_ID) ON DELETE CASCADE
+);
+
+-- Dashboard list: filter by status, newest first
+-- Oracle не поддерживает синтаксис INCLUDE, используем все поля в индексе
+CREATE INDEX IX_OrderSummary_Status_Date
+ON OrderSummary(order_STATUS_ID, order_DATE DESC, user_ID, payment_STATUS_ID, delivery_STATUS_ID, order_AMOUNT, item_COUNT);
+
+-- Customer order history
+CREATE INDEX IX_OrderSummary_User_Date
+ON OrderSummary(user_ID, order_DATE DESC, order_STATUS_ID, payment_STATUS_ID, order_AMOUNT, item_COUNT);
+
+-- =====================================================================
+-- Payment Rollup
+-- =====================================================================
+-- Payment counts and totals per hour, method, status and currency.
+-- Maintained incrementally by PaymentRollupService (apps/payments/rollups.py)
+-- on every payment insert and status change; daily totals sum 24 rows.
+CREATE TABLE PaymentRollup (
+    bucket_DATE DATE NOT NULL,
+    bucket_HOUR NUMBER(2) NOT NULL,
+    payment_METHOD NVARCHAR2(50) NOT NULL,
+    payment_STATUS_ID NUMBER NOT NULL,
+    currency NCHAR(3) NOT NULL,
+    payment_COUNT NUMBER DEFAULT 0 NOT NULL,
+    total_AMOUNT NUMBER(18,2) DEFAULT 0 NOT NULL,
+    updated_AT TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL,
+    CONSTRAINT PK_PaymentRollup PRIMARY KEY (bucket_DATE, bucket_HOUR, payment_METHOD, payment_STATUS_ID, currency)
+);
+
+-- =====================================================================
+-- Product Wishlist Counters
+-- =====================================================================
+-- Number of wishlists containing each product; adjusted by WishlistService
+-- (apps/promotions/services.py) on every add/remove.
+CREATE TABLE ProductWishlistCounts (
+    product_ID NUMBER NOT NULL,
+    wishlist_COUNT NUMBER DEFAULT 0 NOT NULL,
+    updated_AT TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL,
+    CONSTRAINT PK_ProductWishlistCounts PRIMARY KEY (product_ID),
+    CONSTRAINT FK_ProductWishlistCounts_Prod FOREIGN KEY (product_ID) REFERENCES Products(product_ID) ON DELETE CASCADE
+);
+
+-- "Most wishlisted" merchandising lists
+CREATE INDEX IX_ProductWishlistCounts_Count
+ON ProductWishlistCounts(wishlist_COUNT DESC, product_ID);
+
+-- =====================================================================
+-- Product Rating Summary
+-- =====================================================================
+-- Review count, rating sum and 1-5 histogram per product; adjusted by
+-- ReviewService (apps/products/reviews.py) on every review upsert.
+CREATE TABLE ProductRatingSummary (
+    product_ID NUMBER NOT NULL,
+    review_COUNT NUMBER DEFAULT 0 NOT NULL,
+    rating_SUM NUMBER DEFAULT 0 NOT NULL,
+    rating_1 NUMBER DEFAULT 0 NOT NULL,
+    rating_2 NUMBER DEFAULT 0 NOT NULL,
+    rating_3 NUMBER DEFAULT 0 NOT NULL,
+    rating_4 NUMBER DEFAULT 0 NOT NULL,
+    rating_5 NUMBER DEFAULT 0 NOT NULL,
+    updated_AT TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL,
+    CONSTRAINT PK_ProductRatingSummary PRIMARY KEY (product_ID),
+    CONSTRAINT FK_ProductRatingSummary_Prod FOREIGN KEY (product_ID) REFERENCES Products(product_ID) ON DELETE CASCADE
+);
+
+-- =====================================================================
+-- Customer Segments
+-- =====================================================================
+-- Nightly RFM scores, segment and loyalty tier per user; rewritten in full
+-- by CustomerSegmentService (apps/accounts/segments.py).
+CREATE TABLE CustomerSegments (
+    user_ID NUMBER NOT NULL,
+    last_order_DATE TIMESTAMP NULL,
+    recency_DAYS NUMBER NULL,
+    order_COUNT NUMBER DEFAULT 0 NOT NULL,
+    total_SPENT NUMBER(14, 2) DEFAULT 0 NOT NULL,
+    r_SCORE NUMBER(1) DEFAULT 0 NOT NULL,
+    f_SCORE NUMBER(1) DEFAULT 0 NOT NULL,
+    m_SCORE NUMBER(1) DEFAULT 0 NOT NULL,
+    rfm_SEGMENT NVARCHAR2(30) NOT NULL,
+    loyalty_TIER NVARCHAR2(20) NOT NULL,
+    is_DORMANT NUMBER(1) DEFAULT 0 NOT NULL,
+    computed_AT TIMESTAMP DEFAULT SYSTIMESTAMP NOT NULL,
+    CONSTRAINT PK_CustomerSegments PRIMARY KEY (user_ID),
+    CONSTRAINT FK_CustomerSegments_Users FOREIGN KEY (user_ID) REFERENCES Users(user_ID) ON DELETE CASCADE
+);
+
+-- Marketing audience lists by segment and tier
+CREATE INDEX IX_CustomerSegments_Segment
+ON CustomerSegments(rfm_SEGMENT, loyalty_TIER, recency_DAYS, total_SPENT);
+
+COMMIT;
+PROMPT Read model tables created successfully.;
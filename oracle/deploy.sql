@@ -75,6 +75,9 @@ PROMPT ========== EXECUTING 04_indexes.sql ==========
 PROMPT ========== EXECUTING 05_users.sql ==========
 @@01_schema/05_users.sql
 
+PROMPT ========== EXECUTING 06_read_models.sql ==========
+@@01_schema/06_read_models.sql
+
 -- Audit system setup
 PROMPT ========== EXECUTING audit_setup.sql ==========
 @@02_audit/audit_setup.sql
@@ -177,7 +177,9 @@ def main():
         batch_insert(conn,
             "INSERT INTO Users (user_NAME, user_PASS, user_EMAIL, user_PHONE, user_ROLE) VALUES (:user_name, :user_pass, :user_email, :user_phone, :user_role)",
             users,
-            commit_now=False
+            commit_now=False,
+            # A generated email colliding with an existing user (re-runs) only drops that user
+            skip_bad_rows=True
         )
 
         conn.commit()
@@ -198,9 +200,10 @@ def main():
         attributes_payload = [{"id": aid, "name": aname} for (aid, aname) in attribute_rows]
         save_ids('attributes', attributes_payload)
 
-        cursor.execute("SELECT user_ID FROM Users")
-        user_ids = [row[0] for row in cursor.fetchall()]
-        save_ids('users', user_ids)
+        # Streamed from the cursor into the ID registry, never held as one list
+        cursor.arraysize = 10000
+        cursor.execute("SELECT user_ID FROM Users ORDER BY user_ID")
+        save_ids('users', (row[0] for row in cursor))
 
         cursor.close()
         print("--- Step 1 completed successfully! ---")
@@ -1,23 +1,29 @@
 # Refactored version of 02_populate_orders.py
 # Key improvements:
-# 1.  **Enhanced Readability**: The main simulation logic is decomposed from one large function
-#     into smaller, single-responsibility functions (create_order, process_payment, etc.).
+# 1.  **Set-Based Simulation**: Each chunk of users is simulated in memory (plan_activity,
+#     sample_lifecycles) and written with one bulk statement per table and one commit per chunk,
+#     instead of 6-9 round-trips and a commit per order.
 # 2.  **Improved Security**: Removed f-string formatting from SQL queries to prevent
 #     potential SQL injection vulnerabilities, adhering to best practices.
 # 3.  **Clarity and Maintainability**: The code flow is more logical and easier to follow,
 #     making future modifications simpler and safer.
 
+import itertools
 import os
 import sys
+import time
 import random
+import uuid
 import datetime as dt
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Optional, Set, Tuple
+
+import numpy as np
 
 # Make utils importable
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils import get_db_connection, load_ids
+from utils import OracleTableWriter, TableWriter, get_db_connection, iter_ids, open_exporter, output_mode
 
 
 # --- Config ---
@@ -30,9 +36,23 @@ ORDER_RETURN_RATE = float(os.getenv('ORDER_RETURN_RATE', '0.03'))
 ORDER_REFUND_RATE = float(os.getenv('ORDER_REFUND_RATE', '0.02'))
 REVIEW_RATE = float(os.getenv('REVIEW_RATE', '0.35'))
 WISHLIST_ITEMS_PER_USER = int(os.getenv('WISHLIST_ITEMS_PER_USER', '5'))
+# Users simulated per chunk; also the size of the IN lists (Oracle allows 1000)
+USER_CHUNK_SIZE = min(1000, int(os.getenv('USER_CHUNK_SIZE', '1000')))
 
 DEFAULT_CURRENCY = os.getenv('CURRENCY', 'USD')[:3].upper() or 'USD'
 
+# Lifecycle outcomes are drawn in bulk for each chunk (sample_lifecycles)
+_rng = np.random.default_rng()
+
+# Payments.transaction_ID is UNIQUE: a per-run tag plus a counter never collides, random draws do
+_RUN_TAG = uuid.uuid4().hex[:12].upper()
+_tx_seq = itertools.count(1)
+
+
+def next_transaction_id(prefix: str) -> str:
+    """Unique payment transaction ID, e.g. TX3F9A0C12B4E70000000042."""
+    return f"{prefix}{_RUN_TAG}{next(_tx_seq):010d}"
+
 # --- Safe Status Resolvers ---
 STATUS_TABLE_MAP = {
     'order': 'OrderStatusTypes',
@@ -58,8 +78,7 @@ def resolve_status_ids(cur, status_type_key: str, status_keys: List[str]) -> Dic
 # --- Data Fetching ---
 def load_users() -> List[int]:
     try:
-        users_raw = load_ids('users')
-        return [int(u) for u in users_raw if isinstance(u, int) or str(u).isdigit()]
+        return list(iter_ids('users'))
     except Exception:
         return []
 
@@ -76,202 +95,295 @@ def fetch_active_products(cur) -> List[Tuple[int, float, int]]:
     return [(int(pid), float(price), int(stock)) for pid, price, stock in cur.fetchall()]
 
 
-# --- Core Logic Components ---
-def choose_items(products: List[Tuple[int, float, int]]) -> List[Tuple[int, float, int]]:
-    """Picks a random number of items for an order. Returns (product_ID, price, qty)."""
+# --- Set-Based Simulation Engine ---
+# Every order's lifecycle (items, payment outcome, delivery, return/refund) is decided in
+# memory for a chunk of users, the outcomes with one vectorized draw per chunk; the chunk is then written with one array-bind INSERT per
+# table (or one batch per file with DATA_OUTPUT=csv/parquet), one aggregated stock UPDATE
+# and a single commit.
+ORDER_COLUMNS = (
+    'user_ID', 'order_DATE', 'order_STATUS_ID', 'order_AMOUNT', 'shipped_DATE', 'estimated_delivery_DATE',
+    'actual_delivery_DATE', 'delivery_STATUS_ID', 'shipping_carrier_NAME', 'tracking_NUMBER', 'delivery_ADDRESS',
+)
+ORDER_ITEM_COLUMNS = ('order_ID', 'product_ID', 'quantity', 'price')
+PAYMENT_COLUMNS = (
+    'order_ID', 'payment_DATE', 'payment_METHOD', 'payment_STATUS_ID', 'payment_AMOUNT', 'currency', 'transaction_ID',
+)
+REVIEW_COLUMNS = ('user_ID', 'product_ID', 'rew_RATING', 'rew_COMMENT', 'rew_DATE')
+WISHLIST_COLUMNS = ('user_ID', 'product_ID', 'added_AT', 'notes')
+
+
+class ActivityPlan:
+    """
+    Rows for one chunk of users, in ORDER_COLUMNS etc. order. OrderItems and Payments rows
+    start with the index of their order in orders; write_plan() swaps in the order_ID.
+    stock_used holds the total quantity taken per product.
+    """
+
+    def __init__(self):
+        self.orders: List[Tuple] = []
+        self.items: List[Tuple] = []
+        self.payments: List[Tuple] = []
+        self.reviews: List[Tuple] = []
+        self.wishlist: List[Tuple] = []
+        self.stock_used: Dict[int, int] = {}
+
+
+def choose_items(products: List[Tuple[int, float, int]], stock: Dict[int, int]) -> List[Tuple[int, float, int]]:
+    """Picks a random number of in-stock items for an order. Returns (product_ID, price, qty)."""
     if not products:
         return []
     count = random.randint(1, max(1, min(MAX_ITEMS_PER_ORDER, len(products))))
     picked = random.sample(products, k=count)
     items = []
-    for pid, price, stock in picked:
-        if stock <= 0:
+    for pid, price, _stock in picked:
+        left = stock.get(pid, 0)
+        if left <= 0:
             continue
-        qty = random.randint(1, min(3, stock))
+        qty = random.randint(1, min(3, left))
         items.append((pid, price, qty))
     return items
 
 
-def create_order_and_items(cur, user_id: int, items: List[Tuple[int, float, int]], cart_status_id: int) -> Optional[Tuple[int, float, dt.datetime]]:
-    """Creates an order, adds items, adjusts stock, and calculates the total amount."""
-    order_date = dt.datetime.now(dt.timezone.utc) - dt.timedelta(days=random.randint(0, 60))
-    
-    # 1. Create Order record
-    cur.execute(
-        "INSERT INTO Orders (user_ID, order_DATE, order_STATUS_ID, order_AMOUNT) VALUES (:u, :d, :s, 0.0) RETURNING order_ID INTO :oid",
-        {'u': user_id, 'd': order_date, 's': cart_status_id, 'oid': cur.var(int)}
-    )
-    order_id = int(cur.bindvars['oid'].getvalue()[0])
-    # 2. Add OrderItems
-    oi_rows = [{'order_ID': order_id, 'product_ID': pid, 'quantity': qty, 'price': price} for pid, price, qty in items]
-    cur.executemany(
-        "INSERT INTO OrderItems (order_ID, product_ID, quantity, price) VALUES (:order_ID, :product_ID, :quantity, :price)",
-        oi_rows
-    )
-
-    # 3. Adjust stock
-    stock_updates = [{'q': qty, 'p': pid} for pid, _price, qty in items]
-    cur.executemany("UPDATE Products SET product_STOCK = product_STOCK - :q WHERE product_ID = :p AND product_STOCK >= :q", stock_updates)
-
-    # 4. Calculate final amount and update order
-    amount = round(sum(price * qty for _pid, price, qty in items), 2)
-    cur.execute("UPDATE Orders SET order_AMOUNT = :a WHERE order_ID = :oid", {'a': amount, 'oid': order_id})
-    
-    return order_id, amount, order_date
-
-
-def process_payment(cur, order_id: int, amount: float, order_date: dt.datetime, payment_status_ids: Dict[str, int]) -> bool:
-    """Simulates a payment for the order and returns True if successful."""
-    payment_failed = random.random() < PAYMENT_FAIL_RATE
-    pay_status_id = payment_status_ids['Failed'] if payment_failed else payment_status_ids['Completed']
-    
-    cur.execute(
-        """
-        INSERT INTO Payments (order_ID, payment_DATE, payment_METHOD, payment_STATUS_ID, payment_AMOUNT, currency, transaction_ID)
-        VALUES (:o, :d, :m, :s, :amt, :cur, :tx)
-        """,
-        {
-            'o': order_id,
-            'd': order_date + dt.timedelta(minutes=random.randint(1, 60)),
-            'm': random.choice(['Card', 'PayPal', 'ApplePay', 'GooglePay']),
-            's': pay_status_id,
-            'amt': 0.0 if payment_failed else amount,
-            'cur': DEFAULT_CURRENCY,
-            'tx': f"TX{random.randint(1000000000, 9999999999)}"
-        }
-    )
-    return not payment_failed
-
-
-def simulate_delivery(cur, order_id: int, order_date: dt.datetime, delivery_status_ids: Dict[str, int]) -> dt.datetime:
-    """Simulates the delivery process, updating status and dates along the way."""
-    shipped_date = order_date + dt.timedelta(days=random.randint(1, 3))
-    delivered_date = shipped_date + dt.timedelta(days=random.randint(2, 7))
-    estimated_delivery_date = shipped_date + dt.timedelta(days=random.randint(3, 8))
-
-    # Atomically update all date fields and set final delivery status
-    cur.execute(
-        """
-        UPDATE Orders
-        SET shipped_DATE = :ship_d,
-            estimated_delivery_DATE = :est_d,
-            actual_delivery_DATE = :actual_d,
-            delivery_STATUS_ID = :del_stat_id,
-            shipping_carrier_NAME = :carrier,
-            tracking_NUMBER = :trk,
-            delivery_ADDRESS = :addr
-        WHERE order_ID = :oid
-        """,
-        {
-            'ship_d': shipped_date,
-            'est_d': estimated_delivery_date,
-            'actual_d': delivered_date,
-            'del_stat_id': delivery_status_ids['Delivered'],
-            'carrier': random.choice(['DHL', 'FedEx', 'UPS', 'USPS']),
-            'trk': f"TRK{random.randint(10000000,99999999)}",
-            'addr': f"{random.randint(10000,99999)}, City-{random.randint(1,999)}, Street-{random.randint(1,200)}",
-            'oid': order_id
-        }
-    )
-    return delivered_date
-
-
-def handle_post_delivery_flow(cur, order_id: int, amount: float, delivered_date: dt.datetime, status_ids: Dict[str, int], payment_status_ids: Dict[str, int]) -> Dict[str, Any]:
-    """Handles returns, refunds, or completes the order."""
-    final_state = {'returned': False, 'refunded': False}
-    final_order_status_id = status_ids['Completed']
-
-    if random.random() < ORDER_RETURN_RATE:
-        final_order_status_id = status_ids['Returned']
-        final_state['returned'] = True
-
-        if random.random() < ORDER_REFUND_RATE:
-            cur.execute(
-                "INSERT INTO Payments (order_ID, payment_DATE, payment_METHOD, payment_STATUS_ID, payment_AMOUNT, currency, transaction_ID) "
-                "VALUES (:o, :d, 'Refund', :s, :amt, :cur, :tx)",
-                {
-                    'o': order_id,
-                    'd': delivered_date + dt.timedelta(days=2),
-                    's': payment_status_ids['Refunded'],
-                    'amt': amount,
-                    'cur': DEFAULT_CURRENCY,
-                    'tx': f"RF{random.randint(100000000, 999999999)}"
-                }
-            )
-            final_order_status_id = status_ids['Refunded']
-            final_state['refunded'] = True
-
-    cur.execute("UPDATE Orders SET order_STATUS_ID = :s WHERE order_ID = :oid", {'s': final_order_status_id, 'oid': order_id})
-    return final_state
-
-
-def simulate_full_order_lifecycle(cur, user_id: int, products: List[Tuple[int, float, int]], statuses: Dict[str, Dict[str, int]]):
-    """Orchestrates the entire lifecycle of a single order."""
-    items = choose_items(products)
-    if not items:
-        return None
-
-    order_id, amount, order_date = create_order_and_items(cur, user_id, items, statuses['order']['Cart'])
-    if not order_id:
-        return None # Should not happen in this logic, but as a safeguard.
-
-    payment_successful = process_payment(cur, order_id, amount, order_date, statuses['payment'])
-
-    if not payment_successful:
-        final_status = 'Cancelled' if random.random() < ORDER_CANCEL_RATE else 'Pending'
-        cur.execute("UPDATE Orders SET order_STATUS_ID = :s WHERE order_ID = :oid", {'s': statuses['order'][final_status], 'oid': order_id})
-        return {'order_id': order_id, 'items': items, 'amount': amount, 'returned': False, 'refunded': False}
-
-    # If payment is successful, progress the order
-    cur.execute("UPDATE Orders SET order_STATUS_ID = :s WHERE order_ID = :oid", {'s': statuses['order']['Processing'], 'oid': order_id})
-    
-    delivered_date = simulate_delivery(cur, order_id, order_date, statuses['delivery'])
-    final_state = handle_post_delivery_flow(cur, order_id, amount, delivered_date, statuses['order'], statuses['payment'])
-
-    return {'order_id': order_id, 'items': items, 'amount': amount, **final_state}
-
-
-# --- User Activity Generation (Reviews, Wishlist) ---
-def insert_reviews(cur, user_id: int, purchased_products: List[int]):
-    to_review = [pid for pid in purchased_products if random.random() < REVIEW_RATE]
-    if not to_review:
+PAYMENT_METHODS = ('Card', 'PayPal', 'ApplePay', 'GooglePay')
+CARRIERS = ('DHL', 'FedEx', 'UPS', 'USPS')
+
+
+def sample_lifecycles(n: int, now: np.datetime64, rng: Optional[np.random.Generator] = None) -> Dict[str, np.ndarray]:
+    """
+    Draws the lifecycle outcomes of n orders at once, with the same rates as the config.
+
+    Returns:
+        Dict of arrays, one element per order: flags (payment_failed, cancelled, returned,
+        refunded), datetime64[us] dates (order, payment, shipped, estimated, delivered,
+        refund) and integer codes (method, carrier, tracking, zip, city, street)
+    """
+    rng = rng or _rng
+    day = np.timedelta64(1, 'D')
+    payment_failed = rng.random(n) < PAYMENT_FAIL_RATE
+    returned = ~payment_failed & (rng.random(n) < ORDER_RETURN_RATE)
+    order_date = now - rng.integers(0, 61, n) * day
+    shipped = order_date + rng.integers(1, 4, n) * day
+    delivered = shipped + rng.integers(2, 8, n) * day
+    return {
+        'payment_failed': payment_failed,
+        'cancelled': payment_failed & (rng.random(n) < ORDER_CANCEL_RATE),
+        'returned': returned,
+        'refunded': returned & (rng.random(n) < ORDER_REFUND_RATE),
+        'order_date': order_date,
+        'payment_date': order_date + rng.integers(1, 61, n) * np.timedelta64(1, 'm'),
+        'shipped': shipped,
+        'estimated': shipped + rng.integers(3, 9, n) * day,
+        'delivered': delivered,
+        'refund_date': delivered + 2 * day,
+        'method': rng.integers(0, len(PAYMENT_METHODS), n),
+        'carrier': rng.integers(0, len(CARRIERS), n),
+        'tracking': rng.integers(10000000, 100000000, n),
+        'zip': rng.integers(10000, 100000, n),
+        'city': rng.integers(1, 1000, n),
+        'street': rng.integers(1, 201, n),
+    }
+
+
+def plan_orders(plan: ActivityPlan, orders: List[Tuple[int, List[Tuple[int, float, int]]]],
+                statuses: Dict[str, Dict[str, int]]):
+    """
+    Records the rows of (user_ID, items) orders from one sample_lifecycles() draw. A failed
+    payment leaves the order Pending (or Cancelled); a paid one is delivered and then
+    Completed, Returned or Refunded (with a refund payment).
+    """
+    if not orders:
         return
-
-    binds = {f'p{i}': pid for i, pid in enumerate(to_review)}
-    bind_list = ','.join([f":p{i}" for i in range(len(to_review))])
-    cur.execute(f"SELECT product_ID FROM Review WHERE user_ID = :u AND product_ID IN ({bind_list})", {**{'u': user_id}, **binds})
-    existing = {int(r[0]) for r in cur.fetchall()}
-    
-    rows = []
-    for pid in to_review:
-        if pid in existing:
+    now = np.datetime64(dt.datetime.now(dt.timezone.utc).replace(tzinfo=None), 'us')
+    s = sample_lifecycles(len(orders), now)
+    order_status = np.select(
+        [s['refunded'], s['returned'], s['cancelled'], s['payment_failed']],
+        [statuses['order'][k] for k in ('Refunded', 'Returned', 'Cancelled', 'Pending')],
+        default=statuses['order']['Completed'],
+    )
+    payment_status = np.where(s['payment_failed'], statuses['payment']['Failed'], statuses['payment']['Completed'])
+    # Plain Python values for the drivers and the CSV writer
+    c = {k: v.tolist() for k, v in s.items()}
+    order_status, payment_status = order_status.tolist(), payment_status.tolist()
+    delivered_id, refunded_id = statuses['delivery']['Delivered'], statuses['payment']['Refunded']
+
+    for i, (user_id, items) in enumerate(orders):
+        amount = round(sum(price * qty for _pid, price, qty in items), 2)
+        index = len(plan.orders)
+        plan.items.extend((index, pid, qty, price) for pid, price, qty in items)
+        failed = c['payment_failed'][i]
+        plan.payments.append((
+            index, c['payment_date'][i], PAYMENT_METHODS[c['method'][i]], payment_status[i],
+            0.0 if failed else amount, DEFAULT_CURRENCY, next_transaction_id('TX'),
+        ))
+        if failed:
+            plan.orders.append((user_id, c['order_date'][i], order_status[i], amount) + (None,) * 7)
             continue
-        rows.append({
-            'user_ID': user_id, 'product_ID': pid, 'rew_RATING': random.randint(3, 5),
-            'rew_COMMENT': random.choice(['Отличное качество.', 'Быстрая доставка.', 'Рекомендую.']),
-            'rew_DATE': dt.datetime.now(dt.timezone.utc)
-        })
-    if rows:
-        cur.executemany(
-            "INSERT INTO Review (user_ID, product_ID, rew_RATING, rew_COMMENT, rew_DATE) VALUES (:user_ID, :product_ID, :rew_RATING, :rew_COMMENT, :rew_DATE)",
-            rows
-        )
-
-
-def insert_wishlist(cur, user_id: int, candidates: List[int], already_bought: List[int]):
-    left = [pid for pid in candidates if pid not in already_bought]
-    if not left:
+        if c['refunded'][i]:
+            plan.payments.append((
+                index, c['refund_date'][i], 'Refund', refunded_id, amount, DEFAULT_CURRENCY, next_transaction_id('RF'),
+            ))
+        plan.orders.append((
+            user_id, c['order_date'][i], order_status[i], amount, c['shipped'][i], c['estimated'][i],
+            c['delivered'][i], delivered_id, CARRIERS[c['carrier'][i]], f"TRK{c['tracking'][i]}",
+            f"{c['zip'][i]}, City-{c['city'][i]}, Street-{c['street'][i]}",
+        ))
+
+
+def fetch_existing_pairs(cur, table: str, user_ids: List[int]) -> Set[Tuple[int, int]]:
+    """(user_ID, product_ID) pairs already in Review or Wishlist for up to 1000 users."""
+    if table not in ('Review', 'Wishlist'):
+        raise ValueError(f"Invalid table: {table}")
+    binds = {f'u{i}': uid for i, uid in enumerate(user_ids)}
+    bind_list = ','.join([f":u{i}" for i in range(len(user_ids))])
+    cur.execute(f"SELECT user_ID, product_ID FROM {table} WHERE user_ID IN ({bind_list})", binds)
+    return {(int(u), int(p)) for u, p in cur.fetchall()}
+
+
+def plan_activity(cur, user_ids: List[int], products: List[Tuple[int, float, int]], stock: Dict[int, int],
+                  statuses: Dict[str, Dict[str, int]]) -> ActivityPlan:
+    """
+    Orders, reviews and wishlist entries for a chunk of users. stock (remaining units per
+    product) is shared across chunks and decremented as orders take items.
+    """
+    plan = ActivityPlan()
+    purchased: Dict[int, Set[int]] = {}
+    orders: List[Tuple[int, List[Tuple[int, float, int]]]] = []
+    order_counts = _rng.integers(ORDERS_PER_USER_MIN, ORDERS_PER_USER_MAX + 1, len(user_ids)).tolist()
+    for u, n_orders in zip(user_ids, order_counts):
+        bought = purchased.setdefault(u, set())
+        for _ in range(n_orders):
+            # Item picks stay sequential: each order sees the stock the previous ones left
+            items = choose_items(products, stock)
+            if not items:
+                continue
+            orders.append((u, items))
+            for pid, _price, qty in items:
+                stock[pid] -= qty
+                plan.stock_used[pid] = plan.stock_used.get(pid, 0) + qty
+                bought.add(pid)
+    plan_orders(plan, orders, statuses)
+
+    existing_reviews = fetch_existing_pairs(cur, 'Review', user_ids)
+    existing_wishlist = fetch_existing_pairs(cur, 'Wishlist', user_ids)
+    all_product_ids = [pid for pid, _, _ in products]
+    now = dt.datetime.now(dt.timezone.utc)
+    for u in user_ids:
+        for pid in sorted(purchased[u]):
+            if random.random() < REVIEW_RATE and (u, pid) not in existing_reviews:
+                plan.reviews.append((
+                    u, pid, random.randint(3, 5),
+                    random.choice(['Отличное качество.', 'Быстрая доставка.', 'Рекомендую.']), now,
+                ))
+        left = [pid for pid in all_product_ids if pid not in purchased[u]]
+        for pid in random.sample(left, k=min(WISHLIST_ITEMS_PER_USER, len(left))):
+            if (u, pid) not in existing_wishlist:
+                plan.wishlist.append((u, pid, now, None))
+    return plan
+
+
+class StockShortfall(Exception):
+    """Products whose database stock was below what a chunk planned to take."""
+
+    def __init__(self, product_ids: List[int]):
+        super().__init__(f"insufficient stock for {len(product_ids)} products (e.g. {product_ids[:5]})")
+        self.product_ids = product_ids
+
+
+def update_stock(cur, stock_used: Dict[int, int]):
+    """
+    One array-bind UPDATE for the chunk: each product's total quantity taken. The stock
+    guard makes a row update nothing when stock ran short, so every row count is checked.
+
+    Raises:
+        StockShortfall: If any product had less stock than planned (the caller rolls back)
+    """
+    if not stock_used:
         return
-    picks = random.sample(left, k=min(WISHLIST_ITEMS_PER_USER, len(left)))
-    
-    binds = {f'p{i}': pid for i, pid in enumerate(picks)}
-    bind_list = ','.join([f":p{i}" for i in range(len(picks))])
-    cur.execute(f"SELECT product_ID FROM Wishlist WHERE user_ID = :u AND product_ID IN ({bind_list})", {**{'u': user_id}, **binds})
-    existing = {int(r[0]) for r in cur.fetchall()}
-
-    rows = [{'user_ID': user_id, 'product_ID': pid, 'added_AT': dt.datetime.now(dt.timezone.utc), 'notes': None} for pid in picks if pid not in existing]
-    if rows:
-        cur.executemany("INSERT INTO Wishlist (user_ID, product_ID, added_AT, notes) VALUES (:user_ID, :product_ID, :added_AT, :notes)", rows)
+    rows = [{'q': qty, 'p': pid} for pid, qty in stock_used.items()]
+    cur.executemany(
+        "UPDATE Products SET product_STOCK = product_STOCK - :q WHERE product_ID = :p AND product_STOCK >= :q",
+        rows, arraydmlrowcounts=True
+    )
+    short = [row['p'] for row, count in zip(rows, cur.getarraydmlrowcounts()) if count != 1]
+    if short:
+        raise StockShortfall(short)
+
+
+def refresh_stock(cur, stock: Dict[int, int], product_ids: List[int]):
+    """Re-reads the database stock of the given products into stock, up to 1000 IDs per query."""
+    for i in range(0, len(product_ids), 1000):
+        part = product_ids[i:i + 1000]
+        binds = {f'p{j}': pid for j, pid in enumerate(part)}
+        bind_list = ','.join([f":p{j}" for j in range(len(part))])
+        cur.execute(f"SELECT product_ID, NVL(product_STOCK,0) FROM Products WHERE product_ID IN ({bind_list})", binds)
+        for pid, qty in cur.fetchall():
+            stock[int(pid)] = int(qty)
+
+
+def write_plan(writer: TableWriter, plan: ActivityPlan) -> int:
+    """Writes a plan with one insert per table and commits. Returns the number of orders."""
+    order_ids = writer.insert('Orders', ORDER_COLUMNS, plan.orders, returning=True)
+    writer.insert('OrderItems', ORDER_ITEM_COLUMNS, [(order_ids[r[0]],) + r[1:] for r in plan.items])
+    writer.insert('Payments', PAYMENT_COLUMNS, [(order_ids[r[0]],) + r[1:] for r in plan.payments])
+    writer.insert('Review', REVIEW_COLUMNS, plan.reviews)
+    writer.insert('Wishlist', WISHLIST_COLUMNS, plan.wishlist)
+    writer.commit()
+    return len(order_ids)
+
+
+def simulate_activity(conn, cur, users: List[int], products: List[Tuple[int, float, int]],
+                      statuses: Dict[str, Dict[str, int]]) -> Tuple[int, int]:
+    """
+    Plans and writes the activity chunk by chunk, to the database or, with
+    DATA_OUTPUT=csv/parquet, to export files whose IDs continue after the database's
+    (stock is then only tracked in memory). A chunk that fails to write is rolled back
+    and counted. Returns (orders written, orders lost to failed chunks).
+    """
+    exporter = None
+    if output_mode() != 'db':
+        exporter = open_exporter('orders', conn=conn, tables=['Orders', 'OrderItems', 'Payments', 'Review', 'Wishlist'])
+    writer = exporter or OracleTableWriter(conn)
+    stock = {pid: s for pid, _price, s in products}
+    total_orders = lost_orders = failed_chunks = 0
+    started = time.monotonic()
+    try:
+        for start in range(0, len(users), USER_CHUNK_SIZE):
+            chunk = users[start:start + USER_CHUNK_SIZE]
+            plan = plan_activity(cur, chunk, products, stock, statuses)
+            if exporter:
+                total_orders += write_plan(exporter, plan)
+            else:
+                try:
+                    try:
+                        update_stock(cur, plan.stock_used)
+                    except StockShortfall as e:
+                        # Stock changed since it was loaded: re-read the short products and replan once
+                        conn.rollback()
+                        for pid, qty in plan.stock_used.items():
+                            stock[pid] += qty
+                        refresh_stock(cur, stock, e.product_ids)
+                        print(f"Replanning users {chunk[0]}..{chunk[-1]}: {e}")
+                        plan = plan_activity(cur, chunk, products, stock, statuses)
+                        update_stock(cur, plan.stock_used)
+                    total_orders += write_plan(writer, plan)
+                except Exception as e:
+                    conn.rollback()
+                    for pid, qty in plan.stock_used.items():
+                        stock[pid] += qty
+                    lost_orders += len(plan.orders)
+                    failed_chunks += 1
+                    print(f"Error writing activity for users {chunk[0]}..{chunk[-1]} "
+                          f"({len(plan.orders)} orders lost): {e}")
+                    continue
+            elapsed = time.monotonic() - started
+            print(f"Users {start + len(chunk)}/{len(users)}: {total_orders} orders "
+                  f"({total_orders / elapsed if elapsed > 0 else 0:,.0f} orders/s)")
+    finally:
+        if exporter:
+            exporter.close()
+    if failed_chunks:
+        print(f"WARNING: {failed_chunks} chunks failed; {lost_orders} planned orders were not written.")
+    return total_orders, lost_orders
 
 
 # --- Main Orchestrator ---
@@ -313,34 +425,11 @@ def main():
             print('No active products available. Run product generators first.')
             return
 
-        user_orders_info: Dict[int, List[int]] = {u: [] for u in users}
-        total_orders = 0
-        for u in users:
-            n_orders = random.randint(ORDERS_PER_USER_MIN, ORDERS_PER_USER_MAX)
-            for _ in range(n_orders):
-                try:
-                    info = simulate_full_order_lifecycle(cur, u, products, statuses)
-                    if info and info.get('items'):
-                        total_orders += 1
-                        user_orders_info[u].extend(item[0] for item in info['items'])
-                except Exception as e:
-                    conn.rollback()
-                    print(f"Error creating order for user {u}: {e}")
-                else:
-                    conn.commit()
+        total_orders, lost_orders = simulate_activity(conn, cur, users, products, statuses)
         print(f"Created {total_orders} orders.")
-
-        all_product_ids = [pid for pid, _, _ in products]
-        for u in users:
-            try:
-                purchased = list(set(user_orders_info.get(u, [])))
-                insert_reviews(cur, u, purchased)
-                insert_wishlist(cur, u, all_product_ids, purchased)
-            except Exception as e:
-                conn.rollback()
-                print(f"Error creating activity for user {u}: {e}")
-            else:
-                conn.commit()
+        if lost_orders:
+            print(f'--- Orders/Activity generation finished with {lost_orders} orders lost ---')
+            sys.exit(1)
         print('--- Orders/Activity generation finished ---')
 
     finally:
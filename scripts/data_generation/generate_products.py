@@ -0,0 +1,181 @@
+import os
+import sys
+import time
+import queue
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Dict, Any, Optional, Tuple
+
+from utils import load_id_map, open_exporter, output_mode
+
+# --- Configuration ---
+# Category generators under products/, each exposing
+# generate(vendors_map, categories_map, attributes_map, progress) -> (products, attributes)
+GENERATORS = [
+    'generate_cpu',
+    'generate_gpu_amd',
+    'generate_gpu_nvidia',
+    'generate_gpu_nvidia_gt',
+    'generate_ram',
+    'generate_psu',
+    'generate_motherboard',
+]
+PRODUCTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'products')
+REPORT_INTERVAL = 5  # seconds between global progress lines
+# With DATA_OUTPUT=csv/parquet every generator exports to its own subdirectory and gets
+# its own block of product IDs, so the parallel exports never collide
+EXPORT_ID_BLOCK = 1_000_000
+
+# Worker-process state, set once per process by _init_worker
+_maps: Optional[Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]] = None
+_progress_queue = None
+
+
+def _init_worker(maps: Tuple[Dict[str, int], Dict[str, int], Dict[str, int]], progress_queue):
+    """Receives the shared ID maps once per worker instead of once per task."""
+    global _maps, _progress_queue
+    _maps = maps
+    _progress_queue = progress_queue
+    # One generator runs at a time per worker, so a single pooled session is enough
+    os.environ.setdefault('DB_POOL_MAX', '1')
+    sys.path.insert(0, PRODUCTS_DIR)
+
+
+def _run_generator(index: int, name: str) -> Dict[str, Any]:
+    """Runs one category generator in a worker process on that process's own connection."""
+    from utils import close_pool
+
+    started = time.monotonic()
+    exporter = None
+    result = {'name': name, 'products': 0, 'attributes': 0, 'seconds': 0.0, 'error': None}
+
+    def progress(products: int, attributes: int):
+        _progress_queue.put((name, products, attributes))
+
+    try:
+        module = importlib.import_module(name)
+        if output_mode() != 'db':
+            exporter = open_exporter(name, default_id_start=1 + index * EXPORT_ID_BLOCK)
+        result['products'], result['attributes'] = module.generate(*_maps, progress=progress, writer=exporter)
+        if exporter:
+            exporter.close()
+    except Exception as e:
+        # Report instead of raising so one failed category does not hide the others' results
+        result['error'] = f"{type(e).__name__}: {e}"
+    finally:
+        # Pool workers exit without running atexit hooks; release the session explicitly
+        close_pool()
+    result['seconds'] = time.monotonic() - started
+    return result
+
+
+def load_maps() -> Optional[Tuple[Dict[str, int], Dict[str, int], Dict[str, int]]]:
+    """Loads the vendor, category and attribute maps written by 01_populate_base_entities.py."""
+    vendors_map = load_id_map('vendors')
+    categories_map = load_id_map('categories')
+    attributes_map = load_id_map('attributes')
+    if not vendors_map or not categories_map or not attributes_map:
+        return None
+    return vendors_map, categories_map, attributes_map
+
+
+def selected_generators() -> List[str]:
+    """GENERATORS, optionally narrowed by PRODUCT_GENERATORS (comma-separated, e.g. 'ram,psu')."""
+    raw = os.environ.get('PRODUCT_GENERATORS', '').strip()
+    if not raw:
+        return list(GENERATORS)
+    wanted = {n if n.startswith('generate_') else f'generate_{n}' for n in (n.strip() for n in raw.split(',')) if n}
+    unknown = wanted - set(GENERATORS)
+    if unknown:
+        print(f"Ignoring unknown generators: {', '.join(sorted(unknown))}")
+    return [g for g in GENERATORS if g in wanted]
+
+
+def _report(started: float, totals: Dict[str, List[int]], running: List[str]):
+    elapsed = time.monotonic() - started
+    products = sum(t[0] for t in totals.values())
+    attributes = sum(t[1] for t in totals.values())
+    rate = (products + attributes) / elapsed if elapsed > 0 else 0.0
+    print(
+        f"[progress] {elapsed:6.1f}s  products={products}  attributes={attributes}  "
+        f"{rate:,.0f} rows/s  running: {', '.join(running) or '-'}"
+    )
+
+
+def main():
+    print('--- Parallel Product Generation ---')
+    maps = load_maps()
+    if maps is None:
+        print('ID maps missing or malformed. Re-run 01_populate_base_entities.py')
+        return
+
+    names = selected_generators()
+    if not names:
+        print('No generators selected.')
+        return
+    try:
+        workers = int(os.environ.get('PRODUCT_WORKERS', len(names)))
+    except ValueError:
+        workers = len(names)
+    workers = max(1, min(workers, len(names)))
+    print(f"Running {len(names)} generators on {workers} worker processes.")
+
+    progress_queue = multiprocessing.Queue()
+    totals: Dict[str, List[int]] = {name: [0, 0] for name in names}
+    results: List[Dict[str, Any]] = []
+    finished = set()
+    started = time.monotonic()
+
+    def drain():
+        try:
+            while True:
+                name, products, attributes = progress_queue.get_nowait()
+                # Finished generators already hold their exact totals
+                if name not in finished:
+                    totals[name][0] += products
+                    totals[name][1] += attributes
+        except queue.Empty:
+            pass
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(maps, progress_queue)) as executor:
+        pending = {executor.submit(_run_generator, GENERATORS.index(name), name): name for name in names}
+        last_report = started
+        while pending:
+            done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+            drain()
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself died (e.g. killed or out of memory)
+                    result = {'name': name, 'products': 0, 'attributes': 0, 'seconds': 0.0,
+                              'error': f"{type(e).__name__}: {e}"}
+                results.append(result)
+                finished.add(name)
+                totals[name] = [result['products'], result['attributes']]
+                status = f"failed: {result['error']}" if result['error'] else 'done'
+                print(f"[{name}] {status} in {result['seconds']:.1f}s "
+                      f"({result['products']} products, {result['attributes']} attributes)")
+            if time.monotonic() - last_report >= REPORT_INTERVAL:
+                _report(started, totals, sorted(pending.values()))
+                last_report = time.monotonic()
+
+    elapsed = time.monotonic() - started
+    slowest = max(results, key=lambda r: r['seconds'])
+    serial = sum(r['seconds'] for r in results)
+    _report(started, totals, [])
+    print(f"Wall time {elapsed:.1f}s vs {serial:.1f}s of generator time "
+          f"(slowest: {slowest['name']}, {slowest['seconds']:.1f}s).")
+
+    failed = [r['name'] for r in results if r['error']]
+    if failed:
+        print(f"--- Finished with failures: {', '.join(failed)} ---")
+        sys.exit(1)
+    print('--- Parallel Product Generation finished ---')
+
+
+if __name__ == '__main__':
+    main()
@@ -5,12 +5,15 @@ import time
 import random
 import requests
 from bs4 import BeautifulSoup
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils import get_db_connection, batch_insert, load_ids
+from utils import (
+    ProgressCallback, TableWriter, get_db_connection, batch_insert, existing_product_keys, insert_products,
+    load_id_map, open_exporter, output_mode, write_products,
+)
 
 # --- Configuration ---
 # If URL_DIR is set, the script will iterate all .txt files in that directory (sorted) and process each file separately.
@@ -140,8 +143,13 @@ def parse_cpu_page(url: str) -> Optional[Dict[str, Any]]:
         print(f"An error occurred during parsing {url}: {e}")
         return None
 
-def process_batch(urls: List[str], vendors_map: Dict, categories_map: Dict, attributes_map: Dict):
-    """Parses a batch of URLs and inserts the data into the database transactionally."""
+def process_batch(urls: List[str], vendors_map: Dict, categories_map: Dict, attributes_map: Dict,
+                  writer: Optional[TableWriter] = None) -> Tuple[int, int]:
+    """
+    Parses a batch of URLs and inserts the data into the database transactionally, or
+    hands it to writer (e.g. a FlatFileExporter) when one is given.
+    Returns (products, attributes) parsed from the batch.
+    """
     print(f"--- Processing batch of {len(urls)} URLs ---")
     
     products_to_insert = []
@@ -202,72 +210,28 @@ def process_batch(urls: List[str], vendors_map: Dict, categories_map: Dict, attr
 
     if not products_to_insert:
         print("No valid products to insert in this batch.")
-        return
+        return 0, 0
+    parsed = (len(products_to_insert), len(attributes_to_link))
+    if writer is not None:
+        write_products(writer, products_to_insert, attributes_to_link)
+        return parsed
 
     # --- Database Insertion (single transaction per batch) ---
     conn = None
-    cursor = None
     try:
         conn = get_db_connection()
-        cursor = conn.cursor()
 
         # Filter out products that already exist (by name & vendor)
-        if products_to_insert:
-            candidate_names = list({p['product_NAME'] for p in products_to_insert})
-            candidate_vendors = list({p['ven_ID'] for p in products_to_insert})
-            name_binds = ','.join([f':en{i+1}' for i in range(len(candidate_names))])
-            ven_binds = ','.join([f':ev{i+1}' for i in range(len(candidate_vendors))])
-            existing_map: Dict[Tuple[str, int], int] = {}
-            if candidate_names and candidate_vendors:
-                exists_query = (
-                    f"SELECT product_ID, product_NAME, ven_ID FROM Products "
-                    f"WHERE product_NAME IN ({name_binds}) AND ven_ID IN ({ven_binds})"
-                )
-                bind_values = {}
-                for i, name in enumerate(candidate_names):
-                    bind_values[f'en{i+1}'] = name
-                for i, vid in enumerate(candidate_vendors):
-                    bind_values[f'ev{i+1}'] = vid
-                cursor.execute(exists_query, bind_values)
-                for pid, pname, pven in cursor.fetchall():
-                    existing_map[(pname, pven)] = pid
-
-            if existing_map:
-                before = len(products_to_insert)
-                products_to_insert = [p for p in products_to_insert if (p['product_NAME'], p['ven_ID']) not in existing_map]
-                if before != len(products_to_insert):
-                    print(f"Skipped {before - len(products_to_insert)} products already existing in DB.")
-
-        # Insert products (no auto-commit)
-        product_sql = (
-            "INSERT INTO Products (category_ID, product_NAME, product_DESCRIPT, product_PRICE, product_STOCK, ven_ID) "
-            "VALUES (:category_ID, :product_NAME, :product_DESCRIPT, :product_PRICE, :product_STOCK, :ven_ID)"
-        )
-        cursor.executemany(product_sql, products_to_insert, batcherrors=False)
-
-        # Build mapping of (name, ven_ID) -> product_ID to avoid ambiguity
-        product_names = list({p['product_NAME'] for p in products_to_insert})
-        vendor_ids = list({p['ven_ID'] for p in products_to_insert})
-        name_binds = ','.join([f':n{i+1}' for i in range(len(product_names))]) if product_names else None
-        ven_binds = ','.join([f':v{i+1}' for i in range(len(vendor_ids))]) if vendor_ids else None
-
-        if name_binds and ven_binds:
-            sql_query = (
-                f"SELECT product_ID, product_NAME, ven_ID FROM Products "
-                f"WHERE product_NAME IN ({name_binds}) AND ven_ID IN ({ven_binds})"
-            )
-            bind_values = {}
-            for i, name in enumerate(product_names):
-                bind_values[f'n{i+1}'] = name
-            for i, vid in enumerate(vendor_ids):
-                bind_values[f'v{i+1}'] = vid
-
-            cursor.execute(sql_query, bind_values)
-            product_id_map: Dict[Tuple[str, int], int] = {}
-            for pid, pname, pven in cursor.fetchall():
-                product_id_map[(pname, pven)] = pid
-        else:
-            product_id_map = {}
+        existing = existing_product_keys(conn, products_to_insert)
+        if existing:
+            before = len(products_to_insert)
+            products_to_insert = [p for p in products_to_insert if (p['product_NAME'], p['ven_ID']) not in existing]
+            if before != len(products_to_insert):
+                print(f"Skipped {before - len(products_to_insert)} products already existing in DB.")
+
+        # Insert products (no auto-commit); IDs come back through RETURNING ... INTO,
+        # keyed by (name, ven_ID) to avoid ambiguity
+        product_id_map = insert_products(conn, products_to_insert) if products_to_insert else {}
 
         # Link attributes and prepare insert rows
         final_attributes_to_insert = []
@@ -286,7 +250,7 @@ def process_batch(urls: List[str], vendors_map: Dict, categories_map: Dict, attr
             safe_final_attrs = [row for row in final_attributes_to_insert if row.get('nominal')]
             if safe_final_attrs:
                 attribute_sql = "INSERT INTO ProductAttributes (product_ID, att_ID, nominal) VALUES (:product_ID, :att_ID, :nominal)"
-                cursor.executemany(attribute_sql, safe_final_attrs, batcherrors=False)
+                batch_insert(conn, attribute_sql, safe_final_attrs, commit_now=False, label='ProductAttributes')
 
         conn.commit()
         print(f"Successfully processed and inserted data for {len(products_to_insert)} products.")
@@ -298,11 +262,11 @@ def process_batch(urls: List[str], vendors_map: Dict, categories_map: Dict, attr
         if conn:
             conn.rollback()
         print(f"A critical error occurred during batch processing. Transaction rolled back. Error: {e}")
+        raise
     finally:
-        if cursor:
-            cursor.close()
         if conn:
             conn.close()
+    return parsed
 
 def read_urls_from_file(file_path: str) -> List[str]:
     try:
@@ -313,29 +277,8 @@ def read_urls_from_file(file_path: str) -> List[str]:
         return []
 
 
-def main():
-    """Main function to run the CPU data generation process."""
-    print("--- Starting CPU Data Generation via Live Parser ---")
-    
-    # 1. Load prerequisite IDs from JSON files
-    # These are created by 01_populate_base_entities.py
-    vendors_raw = load_ids('vendors')
-    categories_raw = load_ids('categories')
-    attributes_raw = load_ids('attributes')
-    try:
-        vendors_map = {v['name']: v['id'] for v in vendors_raw}
-        categories_map = {c['name']: c['id'] for c in categories_raw}
-        attributes_map = {a['name']: a['id'] for a in attributes_raw}
-    except (TypeError, KeyError):
-        print("Error: ID maps are malformed. Please re-run `01_populate_base_entities.py`.")
-        return
-
-    # Validate essential entries
-    if not vendors_map or not attributes_map or 'CPU' not in categories_map:
-        print("Error: Missing vendors, attributes, or CPU category. Run `01_populate_base_entities.py` first.")
-        return
-
-    # 2. Determine input: directory of files or single file
+def url_batches() -> Iterator[List[str]]:
+    """Yields BATCH_SIZE slices of the URL files (directory mode, or the single-file fallback)."""
     base_dir = os.path.dirname(__file__)
     url_dir_path = os.path.join(base_dir, URL_DIR)
     if os.path.isdir(url_dir_path):
@@ -353,13 +296,7 @@ def main():
                 continue
             print(f"=== Processing URL file: {os.path.basename(path)} ({len(urls)} URLs) ===")
             for i in range(0, len(urls), BATCH_SIZE):
-                batch_urls = urls[i:i + BATCH_SIZE]
-                try:
-                    process_batch(batch_urls, vendors_map, categories_map, attributes_map)
-                except RateLimitError as e:
-                    print(f"Rate limit encountered. Stopping early. Details: {e}")
-                    print("Tip: Wait some time before retrying, or reduce request rate.")
-                    sys.exit(2)
+                yield urls[i:i + BATCH_SIZE]
     else:
         # Fallback to single file mode
         url_file_path = os.path.join(base_dir, URL_FILE)
@@ -368,13 +305,53 @@ def main():
             print(f"Error: URL file not found at {url_file_path}. Please create it and add CPU URLs.")
             return
         for i in range(0, len(urls), BATCH_SIZE):
-            batch_urls = urls[i:i + BATCH_SIZE]
-            try:
-                process_batch(batch_urls, vendors_map, categories_map, attributes_map)
-            except RateLimitError as e:
-                print(f"Rate limit encountered. Stopping early. Details: {e}")
-                print("Tip: Wait some time before retrying, or reduce request rate.")
-                sys.exit(2)
+            yield urls[i:i + BATCH_SIZE]
+
+
+def generate(vendors_map: Dict[str, int], categories_map: Dict[str, int], attributes_map: Dict[str, int],
+             progress: Optional[ProgressCallback] = None, writer: Optional[TableWriter] = None) -> Tuple[int, int]:
+    """
+    Parses every URL batch and inserts it (or passes it to writer). progress(products,
+    attributes) is called after every batch. Returns (products, attributes) parsed.
+
+    Raises:
+        RateLimitError: If the site starts throttling; the batches before it are committed
+    """
+    total_products = total_attrs = 0
+    for batch_urls in url_batches():
+        products, attrs = process_batch(batch_urls, vendors_map, categories_map, attributes_map, writer)
+        total_products += products
+        total_attrs += attrs
+        if progress:
+            progress(products, attrs)
+    return total_products, total_attrs
+
+
+def main():
+    """Main function to run the CPU data generation process."""
+    print("--- Starting CPU Data Generation via Live Parser ---")
+    
+    # 1. Load prerequisite IDs from the ID registry
+    # These are created by 01_populate_base_entities.py
+    vendors_map = load_id_map('vendors')
+    categories_map = load_id_map('categories')
+    attributes_map = load_id_map('attributes')
+
+    # Validate essential entries
+    if not vendors_map or not attributes_map or 'CPU' not in categories_map:
+        print("Error: Missing vendors, attributes, or CPU category. Run `01_populate_base_entities.py` first.")
+        return
+
+    exporter = open_exporter('generate_cpu') if output_mode() != 'db' else None
+    try:
+        generate(vendors_map, categories_map, attributes_map, writer=exporter)
+    except RateLimitError as e:
+        print(f"Rate limit encountered. Stopping early. Details: {e}")
+        print("Tip: Wait some time before retrying, or reduce request rate.")
+        sys.exit(2)
+    finally:
+        if exporter:
+            exporter.close()
 
     print("--- CPU Data Generation Process Finished ---")
 
@@ -1,12 +1,13 @@
 import os
 import sys
 import random
-from typing import List, Dict, Any, Optional, Tuple
+from functools import partial
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 
 # Make utils importable
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils import get_db_connection, load_ids
+from utils import ProductWithAttributes, generate_catalog, run_catalog_generator
 
 
 # --- Configuration ---
@@ -366,7 +367,7 @@ def compute_core_config(gen_key: str, tier_key: str) -> Tuple[int, int, int, int
     return cu, shaders, tmus, rops, matrix
 
 
-def make_products(vendors_map: Dict[str, int], categories_map: Dict[str, int], attributes_map: Dict[str, int]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+def make_products(vendors_map: Dict[str, int], categories_map: Dict[str, int], attributes_map: Dict[str, int]) -> Iterator[ProductWithAttributes]:
     gpu_category_id = categories_map.get('GPU')
     if not gpu_category_id:
         raise RuntimeError('GPU category not found. Run base entities population first.')
@@ -440,7 +441,6 @@ def make_products(vendors_map: Dict[str, int], categories_map: Dict[str, int], a
         uniq[(g, p, n)] = (g, p, n)
     model_grid = list(uniq.values())
 
-    products: List[Dict[str, Any]] = []
     attributes: List[Dict[str, Any]] = []
 
     # Sanity: ensure a few critical attributes exist to avoid generating nothing due to missing IDs
@@ -486,14 +486,15 @@ def make_products(vendors_map: Dict[str, int], categories_map: Dict[str, int], a
                 display_name = f"{vendor_name} Radeon {prefix} {base_num} {variant} {vram} GB"
                 board_num = f"{random.choice(['109', '113'])}-D{random.randint(600,799)}-{random.randint(10,99):02d}"
 
-                products.append({
+                product = {
                     'category_ID': gpu_category_id,
                     'product_NAME': display_name,
                     'product_DESCRIPT': f"{vendor_name} custom design based on AMD Radeon {prefix} {base_num} {variant}.",
                     'product_PRICE': price,
                     'product_STOCK': random.randint(15, 120),
                     'ven_ID': ven_id,
-                })
+                }
+                attributes = []
 
                 def add_attr(key: str, value: Any):
                     att_id = attributes_map.get(key)
@@ -570,119 +571,19 @@ def make_products(vendors_map: Dict[str, int], categories_map: Dict[str, int], a
                 if vcn:
                     add_attr('Video Core Next', vcn)
                 add_attr('Chip Package', 'MCM' if gen_key == 'RX-7000' and base_num >= 7900 else 'Monolithic')
+                yield product, attributes
 
-    return products, attributes
-
-
-def insert_into_db(products: List[Dict[str, Any]], attributes: List[Dict[str, Any]]):
-    if not products:
-        print('No products to insert.')
-        return
-
-    conn = None
-    cur = None
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-
-        # Deduplicate existing
-        candidate_names = list({p['product_NAME'] for p in products})
-        candidate_vendors = list({p['ven_ID'] for p in products})
-        existing_map: Dict[Tuple[str, int], int] = {}
-        if candidate_names and candidate_vendors:
-            name_binds = ','.join([f":n{i+1}" for i in range(len(candidate_names))])
-            ven_binds = ','.join([f":v{i+1}" for i in range(len(candidate_vendors))])
-            q = (
-                f"SELECT product_ID, product_NAME, ven_ID FROM Products "
-                f"WHERE product_NAME IN ({name_binds}) AND ven_ID IN ({ven_binds})"
-            )
-            bind_values = {}
-            for i, name in enumerate(candidate_names):
-                bind_values[f'n{i+1}'] = name
-            for i, vid in enumerate(candidate_vendors):
-                bind_values[f'v{i+1}'] = vid
-            cur.execute(q, bind_values)
-            for pid, pname, pven in cur.fetchall():
-                existing_map[(pname, pven)] = pid
-
-        new_products = [p for p in products if (p['product_NAME'], p['ven_ID']) not in existing_map]
-        if not new_products:
-            print('All generated products already exist. Nothing to insert.')
-            return
-
-        prod_sql = (
-            "INSERT INTO Products (category_ID, product_NAME, product_DESCRIPT, product_PRICE, product_STOCK, ven_ID) "
-            "VALUES (:category_ID, :product_NAME, :product_DESCRIPT, :product_PRICE, :product_STOCK, :ven_ID)"
-        )
-        cur.executemany(prod_sql, new_products, batcherrors=False)
-
-        # Map names to IDs
-        names = list({p['product_NAME'] for p in new_products})
-        vens = list({p['ven_ID'] for p in new_products})
-        name_binds = ','.join([f":n{i+1}" for i in range(len(names))])
-        ven_binds = ','.join([f":v{i+1}" for i in range(len(vens))])
-        q2 = (
-            f"SELECT product_ID, product_NAME, ven_ID FROM Products "
-            f"WHERE product_NAME IN ({name_binds}) AND ven_ID IN ({ven_binds})"
-        )
-        bind = {}
-        for i, name in enumerate(names):
-            bind[f'n{i+1}'] = name
-        for i, vid in enumerate(vens):
-            bind[f'v{i+1}'] = vid
-        cur.execute(q2, bind)
-        id_map: Dict[Tuple[str, int], int] = {(n, v): i for i, n, v in cur.fetchall()}
-
-        final_attrs = []
-        for a in attributes:
-            pid = id_map.get((a['product_NAME'], a['ven_ID']))
-            if pid and a.get('nominal'):
-                final_attrs.append({'product_ID': pid, 'att_ID': a['att_ID'], 'nominal': a['nominal']})
-
-        if final_attrs:
-            attr_sql = "INSERT INTO ProductAttributes (product_ID, att_ID, nominal) VALUES (:product_ID, :att_ID, :nominal)"
-            cur.executemany(attr_sql, final_attrs, batcherrors=False)
-
-        conn.commit()
-        print(f"Inserted {len(new_products)} products and {len(final_attrs)} attributes.")
-
-    except Exception as e:
-        if conn:
-            conn.rollback()
-        print(f"Error inserting AMD GPUs. Rolled back. Details: {e}")
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
+
+# Chunked insert (or export) of make_products(); see utils.generate_catalog
+generate = partial(generate_catalog, make_products, batch_size=BATCH_SIZE, label='AMD GPUs')
 
 
 def main():
-    print('--- AMD GPU Data Generator ---')
-    vendors_raw = load_ids('vendors')
-    categories_raw = load_ids('categories')
-    attributes_raw = load_ids('attributes')
-    try:
-        vendors_map = {v['name']: v['id'] for v in vendors_raw}
-        categories_map = {c['name']: c['id'] for c in categories_raw}
-        attributes_map = {a['name']: a['id'] for a in attributes_raw}
-    except Exception:
-        print('ID maps malformed. Re-run 01_populate_base_entities.py')
-        return
-
-    if 'GPU' not in categories_map:
-        print('GPU category missing. Populate base entities first.')
-        return
-
-    products, attrs = make_products(vendors_map, categories_map, attributes_map)
-    print(f'Prepared {len(products)} products and {len(attrs)} attributes for insertion.')
-    for i in range(0, len(products), BATCH_SIZE):
-        chunk_products = products[i:i+BATCH_SIZE]
-        names_in_chunk = {p['product_NAME'] for p in chunk_products}
-        attrs_chunk = [a for a in attrs if a['product_NAME'] in names_in_chunk]
-        insert_into_db(chunk_products, attrs_chunk)
-
-    print('--- Generation finished ---')
+    run_catalog_generator(
+        'AMD GPU', os.path.splitext(os.path.basename(__file__))[0], generate,
+        lambda categories: 'GPU' in categories,
+        'GPU category missing. Populate base entities first.',
+    )
 
 
 if __name__ == '__main__':
@@ -1,12 +1,13 @@
 import os
 import sys
 import random
-from typing import List, Dict, Any, Optional, Tuple
+from functools import partial
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 
 # Make utils importable
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils import get_db_connection, load_ids
+from utils import ProductWithAttributes, generate_catalog, run_catalog_generator
 
 
 # --- Configuration ---
@@ -241,7 +242,7 @@ def price_for(watt: int, efficiency: str, modularity: str, form: str, atx_versio
     return round(price * (1 + jitter), 2)
 
 
-def make_psu_products(vendors_map: Dict[str, int], categories_map: Dict[str, int], attributes_map: Dict[str, int]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+def make_psu_products(vendors_map: Dict[str, int], categories_map: Dict[str, int], attributes_map: Dict[str, int]) -> Iterator[ProductWithAttributes]:
     cat_id = pick_category_id(categories_map)
     if not cat_id:
         raise RuntimeError('Power Supply category not found. Add a PSU category first.')
@@ -250,7 +251,6 @@ def make_psu_products(vendors_map: Dict[str, int], categories_map: Dict[str, int
     if not vendors:
         raise RuntimeError('No suitable PSU vendors found.')
 
-    products: List[Dict[str, Any]] = []
     attributes: List[Dict[str, Any]] = []
 
     def add_attr(pname: str, ven_id: int, key: str, value: Any):
@@ -299,7 +299,7 @@ def make_psu_products(vendors_map: Dict[str, int], categories_map: Dict[str, int
                         price = price_for(watt, efficiency, modularity, form, atx_v)
 
                         # Product row
-                        products.append({
+                        product = {
                             'category_ID': cat_id,
                             'product_NAME': display_name,
                             'product_DESCRIPT': (
@@ -311,7 +311,8 @@ def make_psu_products(vendors_map: Dict[str, int], categories_map: Dict[str, int
                             'product_PRICE': price,
                             'product_STOCK': random.randint(8, 80),
                             'ven_ID': ven_id,
-                        })
+                        }
+                        attributes = []
 
                         # Attributes (guard duplicates per product)
                         added = set()
@@ -346,125 +347,19 @@ def make_psu_products(vendors_map: Dict[str, int], categories_map: Dict[str, int
                         warranty = random.choice(['7-year warranty', '10-year warranty'])
                         features.append(warranty)
                         add_once('Features', '; '.join(features))
+                        yield product, attributes
 
-    return products, attributes
-
-
-def insert_into_db(products: List[Dict[str, Any]], attributes: List[Dict[str, Any]]):
-    if not products:
-        print('No products to insert.')
-        return
-
-    conn = None
-    cur = None
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-
-        # Deduplicate existing
-        candidate_names = list({p['product_NAME'] for p in products})
-        candidate_vendors = list({p['ven_ID'] for p in products})
-        existing_map: Dict[Tuple[str, int], int] = {}
-        if candidate_names and candidate_vendors:
-            name_binds = ','.join([f":n{i+1}" for i in range(len(candidate_names))])
-            ven_binds = ','.join([f":v{i+1}" for i in range(len(candidate_vendors))])
-            q = (
-                f"SELECT product_ID, product_NAME, ven_ID FROM Products "
-                f"WHERE product_NAME IN ({name_binds}) AND ven_ID IN ({ven_binds})"
-            )
-            bind_values = {}
-            for i, name in enumerate(candidate_names):
-                bind_values[f'n{i+1}'] = name
-            for i, vid in enumerate(candidate_vendors):
-                bind_values[f'v{i+1}'] = vid
-            cur.execute(q, bind_values)
-            for pid, pname, pven in cur.fetchall():
-                existing_map[(pname, pven)] = pid
-
-        new_products = [p for p in products if (p['product_NAME'], p['ven_ID']) not in existing_map]
-        if not new_products:
-            print('All generated products already exist. Nothing to insert.')
-            return
 
-        prod_sql = (
-            "INSERT INTO Products (category_ID, product_NAME, product_DESCRIPT, product_PRICE, product_STOCK, ven_ID) "
-            "VALUES (:category_ID, :product_NAME, :product_DESCRIPT, :product_PRICE, :product_STOCK, :ven_ID)"
-        )
-        cur.executemany(prod_sql, new_products, batcherrors=False)
-
-        # Map names to IDs
-        names = list({p['product_NAME'] for p in new_products})
-        vens = list({p['ven_ID'] for p in new_products})
-        name_binds = ','.join([f":n{i+1}" for i in range(len(names))])
-        ven_binds = ','.join([f":v{i+1}" for i in range(len(vens))])
-        q2 = (
-            f"SELECT product_ID, product_NAME, ven_ID FROM Products "
-            f"WHERE product_NAME IN ({name_binds}) AND ven_ID IN ({ven_binds})"
-        )
-        bind = {}
-        for i, name in enumerate(names):
-            bind[f'n{i+1}'] = name
-        for i, vid in enumerate(vens):
-            bind[f'v{i+1}'] = vid
-        cur.execute(q2, bind)
-        id_map: Dict[Tuple[str, int], int] = {(n, v): i for i, n, v in cur.fetchall()}
-
-        final_attrs = []
-        seen_attr_keys: set[Tuple[int, int, str]] = set()
-        for a in attributes:
-            pid = id_map.get((a['product_NAME'], a['ven_ID']))
-            if pid and a.get('nominal'):
-                key = (pid, a['att_ID'], str(a['nominal']))
-                if key in seen_attr_keys:
-                    continue
-                seen_attr_keys.add(key)
-                final_attrs.append({'product_ID': pid, 'att_ID': a['att_ID'], 'nominal': a['nominal']})
-
-        if final_attrs:
-            attr_sql = "INSERT INTO ProductAttributes (product_ID, att_ID, nominal) VALUES (:product_ID, :att_ID, :nominal)"
-            cur.executemany(attr_sql, final_attrs, batcherrors=False)
-
-        conn.commit()
-        print(f"Inserted {len(new_products)} products and {len(final_attrs)} attributes.")
-
-    except Exception as e:
-        if conn:
-            conn.rollback()
-        print(f"Error inserting PSUs. Rolled back. Details: {e}")
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
+# Chunked insert (or export) of make_psu_products(); see utils.generate_catalog
+generate = partial(generate_catalog, make_psu_products, batch_size=BATCH_SIZE, label='PSUs')
 
 
 def main():
-    print('--- PSU Data Generator ---')
-    vendors_raw = load_ids('vendors')
-    categories_raw = load_ids('categories')
-    attributes_raw = load_ids('attributes')
-    try:
-        vendors_map = {v['name']: v['id'] for v in vendors_raw}
-        categories_map = {c['name']: c['id'] for c in categories_raw}
-        attributes_map = {a['name']: a['id'] for a in attributes_raw}
-    except Exception:
-        print('ID maps malformed. Re-run 01_populate_base_entities.py')
-        return
-
-    cat_id = pick_category_id(categories_map)
-    if not cat_id:
-        print('PSU category missing. Populate base entities first (add Power Supply category).')
-        return
-
-    products, attrs = make_psu_products(vendors_map, categories_map, attributes_map)
-    print(f'Prepared {len(products)} products and {len(attrs)} attributes for insertion.')
-    for i in range(0, len(products), BATCH_SIZE):
-        chunk_products = products[i:i+BATCH_SIZE]
-        names_in_chunk = {p['product_NAME'] for p in chunk_products}
-        attrs_chunk = [a for a in attrs if a['product_NAME'] in names_in_chunk]
-        insert_into_db(chunk_products, attrs_chunk)
-
-    print('--- PSU Generation finished ---')
+    run_catalog_generator(
+        'PSU', os.path.splitext(os.path.basename(__file__))[0], generate,
+        pick_category_id,
+        'PSU category missing. Populate base entities first (add Power Supply category).',
+    )
 
 
 if __name__ == '__main__':
@@ -1,12 +1,13 @@
 import os
 import sys
 import random
-from typing import List, Dict, Any, Optional, Tuple
+from functools import partial
+from typing import List, Dict, Any, Optional, Tuple, Iterator
 
 # Make utils importable
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils import get_db_connection, load_ids
+from utils import ProductWithAttributes, generate_catalog, run_catalog_generator
 
 
 # --- Configuration ---
@@ -139,7 +140,7 @@ def profile_and_timings(ddr: str, speed: int) -> Tuple[str, str, str]:
     return 'JEDEC', 'Auto', '1.20'
 
 
-def make_ram_products(vendors_map: Dict[str, int], categories_map: Dict[str, int], attributes_map: Dict[str, int]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+def make_ram_products(vendors_map: Dict[str, int], categories_map: Dict[str, int], attributes_map: Dict[str, int]) -> Iterator[ProductWithAttributes]:
     cat_id = pick_category_id(categories_map)
     if not cat_id:
         raise RuntimeError('RAM category not found. Add a RAM/Memory category first.')
@@ -148,7 +149,6 @@ def make_ram_products(vendors_map: Dict[str, int], categories_map: Dict[str, int
     if not vendors:
         raise RuntimeError('No suitable RAM vendors found.')
 
-    products: List[Dict[str, Any]] = []
     attributes: List[Dict[str, Any]] = []
 
     def add_attr(pname: str, ven_id: int, key: str, value: Any):
@@ -231,14 +231,15 @@ def make_ram_products(vendors_map: Dict[str, int], categories_map: Dict[str, int
                         seen_names.add((ven_id, display_name))
 
                         # Assemble product record
-                        products.append({
+                        product = {
                             'category_ID': cat_id,
                             'product_NAME': display_name,
                             'product_DESCRIPT': f"{vendor_name} {line} {ddr} memory kit {kit_capacity}GB {modules}x{module_capacity}GB, {speed}MT/s {profile}, timings {timings}, {voltage}V, {interface} {('ECC' if ecc=='Yes' else 'Non-ECC')}",
                             'product_PRICE': price,
                             'product_STOCK': random.randint(10, 120),
                             'ven_ID': ven_id,
-                        })
+                        }
+                        attributes = []
 
                         # Part number (synthetic)
                         part_prefix = ''.join(ch for ch in vendor_name.upper() if ch.isalnum())[:4]
@@ -265,125 +266,19 @@ def make_ram_products(vendors_map: Dict[str, int], categories_map: Dict[str, int
                         add_once('Height', f"{height_mm} mm")
                         add_once('Width', f"{width_mm} mm")
                         add_once('Part#', part_num)
+                        yield product, attributes
 
-    return products, attributes
-
-
-def insert_into_db(products: List[Dict[str, Any]], attributes: List[Dict[str, Any]]):
-    if not products:
-        print('No products to insert.')
-        return
-
-    conn = None
-    cur = None
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-
-        # Deduplicate existing
-        candidate_names = list({p['product_NAME'] for p in products})
-        candidate_vendors = list({p['ven_ID'] for p in products})
-        existing_map: Dict[Tuple[str, int], int] = {}
-        if candidate_names and candidate_vendors:
-            name_binds = ','.join([f":n{i+1}" for i in range(len(candidate_names))])
-            ven_binds = ','.join([f":v{i+1}" for i in range(len(candidate_vendors))])
-            q = (
-                f"SELECT product_ID, product_NAME, ven_ID FROM Products "
-                f"WHERE product_NAME IN ({name_binds}) AND ven_ID IN ({ven_binds})"
-            )
-            bind_values = {}
-            for i, name in enumerate(candidate_names):
-                bind_values[f'n{i+1}'] = name
-            for i, vid in enumerate(candidate_vendors):
-                bind_values[f'v{i+1}'] = vid
-            cur.execute(q, bind_values)
-            for pid, pname, pven in cur.fetchall():
-                existing_map[(pname, pven)] = pid
-
-        new_products = [p for p in products if (p['product_NAME'], p['ven_ID']) not in existing_map]
-        if not new_products:
-            print('All generated products already exist. Nothing to insert.')
-            return
-
-        prod_sql = (
-            "INSERT INTO Products (category_ID, product_NAME, product_DESCRIPT, product_PRICE, product_STOCK, ven_ID) "
-            "VALUES (:category_ID, :product_NAME, :product_DESCRIPT, :product_PRICE, :product_STOCK, :ven_ID)"
-        )
-        cur.executemany(prod_sql, new_products, batcherrors=False)
-
-        # Map names to IDs
-        names = list({p['product_NAME'] for p in new_products})
-        vens = list({p['ven_ID'] for p in new_products})
-        name_binds = ','.join([f":n{i+1}" for i in range(len(names))])
-        ven_binds = ','.join([f":v{i+1}" for i in range(len(vens))])
-        q2 = (
-            f"SELECT product_ID, product_NAME, ven_ID FROM Products "
-            f"WHERE product_NAME IN ({name_binds}) AND ven_ID IN ({ven_binds})"
-        )
-        bind = {}
-        for i, name in enumerate(names):
-            bind[f'n{i+1}'] = name
-        for i, vid in enumerate(vens):
-            bind[f'v{i+1}'] = vid
-        cur.execute(q2, bind)
-        id_map: Dict[Tuple[str, int], int] = {(n, v): i for i, n, v in cur.fetchall()}
-
-        final_attrs = []
-        seen_attr_keys: set[Tuple[int, int, str]] = set()
-        for a in attributes:
-            pid = id_map.get((a['product_NAME'], a['ven_ID']))
-            if pid and a.get('nominal'):
-                key = (pid, a['att_ID'], str(a['nominal']))
-                if key in seen_attr_keys:
-                    continue
-                seen_attr_keys.add(key)
-                final_attrs.append({'product_ID': pid, 'att_ID': a['att_ID'], 'nominal': a['nominal']})
-
-        if final_attrs:
-            attr_sql = "INSERT INTO ProductAttributes (product_ID, att_ID, nominal) VALUES (:product_ID, :att_ID, :nominal)"
-            cur.executemany(attr_sql, final_attrs, batcherrors=False)
 
-        conn.commit()
-        print(f"Inserted {len(new_products)} products and {len(final_attrs)} attributes.")
-
-    except Exception as e:
-        if conn:
-            conn.rollback()
-        print(f"Error inserting RAM products. Rolled back. Details: {e}")
-    finally:
-        if cur:
-            cur.close()
-        if conn:
-            conn.close()
+# Chunked insert (or export) of make_ram_products(); see utils.generate_catalog
+generate = partial(generate_catalog, make_ram_products, batch_size=BATCH_SIZE, label='RAM products')
 
 
 def main():
-    print('--- RAM Data Generator ---')
-    vendors_raw = load_ids('vendors')
-    categories_raw = load_ids('categories')
-    attributes_raw = load_ids('attributes')
-    try:
-        vendors_map = {v['name']: v['id'] for v in vendors_raw}
-        categories_map = {c['name']: c['id'] for c in categories_raw}
-        attributes_map = {a['name']: a['id'] for a in attributes_raw}
-    except Exception:
-        print('ID maps malformed. Re-run 01_populate_base_entities.py')
-        return
-
-    cat_id = pick_category_id(categories_map)
-    if not cat_id:
-        print('RAM category missing. Populate base entities first (add RAM/Memory category).')
-        return
-
-    products, attrs = make_ram_products(vendors_map, categories_map, attributes_map)
-    print(f'Prepared {len(products)} products and {len(attrs)} attributes for insertion.')
-    for i in range(0, len(products), BATCH_SIZE):
-        chunk_products = products[i:i+BATCH_SIZE]
-        names_in_chunk = {p['product_NAME'] for p in chunk_products}
-        attrs_chunk = [a for a in attrs if a['product_NAME'] in names_in_chunk]
-        insert_into_db(chunk_products, attrs_chunk)
-
-    print('--- RAM Generation finished ---')
+    run_catalog_generator(
+        'RAM', os.path.splitext(os.path.basename(__file__))[0], generate,
+        pick_category_id,
+        'RAM category missing. Populate base entities first (add RAM/Memory category).',
+    )
 
 
 if __name__ == '__main__':
@@ -0,0 +1,404 @@
+# Deterministic scale-factor dataset generator (TPC-H style).
+#
+# One DATASET_SEED and one SCALE_FACTOR fully determine users, products, orders (with
+# their items), payments and reviews:
+#   * every table chunk draws from its own RNG stream derived from (seed, table, chunk),
+#     so a chunk's rows never depend on how much was generated before it;
+#   * only random.Random.random() is used (its sequence for a given seed is guaranteed
+#     across Python versions) and values are built from it with plain arithmetic;
+#   * no wall clock, set/dict iteration order or database state enters the rows. Rows
+#     reference each other through logical keys (1..N per table) and status keys;
+#     DatasetSink maps those to real IDs when writing to Oracle or to export files.
+# A SHA-256 digest of the canonical row text is printed per table, so two runs (or two
+# machines) can be compared byte for byte.
+#
+# Memory stays flat: users, products and activity are generated in chunks of CHUNK_SIZE
+# users (all orders of a user fall into one chunk); only per-product prices and, when
+# loading into Oracle, the user/product ID arrays are kept for the whole run.
+
+import os
+import sys
+import time
+import random
+import hashlib
+import datetime as dt
+from array import array
+from typing import List, Dict, Any, Optional, Tuple, Iterator, Sequence
+
+# Make utils importable
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from utils import (
+    EXPORT_DIR, FlatFileExporter, OracleTableWriter, TableWriter, format_value, get_db_connection,
+    load_id_map, load_status_ids,
+)
+
+
+# --- Config ---
+SCALE_FACTOR = float(os.getenv('SCALE_FACTOR', '1'))
+DATASET_SEED = int(os.getenv('DATASET_SEED', '20250101'))
+# 'db' loads into Oracle, 'csv' / 'parquet' export for the bulk loaders (see
+# utils.FlatFileExporter), 'none' only generates and prints the digests
+DATASET_TARGET = os.getenv('DATASET_TARGET', os.getenv('DATA_OUTPUT', 'db')).lower()
+# Part of the dataset definition (it delimits the RNG streams): changing it changes the rows
+CHUNK_SIZE = 2000
+
+# Per scale factor: SF=1 is ~10k users, 2k products and ~150k orders; SF=67 is ~10M orders
+USERS_PER_SF = 10_000
+PRODUCTS_PER_SF = 2_000
+ORDERS_PER_USER_MEAN = 15
+
+DATASET_START = dt.datetime(2023, 1, 1)
+DATASET_DAYS = 730
+
+# Same knobs (and defaults) as 02_populate_orders_refactored.py
+MAX_ITEMS_PER_ORDER = int(os.getenv('MAX_ITEMS_PER_ORDER', '5'))
+PAYMENT_FAIL_RATE = float(os.getenv('PAYMENT_FAIL_RATE', '0.06'))
+ORDER_CANCEL_RATE = float(os.getenv('ORDER_CANCEL_RATE', '0.05'))
+ORDER_RETURN_RATE = float(os.getenv('ORDER_RETURN_RATE', '0.03'))
+ORDER_REFUND_RATE = float(os.getenv('ORDER_REFUND_RATE', '0.02'))
+REVIEW_RATE = float(os.getenv('REVIEW_RATE', '0.35'))
+DEFAULT_CURRENCY = os.getenv('CURRENCY', 'USD')[:3].upper() or 'USD'
+
+PRICE_MIN = 15.0
+PRICE_MAX = 2500.0
+
+FIRST_NAMES = ['alex', 'maria', 'ivan', 'olga', 'john', 'anna', 'max', 'elena', 'leo', 'sofia',
+               'dmitry', 'kate', 'artem', 'irina', 'paul', 'nina', 'oleg', 'vera', 'mark', 'yulia']
+LAST_NAMES = ['smith', 'petrov', 'ivanova', 'brown', 'kuznetsov', 'miller', 'sokolova', 'wilson',
+              'popov', 'novak', 'morozova', 'taylor', 'volkov', 'lee', 'pavlova', 'clark']
+SERIES = ['Core', 'Pro', 'Plus', 'Max', 'Lite', 'Ultra', 'Prime', 'Edge']
+PAYMENT_METHODS = ['Card', 'PayPal', 'ApplePay', 'GooglePay']
+CARRIERS = ['DHL', 'FedEx', 'UPS', 'USPS']
+REVIEW_COMMENTS = ['Отличное качество.', 'Быстрая доставка.', 'Рекомендую.']
+
+# Column order of the generated rows (logical keys, status keys instead of IDs)
+TABLE_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    'Users': ('user_key', 'user_NAME', 'user_PASS', 'user_EMAIL', 'user_PHONE', 'user_ROLE', 'created_AT'),
+    'Products': ('product_key', 'category_NAME', 'ven_NAME', 'product_NAME', 'product_DESCRIPT',
+                 'product_PRICE', 'product_STOCK'),
+    'Orders': ('order_key', 'user_key', 'order_DATE', 'order_STATUS', 'order_AMOUNT', 'delivery_ADDRESS',
+               'shipped_DATE', 'estimated_delivery_DATE', 'actual_delivery_DATE', 'delivery_STATUS',
+               'shipping_carrier_NAME', 'tracking_NUMBER'),
+    'OrderItems': ('order_key', 'product_key', 'quantity', 'price'),
+    'Payments': ('order_key', 'payment_DATE', 'payment_METHOD', 'payment_STATUS', 'payment_AMOUNT',
+                 'currency', 'transaction_ID'),
+    'Review': ('user_key', 'product_key', 'rew_RATING', 'rew_COMMENT', 'rew_DATE'),
+}
+ACTIVITY_TABLES = ('Orders', 'OrderItems', 'Payments', 'Review')
+
+
+class StreamRng:
+    """
+    RNG for one (seed, stream, chunk). Every draw is derived from random.Random.random(),
+    whose output for an integer seed Python keeps stable across versions (randint,
+    sample, gauss etc. are not covered by that guarantee).
+    """
+
+    def __init__(self, seed: int, stream: str, chunk: int = 0):
+        digest = hashlib.sha256(f'{seed}:{stream}:{chunk}'.encode()).digest()
+        self.random = random.Random(int.from_bytes(digest[:8], 'big')).random
+
+    def randint(self, a: int, b: int) -> int:
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, seq: Sequence[Any]) -> Any:
+        return seq[int(self.random() * len(seq))]
+
+    def chance(self, p: float) -> bool:
+        return self.random() < p
+
+    def skewed(self, n: int) -> int:
+        """0..n-1 with low indexes more likely (a few hot products, a long tail)."""
+        u = self.random()
+        return int(n * u * u)
+
+
+def format_row(row: Sequence[Any]) -> str:
+    """Canonical text of a row (tab-separated format_value), the unit of the digests."""
+    return '\t'.join(format_value(v) for v in row)
+
+
+class ScaledDataset:
+    """Row streams for one (seed, scale factor) over the given category and vendor names."""
+
+    def __init__(self, seed: int, scale_factor: float, categories: List[str], vendors: List[str]):
+        if scale_factor <= 0:
+            raise ValueError('SCALE_FACTOR must be positive')
+        if not categories or not vendors:
+            raise ValueError('Categories and vendors are required')
+        self.seed = seed
+        self.scale_factor = scale_factor
+        # Sorted so the result does not depend on the order the maps were saved in
+        self.categories = sorted(categories)
+        self.vendors = sorted(vendors)
+        self.n_users = max(1, round(USERS_PER_SF * scale_factor))
+        self.n_products = max(1, round(PRODUCTS_PER_SF * scale_factor))
+        self.n_chunks = (self.n_users + CHUNK_SIZE - 1) // CHUNK_SIZE
+        self._prices = array('d', bytes(8 * self.n_products))
+        self._prices_ready = False
+
+    @staticmethod
+    def _chunk_range(total: int, chunk: int) -> range:
+        start = chunk * CHUNK_SIZE
+        return range(start + 1, min(total, start + CHUNK_SIZE) + 1)
+
+    def _timestamp(self, rng: StreamRng) -> dt.datetime:
+        return DATASET_START + dt.timedelta(seconds=rng.randint(0, DATASET_DAYS * 86400 - 1))
+
+    def users(self) -> Iterator[List[tuple]]:
+        """Users rows, one list per chunk."""
+        for chunk in range(self.n_chunks):
+            rng = StreamRng(self.seed, 'users', chunk)
+            rows = []
+            for key in self._chunk_range(self.n_users, chunk):
+                first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                rows.append((
+                    key,
+                    f'{first}.{last}{key}',
+                    f'{int(rng.random() * 16 ** 12):012x}',
+                    f'user{key}@winstore.test',
+                    f'+1{rng.randint(2000000000, 9999999999)}',
+                    'Customer',
+                    self._timestamp(rng),
+                ))
+            yield rows
+
+    def products(self) -> Iterator[List[tuple]]:
+        """Products rows, one list per chunk; also records the prices activity() needs."""
+        n_chunks = (self.n_products + CHUNK_SIZE - 1) // CHUNK_SIZE
+        for chunk in range(n_chunks):
+            rng = StreamRng(self.seed, 'products', chunk)
+            rows = []
+            for key in self._chunk_range(self.n_products, chunk):
+                category = rng.choice(self.categories)
+                vendor = rng.choice(self.vendors)
+                u = rng.random()
+                # Cubic skew: most items are cheap, a few are expensive
+                price = round(PRICE_MIN + (PRICE_MAX - PRICE_MIN) * u * u * u, 2)
+                self._prices[key - 1] = price
+                name = f'{vendor} {category} {rng.choice(SERIES)} {key}'
+                rows.append((
+                    key, category, vendor, name, f'Specifications for {name}.',
+                    price, rng.randint(50, 500),
+                ))
+            yield rows
+        self._prices_ready = True
+
+    def activity(self) -> Iterator[Dict[str, List[tuple]]]:
+        """
+        Orders, OrderItems, Payments and Review rows per user chunk. Order keys run
+        consecutively across chunks, so the chunks must be consumed in order.
+        """
+        if not self._prices_ready:
+            raise RuntimeError('products() must be consumed before activity()')
+        order_key = 0
+        for chunk in range(self.n_chunks):
+            rng = StreamRng(self.seed, 'activity', chunk)
+            out: Dict[str, List[tuple]] = {t: [] for t in ACTIVITY_TABLES}
+            for user_key in self._chunk_range(self.n_users, chunk):
+                # First delivery date per purchased product; dict keeps purchase order
+                purchased: Dict[int, dt.datetime] = {}
+                for _ in range(rng.randint(0, 2 * ORDERS_PER_USER_MEAN)):
+                    order_key += 1
+                    self._order(rng, order_key, user_key, out, purchased)
+                for product_key, delivered in purchased.items():
+                    if rng.chance(REVIEW_RATE):
+                        out['Review'].append((
+                            user_key, product_key, rng.randint(3, 5), rng.choice(REVIEW_COMMENTS),
+                            delivered + dt.timedelta(days=rng.randint(1, 30)),
+                        ))
+            yield out
+
+    def _order(self, rng: StreamRng, order_key: int, user_key: int,
+               out: Dict[str, List[tuple]], purchased: Dict[int, dt.datetime]):
+        order_date = self._timestamp(rng)
+
+        # Distinct products; the retry loop is bounded by the product count
+        count = min(rng.randint(1, MAX_ITEMS_PER_ORDER), self.n_products)
+        picked: List[int] = []
+        while len(picked) < count:
+            key = rng.skewed(self.n_products) + 1
+            if key not in picked:
+                picked.append(key)
+        amount = 0.0
+        for product_key in picked:
+            price = self._prices[product_key - 1]
+            qty = rng.randint(1, 3)
+            amount += price * qty
+            out['OrderItems'].append((order_key, product_key, qty, price))
+        amount = round(amount, 2)
+
+        # Payment, then the same lifecycle as simulate_full_order_lifecycle
+        failed = rng.chance(PAYMENT_FAIL_RATE)
+        out['Payments'].append((
+            order_key, order_date + dt.timedelta(minutes=rng.randint(1, 60)), rng.choice(PAYMENT_METHODS),
+            'Failed' if failed else 'Completed', 0.0 if failed else amount, DEFAULT_CURRENCY,
+            f'TX{order_key:012d}',
+        ))
+        if failed:
+            status = 'Cancelled' if rng.chance(ORDER_CANCEL_RATE) else 'Pending'
+            out['Orders'].append((order_key, user_key, order_date, status, amount,
+                                  None, None, None, None, None, None, None))
+            return
+
+        shipped = order_date + dt.timedelta(days=rng.randint(1, 3))
+        delivered = shipped + dt.timedelta(days=rng.randint(2, 7))
+        estimated = shipped + dt.timedelta(days=rng.randint(3, 8))
+        address = f'{rng.randint(10000, 99999)}, City-{rng.randint(1, 999)}, Street-{rng.randint(1, 200)}'
+        carrier = rng.choice(CARRIERS)
+        status = 'Completed'
+        if rng.chance(ORDER_RETURN_RATE):
+            status = 'Returned'
+            if rng.chance(ORDER_REFUND_RATE):
+                status = 'Refunded'
+                out['Payments'].append((
+                    order_key, delivered + dt.timedelta(days=2), 'Refund', 'Refunded', amount,
+                    DEFAULT_CURRENCY, f'RF{order_key:012d}',
+                ))
+        out['Orders'].append((order_key, user_key, order_date, status, amount, address, shipped,
+                              estimated, delivered, 'Delivered', carrier, f'TRK{order_key:010d}'))
+        for product_key in picked:
+            purchased.setdefault(product_key, delivered)
+
+    def batches(self) -> Iterator[Tuple[str, List[tuple]]]:
+        """(table, rows) in load order: all users, all products, then activity chunk by chunk."""
+        for rows in self.users():
+            yield 'Users', rows
+        for rows in self.products():
+            yield 'Products', rows
+        for tables in self.activity():
+            for table in ACTIVITY_TABLES:
+                yield table, tables[table]
+
+
+class DatasetSink:
+    """
+    Writes dataset batches through a TableWriter (Oracle or flat files), translating
+    logical keys and status keys to IDs. Users and products keep their IDs in compact
+    arrays for the whole run; order IDs only live for the chunk that wrote them.
+    """
+
+    def __init__(self, writer: TableWriter, dataset: ScaledDataset, categories_map: Dict[str, int],
+                 vendors_map: Dict[str, int], statuses: Dict[str, Dict[str, int]]):
+        self.writer = writer
+        self.categories_map = categories_map
+        self.vendors_map = vendors_map
+        self.statuses = statuses
+        self.user_ids = array('q', bytes(8 * dataset.n_users))
+        self.product_ids = array('q', bytes(8 * dataset.n_products))
+        self.order_ids: Dict[int, int] = {}
+
+    def write(self, table: str, rows: List[tuple]):
+        if rows:
+            getattr(self, f'_write_{table.lower()}')(rows)
+
+    def _write_users(self, rows: List[tuple]):
+        ids = self.writer.insert(
+            'Users', ('user_NAME', 'user_PASS', 'user_EMAIL', 'user_PHONE', 'user_ROLE', 'created_AT'),
+            [r[1:] for r in rows], returning=True,
+        )
+        for r, new_id in zip(rows, ids):
+            self.user_ids[r[0] - 1] = new_id
+        self.writer.commit()
+
+    def _write_products(self, rows: List[tuple]):
+        ids = self.writer.insert(
+            'Products', ('category_ID', 'product_NAME', 'product_DESCRIPT', 'product_PRICE', 'product_STOCK', 'ven_ID'),
+            [(self.categories_map[r[1]], r[3], r[4], r[5], r[6], self.vendors_map[r[2]]) for r in rows],
+            returning=True,
+        )
+        for r, new_id in zip(rows, ids):
+            self.product_ids[r[0] - 1] = new_id
+        self.writer.commit()
+
+    def _write_orders(self, rows: List[tuple]):
+        order_status, delivery_status = self.statuses['order'], self.statuses['delivery']
+        ids = self.writer.insert(
+            'Orders', ('user_ID', 'order_DATE', 'order_STATUS_ID', 'order_AMOUNT', 'delivery_ADDRESS', 'shipped_DATE',
+                       'estimated_delivery_DATE', 'actual_delivery_DATE', 'delivery_STATUS_ID',
+                       'shipping_carrier_NAME', 'tracking_NUMBER'),
+            [(self.user_ids[r[1] - 1], r[2], order_status[r[3]], r[4], r[5], r[6], r[7], r[8],
+              delivery_status[r[9]] if r[9] else None, r[10], r[11]) for r in rows],
+            returning=True,
+        )
+        self.order_ids = {r[0]: new_id for r, new_id in zip(rows, ids)}
+
+    def _write_orderitems(self, rows: List[tuple]):
+        self.writer.insert(
+            'OrderItems', ('order_ID', 'product_ID', 'quantity', 'price'),
+            [(self.order_ids[r[0]], self.product_ids[r[1] - 1], r[2], r[3]) for r in rows],
+        )
+
+    def _write_payments(self, rows: List[tuple]):
+        payment_status = self.statuses['payment']
+        self.writer.insert(
+            'Payments', ('order_ID', 'payment_DATE', 'payment_METHOD', 'payment_STATUS_ID', 'payment_AMOUNT',
+                         'currency', 'transaction_ID'),
+            [(self.order_ids[r[0]], r[1], r[2], payment_status[r[3]], r[4], r[5], r[6]) for r in rows],
+        )
+
+    def _write_review(self, rows: List[tuple]):
+        self.writer.insert(
+            'Review', ('user_ID', 'product_ID', 'rew_RATING', 'rew_COMMENT', 'rew_DATE'),
+            [(self.user_ids[r[0] - 1], self.product_ids[r[1] - 1], r[2], r[3], r[4]) for r in rows],
+        )
+        # Review is the last table of an activity chunk: one commit per chunk
+        self.writer.commit()
+
+
+def main():
+    print('--- Scaled Dataset Generator ---')
+    categories_map = load_id_map('categories')
+    vendors_map = load_id_map('vendors')
+    if not categories_map or not vendors_map:
+        print('Categories or vendors missing. Run 01_populate_base_entities.py first.')
+        return
+
+    dataset = ScaledDataset(DATASET_SEED, SCALE_FACTOR, list(categories_map), list(vendors_map))
+    print(f"Seed {dataset.seed}, SF {dataset.scale_factor:g}: {dataset.n_users} users, {dataset.n_products} "
+          f"products, ~{dataset.n_users * ORDERS_PER_USER_MEAN} orders in {dataset.n_chunks} chunks.")
+
+    conn = get_db_connection() if DATASET_TARGET == 'db' else None
+    exporter = None
+    sink = None
+    if conn:
+        sink = DatasetSink(OracleTableWriter(conn), dataset, categories_map, vendors_map, load_status_ids(conn))
+    elif DATASET_TARGET in ('csv', 'parquet'):
+        # Logical keys become the exported IDs (fresh schema), so files need no database
+        exporter = FlatFileExporter(EXPORT_DIR, DATASET_TARGET)
+        sink = DatasetSink(exporter, dataset, categories_map, vendors_map, load_status_ids())
+    digests = {table: hashlib.sha256() for table in TABLE_COLUMNS}
+    counts = {table: 0 for table in TABLE_COLUMNS}
+    started = time.monotonic()
+    try:
+        for table, rows in dataset.batches():
+            digest = digests[table]
+            for row in rows:
+                digest.update(format_row(row).encode('utf-8'))
+                digest.update(b'\n')
+            counts[table] += len(rows)
+            if sink:
+                sink.write(table, rows)
+            if table == 'Review':
+                elapsed = time.monotonic() - started
+                print(f"[activity] orders={counts['Orders']}  items={counts['OrderItems']}  "
+                      f"{counts['Orders'] / elapsed if elapsed else 0:,.0f} orders/s")
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print(f"Error generating the scaled dataset. Current chunk rolled back. Details: {e}")
+        raise
+    finally:
+        if conn:
+            conn.close()
+    if exporter:
+        exporter.close()
+
+    for table in TABLE_COLUMNS:
+        print(f"{table:<11} {counts[table]:>10}  sha256={digests[table].hexdigest()}")
+    print('--- Scaled dataset finished ---')
+
+
+if __name__ == '__main__':
+    main()
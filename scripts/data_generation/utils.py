@@ -1,6 +1,22 @@
 import os
+import io
+import csv
+import gzip
 import json
-from typing import List, Dict, Any
+import hashlib
+import random
+import sqlite3
+import zlib
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from array import array
+from itertools import accumulate, chain, islice
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional, Sequence, Tuple, Union
 
 import oracledb
 
@@ -9,12 +25,31 @@ import oracledb
 # for scripts that do `from utils import ...` after adjusting sys.path.
 
 
-def get_db_connection():
+_pool: Optional[oracledb.ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def get_pool() -> oracledb.ConnectionPool:
     """
-    Establishes a connection to the Oracle database using environment variables.
-    Returns the connection object.
+    Returns the process-wide connection pool, creating it on first use.
+
+    Sizing and health checks are read from the environment:
+        DB_POOL_MIN / DB_POOL_MAX / DB_POOL_INCREMENT - session counts (default 1 / 4 / 1)
+        DB_POOL_PING_INTERVAL - seconds a session may sit idle before it is pinged on
+            acquire; dead sessions are replaced transparently (default 60)
+        DB_POOL_TIMEOUT - seconds after which idle sessions above DB_POOL_MIN are closed (default 300)
     """
-    try:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            return _pool
         user = os.environ.get('ORACLE_DB_USER', 'WINSTORE_ADMIN')
         password = os.environ.get('ORACLE_ADMIN_PASSWORD', '123')
         host = os.environ.get('ORACLE_DB_HOST', 'localhost')
@@ -22,39 +57,218 @@ def get_db_connection():
         service_name = os.environ.get('ORACLE_DB_SERVICE', 'XEPDB1')
 
         dsn = f"{host}:{port}/{service_name}"
+        pool_min = _env_int('DB_POOL_MIN', 1)
+        pool_max = max(pool_min, _env_int('DB_POOL_MAX', 4))
+
+        print(f"Creating Oracle connection pool: {dsn} with user {user} (min={pool_min}, max={pool_max})...")
+        try:
+            _pool = oracledb.create_pool(
+                user=user,
+                password=password,
+                dsn=dsn,
+                min=pool_min,
+                max=pool_max,
+                increment=_env_int('DB_POOL_INCREMENT', 1),
+                ping_interval=_env_int('DB_POOL_PING_INTERVAL', 60),
+                timeout=_env_int('DB_POOL_TIMEOUT', 300),
+                getmode=oracledb.POOL_GETMODE_WAIT,
+            )
+        except oracledb.Error as e:
+            print(f"Error connecting to Oracle database: {e}")
+            raise
+        print("Connection pool ready.")
+        return _pool
+
+
+def get_db_connection():
+    """
+    Borrows a connection from the shared pool.
 
-        print(f"Attempting to connect to Oracle: {dsn} with user {user}...")
-        connection = oracledb.connect(user=user, password=password, dsn=dsn)
-        print("Database connection successful.")
-        return connection
+    Callers keep the usual pattern: conn.close() hands the session back to the pool
+    instead of closing it, so repeated calls cost no new handshake.
+    """
+    try:
+        return get_pool().acquire()
     except oracledb.Error as e:
-        print(f"Error connecting to Oracle database: {e}")
+        print(f"Error acquiring a pooled Oracle connection: {e}")
+        raise
+
+
+@contextmanager
+def db_connection() -> Iterator[oracledb.Connection]:
+    """Context manager form of get_db_connection(); rolls back uncommitted work on error."""
+    conn = get_db_connection()
+    try:
+        yield conn
+    except Exception:
+        conn.rollback()
         raise
+    finally:
+        conn.close()
+
+
+def close_pool():
+    """Closes the pool and every session in it (registered to run at exit)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            try:
+                _pool.close(force=True)
+            except oracledb.Error as e:
+                print(f"Error closing the connection pool: {e}")
+            _pool = None
+
+
+atexit.register(close_pool)
+
+
+# Adaptive batch sizing for batch_insert: each round trip aims at TARGET_BATCH_SECONDS,
+# never binds more than MAX_BATCH_BYTES of estimated row data, and changes by at most
+# a factor of two between round trips.
+MIN_BATCH_ROWS = 50
+MAX_BATCH_ROWS = 50000
+MAX_BATCH_BYTES = 8 * 1024 * 1024
+TARGET_BATCH_SECONDS = 0.5
+# NVARCHAR2 bind limit; longer strings are bound as NCLOB
+MAX_NVARCHAR_BIND = 2000
+
+
+@dataclass
+class LoadStats:
+    """Outcome of one batch_insert call."""
+    rows: int = 0
+    failed: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    errors: List[Tuple[int, str]] = field(default_factory=list)
+
+    # Only the first few row errors are kept so a bad feed cannot grow the stats unbounded
+    MAX_ERRORS = 100
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _row_values(row: Union[Dict[str, Any], Sequence[Any]]) -> Iterable[Any]:
+    return row.values() if isinstance(row, dict) else row
+
+
+def _row_width(rows: Sequence[Union[Dict[str, Any], Sequence[Any]]]) -> int:
+    """Estimated bind bytes per row, from a sample."""
+    sample = rows[:100]
+    total = 0
+    for row in sample:
+        for v in _row_values(row):
+            total += len(v) * 2 if isinstance(v, str) else 22
+    return max(1, total // max(1, len(sample)))
+
+
+def _bind_type(values: List[Any]):
+    """oracledb bind type for one column of a batch, or None to let the driver decide."""
+    present = [v for v in values if v is not None]
+    if not present:
+        return None
+    if all(isinstance(v, bool) for v in present):
+        return oracledb.DB_TYPE_NUMBER
+    if all(isinstance(v, int) for v in present):
+        return int
+    if all(isinstance(v, (int, float)) for v in present):
+        return float
+    if all(isinstance(v, (int, float, Decimal)) for v in present):
+        return oracledb.DB_TYPE_NUMBER
+    if all(isinstance(v, datetime) for v in present):
+        return oracledb.DB_TYPE_TIMESTAMP
+    if all(isinstance(v, str) for v in present):
+        longest = max(len(v) for v in present)
+        return longest if longest <= MAX_NVARCHAR_BIND else oracledb.DB_TYPE_NCLOB
+    return None
+
+
+def _set_input_sizes(cursor: oracledb.Cursor, batch: Sequence[Union[Dict[str, Any], Sequence[Any]]]):
+    """Declares typed bind arrays for the batch so the driver does not re-infer them per row."""
+    first = batch[0]
+    if isinstance(first, dict):
+        sizes = {key: _bind_type([row[key] for row in batch]) for key in first}
+        cursor.setinputsizes(**{k: v for k, v in sizes.items() if v is not None})
+    else:
+        cursor.setinputsizes(*[_bind_type([row[i] for row in batch]) for i in range(len(first))])
 
 
 def batch_insert(
     conn: oracledb.Connection,
     sql: str,
-    data: List[Dict[str, Any]],
-    batch_size: int = 100,
+    data: Iterable[Union[Dict[str, Any], Sequence[Any]]],
+    batch_size: Optional[int] = None,
     commit_now: bool = True,
-):
+    skip_bad_rows: bool = False,
+    label: Optional[str] = None,
+) -> LoadStats:
     """
-    Inserts data in batches into the database.
+    Bulk-loads rows with array binds.
+
+    Batch sizes adapt to the data: the first batch is sized from the estimated row width,
+    later ones from the observed time per row, so narrow rows travel in large arrays and
+    wide or slow ones in smaller ones. Each batch declares typed bind arrays (setinputsizes).
+    By default the first rejected row fails the call, as a plain executemany would. Callers
+    that opt in with skip_bad_rows get rejected rows (constraint violations, bad values)
+    reported via batcherrors and skipped; every other row is still inserted.
 
     Args:
         conn: The database connection object.
         sql: The SQL INSERT statement with bind variables.
-        data: A list of dictionaries, where each dictionary represents a row.
-        batch_size: The number of records to insert per batch.
-        commit_now: If True, commit immediately; otherwise the caller manages commit/rollback.
+        data: Rows as dictionaries (named binds) or sequences (positional binds); any iterable.
+        batch_size: Fixed rows per round trip; None sizes batches adaptively.
+        commit_now: If True, commit at the end; otherwise the caller manages commit/rollback.
+        skip_bad_rows: Skip rejected rows instead of failing the whole call (default: fail).
+        label: Name used in the progress report (default: the target table).
+
+    Returns:
+        LoadStats with row, failure and batch counts, elapsed time and the first row errors.
     """
+    rows = data if isinstance(data, list) else list(data)
+    stats = LoadStats()
+    label = label or (sql.split()[2] if len(sql.split()) > 2 else 'rows')
+    if not rows:
+        return stats
+
+    byte_cap = max(MIN_BATCH_ROWS, MAX_BATCH_BYTES // _row_width(rows))
+    size = batch_size or min(MAX_BATCH_ROWS, byte_cap)
     cursor = conn.cursor()
+    started = time.perf_counter()
     try:
-        cursor.executemany(sql, data, batch_size=batch_size)
+        offset = 0
+        while offset < len(rows):
+            batch = rows[offset:offset + size]
+            _set_input_sizes(cursor, batch)
+            t0 = time.perf_counter()
+            cursor.executemany(sql, batch, batcherrors=skip_bad_rows)
+            elapsed = time.perf_counter() - t0
+
+            failed = cursor.getbatcherrors() if skip_bad_rows else []
+            for err in failed:
+                stats.failed += 1
+                if len(stats.errors) < LoadStats.MAX_ERRORS:
+                    stats.errors.append((offset + err.offset, err.message))
+            stats.rows += len(batch) - len(failed)
+            stats.batches += 1
+            offset += len(batch)
+
+            if batch_size is None and elapsed > 0:
+                ideal = int(len(batch) * TARGET_BATCH_SECONDS / elapsed)
+                size = max(MIN_BATCH_ROWS, min(MAX_BATCH_ROWS, byte_cap, size * 2, max(size // 2, ideal)))
+
         if commit_now:
             conn.commit()
-        print(f"Successfully inserted {len(data)} records in batches of {batch_size}.")
+        stats.seconds = time.perf_counter() - started
+        print(
+            f"{label}: inserted {stats.rows} rows in {stats.batches} batches, "
+            f"{stats.seconds:.2f}s ({stats.rows_per_second:,.0f} rows/s)"
+            + (f", skipped {stats.failed} bad rows" if stats.failed else "")
+        )
+        for index, message in stats.errors[:5]:
+            print(f"  row {index}: {message}")
+        return stats
     except oracledb.Error as e:
         print(f"Database error during batch insert: {e}")
         if commit_now:
@@ -65,27 +279,817 @@ def batch_insert(
         cursor.close()
 
 
-IDS_DIR = os.path.join(os.path.dirname(__file__), 'generated_ids')
+# A generated product row together with its ProductAttributes rows (keyed by product_NAME/ven_ID)
+ProductWithAttributes = Tuple[Dict[str, Any], List[Dict[str, Any]]]
+# progress(products, attributes) hook that generators call after each chunk they flush
+ProgressCallback = Callable[[int, int], None]
 
 
-def save_ids(entity_name: str, ids: List[Any]):
-    """Saves a list of generated IDs or objects to a JSON file."""
-    if not os.path.exists(IDS_DIR):
-        os.makedirs(IDS_DIR)
-    file_path = os.path.join(IDS_DIR, f'{entity_name}.json')
-    with open(file_path, 'w') as f:
-        json.dump(ids, f, indent=4)
-    print(f"Saved {len(ids)} records to {file_path}")
+def chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Yields consecutive lists of up to size items, consuming the iterable lazily."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
 
 
-def load_ids(entity_name: str):
-    """Loads a list of IDs or objects from a JSON file."""
-    file_path = os.path.join(IDS_DIR, f'{entity_name}.json')
+PRODUCT_COLUMNS = ('category_ID', 'product_NAME', 'product_DESCRIPT', 'product_PRICE', 'product_STOCK', 'ven_ID')
+PRODUCT_INSERT_SQL = (
+    "INSERT INTO Products (category_ID, product_NAME, product_DESCRIPT, product_PRICE, product_STOCK, ven_ID) "
+    "VALUES (:category_ID, :product_NAME, :product_DESCRIPT, :product_PRICE, :product_STOCK, :ven_ID) "
+    "RETURNING product_ID INTO :new_id"
+)
+
+
+def insert_returning_ids(
+    conn: oracledb.Connection,
+    sql: str,
+    rows: Sequence[Dict[str, Any]],
+    id_bind: str = 'new_id',
+    batch_size: int = 1000,
+) -> List[int]:
+    """
+    Runs an INSERT ... RETURNING <id> INTO :<id_bind> for every row with array binds and
+    returns the generated IDs in row order (no follow-up SELECT). The statement text is the
+    same for every call, so the server and driver statement caches are reused.
+    The caller manages commit/rollback.
+    """
+    ids: List[int] = []
+    cursor = conn.cursor()
+    try:
+        for offset in range(0, len(rows), batch_size):
+            batch = rows[offset:offset + batch_size]
+            id_var = cursor.var(int, arraysize=len(batch))
+            cursor.setinputsizes(**{id_bind: id_var})
+            cursor.executemany(sql, batch)
+            # Each row's RETURNING value arrives as a one-element list
+            ids.extend(id_var.getvalue(i)[0] for i in range(len(batch)))
+        return ids
+    finally:
+        cursor.close()
+
+
+# Existing-product check with fixed statement texts: the chunk's keys are array-bound into
+# the ProductKeyStaging temporary table and joined, instead of a per-chunk IN list whose
+# length (and so statement text) changes every time
+PRODUCT_KEY_STAGE_SQL = "INSERT INTO ProductKeyStaging (product_NAME, ven_ID) VALUES (:1, :2)"
+EXISTING_PRODUCT_KEYS_SQL = (
+    "SELECT s.product_NAME, s.ven_ID FROM ProductKeyStaging s "
+    "JOIN Products p ON p.product_NAME = s.product_NAME AND p.ven_ID = s.ven_ID"
+)
+
+
+def existing_product_keys(conn: oracledb.Connection, products: Sequence[Dict[str, Any]]) -> set:
+    """
+    {(product_NAME, ven_ID)} of the given products that already exist. Runs inside the
+    caller's transaction; the staged keys are discarded at its commit or rollback.
+    """
+    keys = list({(p['product_NAME'], p['ven_ID']) for p in products})
+    if not keys:
+        return set()
+    cursor = conn.cursor()
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        print(f"Loaded {len(data)} records from {file_path}")
-        return data
-    except FileNotFoundError:
-        print(f"Error: ID file not found at {file_path}. Please run the prerequisite script.")
+        _set_input_sizes(cursor, keys)
+        cursor.executemany(PRODUCT_KEY_STAGE_SQL, keys)
+        cursor.execute(EXISTING_PRODUCT_KEYS_SQL)
+        return {(name, int(ven_id)) for name, ven_id in cursor.fetchall()}
+    finally:
+        cursor.close()
+
+
+def insert_products(conn: oracledb.Connection, products: Sequence[Dict[str, Any]]) -> Dict[Tuple[str, int], int]:
+    """
+    Inserts product rows (keys as in PRODUCT_COLUMNS; extra keys are ignored) and returns
+    {(product_NAME, ven_ID): product_ID} built from the RETURNING values.
+    """
+    rows = [{col: p[col] for col in PRODUCT_COLUMNS} for p in products]
+    ids = insert_returning_ids(conn, PRODUCT_INSERT_SQL, rows)
+    return {(p['product_NAME'], p['ven_ID']): pid for p, pid in zip(products, ids)}
+
+
+# --- Flat-file export for the bulk loaders ---
+# DATA_OUTPUT selects where generators write: 'db' (default, array-bind INSERTs) or
+# 'csv' / 'parquet' files under DATA_EXPORT_DIR, to be loaded with SQL*Loader (direct
+# path) or BULK INSERT. Both targets implement TableWriter, so a generator builds its
+# rows once and hands them to either.
+EXPORT_DIR = os.environ.get('DATA_EXPORT_DIR', os.path.join(os.path.dirname(__file__), 'export'))
+OUTPUT_MODES = ('db', 'csv', 'parquet')
+
+# table -> (primary key column, Oracle sequence behind its ID trigger); (None, None) for
+# tables keyed by their foreign keys
+TABLE_KEYS: Dict[str, Tuple[Optional[str], Optional[str]]] = {
+    'Users': ('user_ID', 'SEQ_USERS_ID'),
+    'Products': ('product_ID', 'SEQ_PRODUCTS_ID'),
+    'ProductAttributes': (None, None),
+    'Orders': ('order_ID', 'SEQ_ORDERS_ID'),
+    'OrderItems': ('OrderItems_ID', 'SEQ_ORDERITEMS_ID'),
+    'Payments': ('payment_ID', 'SEQ_PAYMENTS_ID'),
+    'Review': ('rew_ID', 'SEQ_REVIEWS_ID'),
+    'Wishlist': ('wishlist_ID', 'SEQ_WISHLIST_ID'),
+}
+
+
+def output_mode() -> str:
+    mode = os.environ.get('DATA_OUTPUT', 'db').strip().lower()
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"DATA_OUTPUT must be one of {', '.join(OUTPUT_MODES)}, got '{mode}'")
+    return mode
+
+
+def format_value(value: Any) -> str:
+    """Canonical text of a generated value. Floats are money amounts in this schema."""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, float):
+        return f'{value:.2f}'
+    return str(value)
+
+
+def _value_kind(value: Any) -> str:
+    if isinstance(value, datetime):
+        return 'datetime'
+    if isinstance(value, bool) or isinstance(value, int):
+        return 'int'
+    if isinstance(value, (float, Decimal)):
+        return 'float'
+    return 'str'
+
+
+class TableWriter:
+    """Destination for generated rows: the database or flat files."""
+
+    def insert(self, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]],
+               returning: bool = False) -> List[int]:
+        """Writes rows (values in column order); returns their primary keys if returning."""
+        raise NotImplementedError
+
+    def commit(self):
+        pass
+
+
+class OracleTableWriter(TableWriter):
+    """Array-bind INSERTs on one connection; IDs come from the triggers via RETURNING ... INTO."""
+
+    def __init__(self, conn: oracledb.Connection):
+        self.conn = conn
+
+    def insert(self, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]],
+               returning: bool = False) -> List[int]:
+        if not rows:
+            return []
+        column_list = ', '.join(columns)
+        if returning:
+            binds = ', '.join(f':c{i}' for i in range(len(columns)))
+            sql = f"INSERT INTO {table} ({column_list}) VALUES ({binds}) RETURNING {TABLE_KEYS[table][0]} INTO :new_id"
+            return insert_returning_ids(self.conn, sql, [{f'c{i}': v for i, v in enumerate(r)} for r in rows])
+        binds = ', '.join(f':{i + 1}' for i in range(len(columns)))
+        batch_insert(self.conn, f"INSERT INTO {table} ({column_list}) VALUES ({binds})", rows,
+                     commit_now=False, label=table)
         return []
+
+    def commit(self):
+        self.conn.commit()
+
+
+class _ExportTable:
+    """One streamed output file."""
+
+    def __init__(self, path: str, columns: Tuple[str, ...], fmt: str):
+        self.path = path
+        self.columns = columns
+        self.fmt = fmt
+        self.rows = 0
+        self.kinds: List[Optional[str]] = [None] * len(columns)
+        self.id_range: Optional[Tuple[int, int]] = None
+        self._raw = None
+        self._text = None
+        self._csv = None
+        self._parquet = None
+
+    def write(self, rows: List[Tuple[Any, ...]]):
+        for i, kind in enumerate(self.kinds):
+            if kind is None:
+                value = next((r[i] for r in rows if r[i] is not None), None)
+                if value is not None:
+                    self.kinds[i] = _value_kind(value)
+        if self.fmt == 'csv':
+            self._write_csv(rows)
+        else:
+            self._write_parquet(rows)
+        self.rows += len(rows)
+
+    def _write_csv(self, rows: List[Tuple[Any, ...]]):
+        if self._csv is None:
+            # Fixed gzip header (no name, mtime 0) so identical rows give identical bytes
+            self._raw = open(self.path, 'wb')
+            self._text = io.TextIOWrapper(gzip.GzipFile(filename='', mode='wb', fileobj=self._raw, mtime=0),
+                                          encoding='utf-8', newline='')
+            self._csv = csv.writer(self._text, lineterminator='\n')
+            self._csv.writerow(self.columns)
+        self._csv.writerows([format_value(v) for v in r] for r in rows)
+
+    def _write_parquet(self, rows: List[Tuple[Any, ...]]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError('DATA_OUTPUT=parquet requires pyarrow (pip install pyarrow)')
+        types = {'int': pa.int64(), 'float': pa.float64(), 'datetime': pa.timestamp('s'), 'str': pa.string()}
+        if self._parquet is None:
+            # Columns still unseen in the first batch are typed as strings
+            schema = pa.schema([(c, types[k or 'str']) for c, k in zip(self.columns, self.kinds)])
+            self._parquet = pq.ParquetWriter(self.path, schema, compression='zstd')
+        schema = self._parquet.schema
+        arrays = []
+        for i, f in enumerate(schema):
+            values = [r[i] for r in rows]
+            if f.type == pa.string():
+                values = [None if v is None else str(v) for v in values]
+            elif f.type == pa.float64():
+                values = [None if v is None else float(v) for v in values]
+            arrays.append(pa.array(values, type=f.type))
+        self._parquet.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    def close(self):
+        if self._text is not None:
+            self._text.close()
+            self._raw.close()
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+class FlatFileExporter(TableWriter):
+    """
+    Streams rows to one file per table (gzip CSV, or Parquet with pyarrow) and, on
+    close(), writes manifest.json and the loader scripts next to them:
+        <table>.ctl           SQL*Loader control file (direct path)
+        <table>.xml           BULK INSERT format file (maps file fields to columns by name)
+        load_oracle.sh        sqlldr for every table in load order, then post_load_oracle.sql
+        post_load_oracle.sql  moves each ID sequence past the highest exported ID
+        load_mssql.sql        BULK INSERT ... KEEPIDENTITY per table (sqlcmd -v ExportDir=...)
+
+    Bulk loaders bypass the ID triggers, so the exporter assigns primary keys itself,
+    consecutively from id_starts[table] (default_id_start otherwise; 1 suits a freshly
+    deployed schema). Tables are loaded in the order they were first written to.
+    """
+
+    def __init__(self, out_dir: str = EXPORT_DIR, fmt: str = 'csv', id_starts: Optional[Dict[str, int]] = None,
+                 default_id_start: int = 1):
+        if fmt not in ('csv', 'parquet'):
+            raise ValueError(f"Unsupported export format: {fmt}")
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self._next_ids = dict(id_starts or {})
+        self._default_id_start = default_id_start
+        self._tables: Dict[str, _ExportTable] = {}
+
+    def insert(self, table: str, columns: Sequence[str], rows: Sequence[Sequence[Any]],
+               returning: bool = False) -> List[int]:
+        pk = TABLE_KEYS.get(table, (None, None))[0]
+        out = self._tables.get(table)
+        if out is None:
+            ext = 'csv.gz' if self.fmt == 'csv' else 'parquet'
+            out = _ExportTable(os.path.join(self.out_dir, f'{table}.{ext}'),
+                               ((pk,) if pk else ()) + tuple(columns), self.fmt)
+            self._tables[table] = out
+        if not rows:
+            return []
+        ids: List[int] = []
+        if pk:
+            start = self._next_ids.get(table, self._default_id_start)
+            ids = list(range(start, start + len(rows)))
+            self._next_ids[table] = start + len(rows)
+            out.id_range = (out.id_range[0] if out.id_range else start, ids[-1])
+            out.write([(new_id,) + tuple(r) for new_id, r in zip(ids, rows)])
+        else:
+            out.write([tuple(r) for r in rows])
+        return ids if returning else []
+
+    def close(self) -> str:
+        """Finishes the files and writes the manifest and loader scripts; returns the manifest path."""
+        entries = []
+        for table, out in self._tables.items():
+            out.close()
+            pk, sequence = TABLE_KEYS.get(table, (None, None))
+            entries.append({
+                'table': table,
+                'file': os.path.basename(out.path),
+                'columns': list(out.columns),
+                'rows': out.rows,
+                'id_column': pk,
+                'id_range': list(out.id_range) if out.id_range else None,
+                'sequence': sequence,
+                'sha256': _file_sha256(out.path) if out.rows else None,
+            })
+        manifest = {'format': self.fmt, 'compression': 'gzip' if self.fmt == 'csv' else 'zstd', 'tables': entries}
+        path = os.path.join(self.out_dir, 'manifest.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        if self.fmt == 'csv':
+            self._write_loader_scripts(entries)
+        for e in entries:
+            print(f"Exported {e['rows']} rows to {e['file']}")
+        print(f"Load manifest written to {path}")
+        return path
+
+    def _write_loader_scripts(self, entries: List[Dict[str, Any]]):
+        sh = ['#!/bin/sh', '# Usage: ORACLE_CONN=user/password@host:port/service ./load_oracle.sh', 'set -e',
+              'cd "$(dirname "$0")"']
+        post = ['-- Run after load_oracle.sh: continue each ID sequence after the loaded rows']
+        mssql = ['-- Usage: sqlcmd -S <server> -d <database> -v ExportDir="<absolute path>" -i load_mssql.sql',
+                 '-- Requires SQL Server 2017+ (FORMAT = \'CSV\'); decompress the .csv.gz files first', '']
+        for e in entries:
+            if not e['rows']:
+                continue
+            out = self._tables[e['table']]
+            self._write_ctl(e['table'], out)
+            self._write_format_file(e['table'], out)
+            csv_name = e['file'][:-len('.gz')]
+            sh.append(f'gunzip -kf {e["file"]}')
+            sh.append(f'sqlldr userid="$ORACLE_CONN" control={e["table"]}.ctl log={e["table"]}.log')
+            if e['sequence']:
+                post.append(f"ALTER SEQUENCE {e['sequence']} RESTART START WITH {e['id_range'][1] + 1};")
+            mssql.append(
+                f"BULK INSERT dbo.{e['table']} FROM '$(ExportDir)\\{csv_name}'\n"
+                f"WITH (FORMAT = 'CSV', FIRSTROW = 2, CODEPAGE = '65001', "
+                f"FORMATFILE = '$(ExportDir)\\{e['table']}.xml'{', KEEPIDENTITY' if e['id_column'] else ''}, TABLOCK);"
+            )
+            if e['id_column']:
+                mssql.append(f"DBCC CHECKIDENT ('dbo.{e['table']}', RESEED);")
+            mssql.append('GO')
+        sh.append('sqlplus -s "$ORACLE_CONN" @post_load_oracle.sql')
+        post.append('EXIT;')
+        for name, lines in (('load_oracle.sh', sh), ('post_load_oracle.sql', post), ('load_mssql.sql', mssql)):
+            with open(os.path.join(self.out_dir, name), 'w', encoding='utf-8', newline='\n') as f:
+                f.write('\n'.join(lines) + '\n')
+
+    def _write_ctl(self, table: str, out: _ExportTable):
+        fields = []
+        for column, kind in zip(out.columns, out.kinds):
+            if kind == 'datetime':
+                fields.append(f'  {column} TIMESTAMP "YYYY-MM-DD HH24:MI:SS"')
+            elif kind in ('int', 'float'):
+                fields.append(f'  {column}')
+            else:
+                fields.append(f'  {column} CHAR(4000)')
+        lines = [
+            f"-- Decompress {os.path.basename(out.path)} first (load_oracle.sh does); triggers do not fire",
+            "OPTIONS (DIRECT=TRUE, SKIP=1)",
+            "LOAD DATA",
+            "CHARACTERSET AL32UTF8",
+            f"INFILE '{os.path.basename(out.path)[:-len('.gz')]}'",
+            "APPEND",
+            f"INTO TABLE {table}",
+            "REENABLE DISABLED_CONSTRAINTS",
+            "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"'",
+            "TRAILING NULLCOLS",
+            "(",
+            ',\n'.join(fields),
+            ")",
+        ]
+        with open(os.path.join(self.out_dir, f'{table}.ctl'), 'w', encoding='utf-8', newline='\n') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def _write_format_file(self, table: str, out: _ExportTable):
+        n = len(out.columns)
+        lines = [
+            '<?xml version="1.0"?>',
+            '<BCPFORMAT xmlns="http://schemas.microsoft.com/sqlserver/2004/bulkload/format" '
+            'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">',
+            ' <RECORD>',
+        ]
+        for i in range(1, n + 1):
+            terminator = '\\n' if i == n else ','
+            lines.append(f'  <FIELD ID="{i}" xsi:type="CharTerm" TERMINATOR="{terminator}" MAX_LENGTH="4000"/>')
+        lines += [' </RECORD>', ' <ROW>']
+        for i, column in enumerate(out.columns, 1):
+            lines.append(f'  <COLUMN SOURCE="{i}" NAME="{column}" xsi:type="SQLNVARCHAR"/>')
+        lines += [' </ROW>', '</BCPFORMAT>']
+        with open(os.path.join(self.out_dir, f'{table}.xml'), 'w', encoding='utf-8', newline='\n') as f:
+            f.write('\n'.join(lines) + '\n')
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def next_id_starts(conn: oracledb.Connection, tables: Iterable[str]) -> Dict[str, int]:
+    """MAX(id) + 1 per table, so an export can be appended to a populated schema."""
+    starts = {}
+    cur = conn.cursor()
+    try:
+        for table in tables:
+            pk = TABLE_KEYS[table][0]
+            if pk:
+                cur.execute(f"SELECT NVL(MAX({pk}), 0) + 1 FROM {table}")
+                starts[table] = int(cur.fetchone()[0])
+    finally:
+        cur.close()
+    return starts
+
+
+def open_exporter(subdir: str = '', conn: Optional[oracledb.Connection] = None, tables: Iterable[str] = (),
+                  default_id_start: Optional[int] = None) -> FlatFileExporter:
+    """
+    FlatFileExporter for the current DATA_OUTPUT, writing to DATA_EXPORT_DIR/<subdir>.
+    With a connection, IDs continue after the rows already in the given tables; without
+    one they start at default_id_start, or EXPORT_ID_START (default 1, a fresh schema).
+    """
+    id_starts = next_id_starts(conn, tables) if conn is not None else {}
+    if default_id_start is None:
+        default_id_start = _env_int('EXPORT_ID_START', 1)
+    out_dir = os.path.join(EXPORT_DIR, subdir) if subdir else EXPORT_DIR
+    print(f"Exporting {output_mode()} files to {out_dir}")
+    return FlatFileExporter(out_dir, output_mode(), id_starts, default_id_start)
+
+
+STATUS_TABLES = {'order': 'OrderStatusTypes', 'payment': 'PaymentStatusTypes', 'delivery': 'DeliveryStatusTypes'}
+
+
+def load_status_ids(conn: Optional[oracledb.Connection] = None) -> Dict[str, Dict[str, int]]:
+    """
+    {'order' | 'payment' | 'delivery': {status_KEY: status_ID}}. Read from the database
+    when a connection is given (and cached in the ID registry as 'statuses'), otherwise from
+    that cache, so offline exports resolve the same IDs.
+    """
+    if conn is None:
+        statuses = load_ids('statuses')
+        if not statuses:
+            raise RuntimeError('No cached status IDs. Run scale_dataset.py against the database once first.')
+        return statuses
+    statuses = {}
+    cur = conn.cursor()
+    try:
+        for kind, table in STATUS_TABLES.items():
+            cur.execute(f"SELECT status_KEY, status_ID FROM {table}")
+            statuses[kind] = {key: int(sid) for key, sid in cur.fetchall()}
+    finally:
+        cur.close()
+    save_ids('statuses', statuses)
+    return statuses
+
+
+def write_products(writer: TableWriter, products: Sequence[Dict[str, Any]],
+                   attributes: Sequence[Dict[str, Any]]) -> Tuple[int, int]:
+    """
+    Writes product dicts (PRODUCT_COLUMNS keys) and their attribute dicts (product_NAME,
+    ven_ID, att_ID, nominal) through a TableWriter, without the database dedupe of the
+    insert_catalog() path. Returns (products, attributes) written.
+    """
+    ids = writer.insert('Products', PRODUCT_COLUMNS,
+                        [tuple(p[c] for c in PRODUCT_COLUMNS) for p in products], returning=True)
+    id_map = {(p['product_NAME'], p['ven_ID']): pid for p, pid in zip(products, ids)}
+    rows = []
+    seen = set()
+    for a in attributes:
+        pid = id_map.get((a['product_NAME'], a['ven_ID']))
+        # (att_ID, product_ID) is the ProductAttributes primary key: keep the first value
+        if pid and a.get('nominal') and (a['att_ID'], pid) not in seen:
+            seen.add((a['att_ID'], pid))
+            rows.append((pid, a['att_ID'], a['nominal']))
+    writer.insert('ProductAttributes', ('product_ID', 'att_ID', 'nominal'), rows)
+    writer.commit()
+    return len(ids), len(rows)
+
+
+def insert_catalog(products: Sequence[Dict[str, Any]], attributes: Sequence[Dict[str, Any]],
+                   label: str = 'products') -> Tuple[int, int]:
+    """
+    Inserts a chunk of generated products and their attributes in one transaction on a
+    pooled connection. Products that already exist (same product_NAME and ven_ID) are
+    skipped (existing_product_keys), product IDs come back through RETURNING ... INTO, and attributes are keyed
+    by (att_ID, product_ID) keeping the first value. Returns (products, attributes) inserted.
+
+    Raises:
+        Exception: Any database error, after rolling the chunk back
+    """
+    if not products:
+        print('No products to insert.')
+        return 0, 0
+
+    conn = None
+    try:
+        conn = get_db_connection()
+
+        # Deduplicate against existing by (product_NAME, ven_ID)
+        existing = existing_product_keys(conn, products)
+        new_products = [p for p in products if (p['product_NAME'], p['ven_ID']) not in existing]
+        if not new_products:
+            print('All generated products already exist. Nothing to insert.')
+            return 0, 0
+
+        # Insert products; their IDs come back through RETURNING ... INTO
+        id_map = insert_products(conn, new_products)
+
+        final_attrs = []
+        seen = set()
+        for a in attributes:
+            pid = id_map.get((a['product_NAME'], a['ven_ID']))
+            if pid and a.get('nominal') and (a['att_ID'], pid) not in seen:
+                seen.add((a['att_ID'], pid))
+                final_attrs.append({'product_ID': pid, 'att_ID': a['att_ID'], 'nominal': a['nominal']})
+
+        if final_attrs:
+            attr_sql = "INSERT INTO ProductAttributes (product_ID, att_ID, nominal) VALUES (:product_ID, :att_ID, :nominal)"
+            batch_insert(conn, attr_sql, final_attrs, commit_now=False, label='ProductAttributes')
+
+        conn.commit()
+        print(f"Inserted {len(new_products)} {label} and {len(final_attrs)} attributes.")
+        return len(new_products), len(final_attrs)
+
+    except Exception as e:
+        if conn:
+            conn.rollback()
+        print(f"Error inserting {label}. Rolled back. Details: {e}")
+        raise
+    finally:
+        if conn:
+            conn.close()
+
+
+def generate_catalog(make_fn: Callable[..., Iterator[ProductWithAttributes]],
+                     vendors_map: Dict[str, int], categories_map: Dict[str, int], attributes_map: Dict[str, int],
+                     progress: Optional[ProgressCallback] = None, writer: Optional[TableWriter] = None,
+                     batch_size: int = 100, label: str = 'products') -> Tuple[int, int]:
+    """
+    Generates and inserts a catalog. make_fn(vendors_map, categories_map, attributes_map)
+    streams products with their attributes attached; they are flushed in chunks of
+    batch_size, so memory stays bounded by the chunk rather than the catalog size.
+    progress(products, attributes) is called after every chunk. With a writer (e.g. a
+    FlatFileExporter) chunks go there instead of insert_catalog().
+    Returns (products, attributes) generated.
+    """
+    total_products = total_attrs = 0
+    for chunk in chunked(make_fn(vendors_map, categories_map, attributes_map), batch_size):
+        chunk_products = [p for p, _ in chunk]
+        attrs_chunk = [a for _, attrs in chunk for a in attrs]
+        if writer is None:
+            insert_catalog(chunk_products, attrs_chunk, label)
+        else:
+            write_products(writer, chunk_products, attrs_chunk)
+        total_products += len(chunk_products)
+        total_attrs += len(attrs_chunk)
+        if progress:
+            progress(len(chunk_products), len(attrs_chunk))
+    return total_products, total_attrs
+
+
+def run_catalog_generator(title: str, export_name: str, generate: Callable[..., Tuple[int, int]],
+                          has_category: Callable[[Dict[str, int]], Any], missing_category: str):
+    """
+    Standalone entry point of a catalog generator: loads the ID maps, checks the
+    generator's category, runs generate() against the database or, with DATA_OUTPUT set,
+    into export files under export_name.
+    """
+    print(f'--- {title} Data Generator ---')
+    vendors_map = load_id_map('vendors')
+    categories_map = load_id_map('categories')
+    attributes_map = load_id_map('attributes')
+    if not vendors_map or not categories_map or not attributes_map:
+        print('ID maps missing. Re-run 01_populate_base_entities.py')
+        return
+
+    if not has_category(categories_map):
+        print(missing_category)
+        return
+
+    exporter = open_exporter(export_name) if output_mode() != 'db' else None
+    try:
+        total_products, total_attrs = generate(vendors_map, categories_map, attributes_map, writer=exporter)
+    finally:
+        if exporter:
+            exporter.close()
+    print(f'Generated {total_products} products and {total_attrs} attributes.')
+
+    print(f'--- {title} Generation finished ---')
+
+
+# --- Generated ID registry ---
+# IDs handed from one script to the next (vendors, categories, attributes, users, status
+# maps) live in one SQLite file instead of an indented JSON file per entity. IDs are stored
+# in blocks of ID_BLOCK_SIZE as zlib-compressed int64 deltas (consecutive IDs take a few
+# bytes per block), so an entity can be streamed block by block, sampled at random by
+# position without loading it whole, and appended to. A legacy generated_ids/<entity>.json
+# is imported the first time its entity is read.
+IDS_DIR = os.path.join(os.path.dirname(__file__), 'generated_ids')
+REGISTRY_PATH = os.path.join(IDS_DIR, 'registry.sqlite3')
+ID_BLOCK_SIZE = 8192
+# kind: 'ids' (plain IDs), 'named' ({'id', 'name'} records; names in entity_names) or
+# 'document' (any other JSON value, kept whole)
+_REGISTRY_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entities ("
+    " entity_key INTEGER PRIMARY KEY, entity TEXT NOT NULL UNIQUE, kind TEXT NOT NULL,"
+    " count INTEGER NOT NULL, document TEXT)",
+    "CREATE TABLE IF NOT EXISTS id_blocks ("
+    " entity_key INTEGER NOT NULL, block INTEGER NOT NULL, data BLOB NOT NULL,"
+    " PRIMARY KEY (entity_key, block)) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS entity_names ("
+    " entity_key INTEGER NOT NULL, seq INTEGER NOT NULL, name TEXT NOT NULL,"
+    " PRIMARY KEY (entity_key, seq)) WITHOUT ROWID",
+)
+
+
+@contextmanager
+def _registry() -> Iterator[sqlite3.Connection]:
+    """A short-lived connection per operation, so forked worker processes never share one."""
+    os.makedirs(IDS_DIR, exist_ok=True)
+    conn = sqlite3.connect(REGISTRY_PATH, timeout=30)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        for statement in _REGISTRY_SCHEMA:
+            conn.execute(statement)
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _pack_ids(ids: List[int]) -> bytes:
+    deltas = array('q', [ids[0]] + [b - a for a, b in zip(ids, ids[1:])])
+    return zlib.compress(deltas.tobytes())
+
+
+def _unpack_ids(data: bytes) -> List[int]:
+    deltas = array('q')
+    deltas.frombytes(zlib.decompress(data))
+    return list(accumulate(deltas))
+
+
+def _record_kind(item: Any) -> str:
+    if isinstance(item, int) and not isinstance(item, bool):
+        return 'ids'
+    if isinstance(item, dict) and set(item) == {'id', 'name'}:
+        return 'named'
+    return 'document'
+
+
+def _store(conn: sqlite3.Connection, entity_name: str, ids: Any, append: bool) -> int:
+    """Writes a list/iterable of IDs or records (or any JSON value) and returns the number written."""
+    current = conn.execute("SELECT entity_key, kind, count FROM entities WHERE entity = ?", (entity_name,)).fetchone()
+    if current and not append:
+        for table in ('id_blocks', 'entity_names', 'entities'):
+            conn.execute(f"DELETE FROM {table} WHERE entity_key = ?", (current[0],))
+        current = None
+
+    items: Iterator[Any] = iter(())
+    if isinstance(ids, (dict, str)):
+        kind = 'document'
+    else:
+        items = iter(ids)
+        first = next(items, None)
+        kind = _record_kind(first) if first is not None else (current[1] if current else 'ids')
+        if first is not None:
+            items = chain([first], items)
+    if current and (current[1] == 'document' or current[1] != kind):
+        raise ValueError(f"Cannot append {kind} records to '{entity_name}' (stored as {current[1]})")
+
+    if kind == 'document':
+        value = ids if isinstance(ids, (dict, str)) else list(items)
+        conn.execute("INSERT INTO entities (entity, kind, count, document) VALUES (?, 'document', ?, ?)",
+                     (entity_name, len(value), json.dumps(value)))
+        return len(value)
+
+    if current:
+        key, start = current[0], current[2]
+    else:
+        key, start = conn.execute("INSERT INTO entities (entity, kind, count) VALUES (?, ?, 0)",
+                                  (entity_name, kind)).lastrowid, 0
+    # An append first fills up the entity's last, partial block
+    block, offset = divmod(start, ID_BLOCK_SIZE)
+    buffer: List[int] = []
+    if offset:
+        buffer = _unpack_ids(conn.execute("SELECT data FROM id_blocks WHERE entity_key = ? AND block = ?",
+                                          (key, block)).fetchone()[0])
+    names: List[Tuple[int, int, str]] = []
+    seq = start
+    for item in items:
+        if kind == 'ids':
+            buffer.append(int(item))
+        else:
+            buffer.append(int(item['id']))
+            names.append((key, seq, item['name']))
+        seq += 1
+        if len(buffer) == ID_BLOCK_SIZE:
+            conn.execute("INSERT OR REPLACE INTO id_blocks VALUES (?, ?, ?)", (key, block, _pack_ids(buffer)))
+            conn.executemany("INSERT INTO entity_names VALUES (?, ?, ?)", names)
+            block, buffer, names = block + 1, [], []
+    if buffer:
+        conn.execute("INSERT OR REPLACE INTO id_blocks VALUES (?, ?, ?)", (key, block, _pack_ids(buffer)))
+        conn.executemany("INSERT INTO entity_names VALUES (?, ?, ?)", names)
+    conn.execute("UPDATE entities SET count = ? WHERE entity_key = ?", (seq, key))
+    return seq - start
+
+
+def _entity(conn: sqlite3.Connection, entity_name: str) -> Optional[Tuple[int, str, int, Optional[str]]]:
+    """(entity_key, kind, count, document) of an entity, importing its legacy JSON file if needed."""
+    sql = "SELECT entity_key, kind, count, document FROM entities WHERE entity = ?"
+    row = conn.execute(sql, (entity_name,)).fetchone()
+    legacy = os.path.join(IDS_DIR, f'{entity_name}.json')
+    if row is None and os.path.exists(legacy):
+        with open(legacy, 'r') as f:
+            _store(conn, entity_name, json.load(f), append=False)
+        print(f"Imported {legacy} into {REGISTRY_PATH}")
+        row = conn.execute(sql, (entity_name,)).fetchone()
+    return row
+
+
+def _id_entity(conn: sqlite3.Connection, entity_name: str) -> Optional[Tuple[int, str, int, Optional[str]]]:
+    row = _entity(conn, entity_name)
+    if row is not None and row[1] == 'document':
+        raise ValueError(f"'{entity_name}' is a JSON document, not a list of IDs")
+    return row
+
+
+def _iter_blocks(conn: sqlite3.Connection, key: int) -> Iterator[List[int]]:
+    cursor = conn.execute("SELECT data FROM id_blocks WHERE entity_key = ? ORDER BY block", (key,))
+    for (data,) in cursor:
+        yield _unpack_ids(data)
+
+
+def save_ids(entity_name: str, ids: Union[Iterable[Any], Dict[str, Any]]):
+    """
+    Replaces an entity's saved IDs. ids may be any iterable (e.g. a generator over a cursor)
+    of IDs or {'id', 'name'} records, which is written block by block, or any JSON value.
+    """
+    with _registry() as conn:
+        count = _store(conn, entity_name, ids, append=False)
+    print(f"Saved {count} records of '{entity_name}' to {REGISTRY_PATH}")
+
+
+def append_ids(entity_name: str, ids: Iterable[Any]) -> int:
+    """Appends IDs or records of the kind already saved for the entity. Returns the number appended."""
+    with _registry() as conn:
+        return _store(conn, entity_name, ids, append=True)
+
+
+def load_ids(entity_name: str):
+    """Loads an entity in the shape it was saved in (a list of IDs or records, or a JSON value)."""
+    with _registry() as conn:
+        row = _entity(conn, entity_name)
+        if row is None:
+            print(f"Error: no '{entity_name}' IDs in {REGISTRY_PATH}. Please run the prerequisite script.")
+            return []
+        key, kind, count, document = row
+        if kind == 'document':
+            data = json.loads(document)
+        else:
+            data = [i for ids in _iter_blocks(conn, key) for i in ids]
+            if kind == 'named':
+                names = conn.execute("SELECT name FROM entity_names WHERE entity_key = ? ORDER BY seq", (key,))
+                data = [{'id': i, 'name': name} for i, (name,) in zip(data, names)]
+    print(f"Loaded {count} records of '{entity_name}' from {REGISTRY_PATH}")
+    return data
+
+
+def load_id_map(entity_name: str) -> Dict[str, int]:
+    """{name: id} of a named entity (vendors, categories, attributes); empty if missing."""
+    with _registry() as conn:
+        row = _entity(conn, entity_name)
+        if row is None or row[1] != 'named':
+            return {}
+        ids = [i for block in _iter_blocks(conn, row[0]) for i in block]
+        names = conn.execute("SELECT name FROM entity_names WHERE entity_key = ? ORDER BY seq", (row[0],))
+        return {name: i for i, (name,) in zip(ids, names)}
+
+
+def count_ids(entity_name: str) -> int:
+    with _registry() as conn:
+        row = _entity(conn, entity_name)
+    return row[2] if row else 0
+
+
+def iter_ids(entity_name: str) -> Iterator[int]:
+    """Streams an entity's IDs in saved order, one block in memory at a time."""
+    with _registry() as conn:
+        row = _id_entity(conn, entity_name)
+        if row is not None:
+            for block in _iter_blocks(conn, row[0]):
+                yield from block
+
+
+def sample_ids(entity_name: str, k: int, rng: random.Random = random) -> List[int]:
+    """k distinct IDs of an entity chosen at random (fewer if it has fewer); reads only the blocks hit."""
+    with _registry() as conn:
+        row = _id_entity(conn, entity_name)
+        if row is None:
+            return []
+        positions = rng.sample(range(row[2]), k=min(k, row[2]))
+        blocks: Dict[int, List[int]] = {}
+        for block in sorted({p // ID_BLOCK_SIZE for p in positions}):
+            data = conn.execute("SELECT data FROM id_blocks WHERE entity_key = ? AND block = ?",
+                                (row[0], block)).fetchone()[0]
+            blocks[block] = _unpack_ids(data)
+    return [blocks[p // ID_BLOCK_SIZE][p % ID_BLOCK_SIZE] for p in positions]
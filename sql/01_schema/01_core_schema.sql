@@ -225,6 +225,35 @@ CREATE TABLE dbo.Payments (
 );
 GO
 
+-- Refund Items Table: Order lines returned by a line-item refund (one row per refund payment and product)
+CREATE TABLE dbo.RefundItems (
+    payment_ID INT NOT NULL,
+    order_ID INT NOT NULL,
+    product_ID INT NOT NULL,
+    quantity INT NOT NULL CHECK (quantity > 0),
+    CONSTRAINT PK_RefundItems PRIMARY KEY (payment_ID, product_ID),
+    CONSTRAINT FK_RefundItems_Payments FOREIGN KEY (payment_ID) REFERENCES dbo.Payments(payment_ID) ON DELETE CASCADE,
+    CONSTRAINT FK_RefundItems_Orders FOREIGN KEY (order_ID) REFERENCES dbo.Orders(order_ID) ON DELETE NO ACTION
+);
+GO
+
+-- Quantity already refunded per order line
+CREATE NONCLUSTERED INDEX IX_RefundItems_Order_Product ON dbo.RefundItems(order_ID, product_ID) INCLUDE (quantity);
+GO
+
+-- Settlement Staging Table: Transaction IDs of a PSP settlement file being reconciled (one run per file, removed afterwards)
+CREATE TABLE dbo.SettlementStaging (
+    run_ID NCHAR(32) NOT NULL,
+    transaction_ID NVARCHAR(100) NOT NULL,
+    chunk_NO INT NOT NULL,
+    CONSTRAINT PK_SettlementStaging PRIMARY KEY (run_ID, transaction_ID, chunk_NO)
+);
+GO
+
+-- Lines of one chunk of a run
+CREATE NONCLUSTERED INDEX IX_SettlementStaging_Run_Chunk ON dbo.SettlementStaging(run_ID, chunk_NO) INCLUDE (transaction_ID);
+GO
+
 -- Reviews Table: Stores user reviews for products
 CREATE TABLE dbo.Review (
     rew_ID INT IDENTITY(1,1) PRIMARY KEY,
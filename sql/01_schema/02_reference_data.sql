@@ -120,5 +120,31 @@ VALUES
 ('Returned', N'Возвращен', N'Заказ был возвращен на склад.', N'Returned', N'The order has been returned to the warehouse.', 70);
 GO
 
+-- =====================================================================
+-- Exchange Rates
+-- =====================================================================
+-- Time-versioned rates: a row is valid from valid_FROM until the next row
+-- for the same currency. Loaded into memory by apps/payments/currency.py.
+IF OBJECT_ID('dbo.ExchangeRates', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.ExchangeRates (
+        currency NCHAR(3) NOT NULL,
+        valid_FROM DATE NOT NULL,
+        rate_TO_BASE DECIMAL(18,8) NOT NULL,        -- Units of the base currency (USD) per unit of currency
+        CONSTRAINT PK_ExchangeRates PRIMARY KEY (currency, valid_FROM),
+        CONSTRAINT CHK_ExchangeRates_Rate CHECK (rate_TO_BASE > 0)
+    );
+
+    PRINT 'ExchangeRates table created successfully.';
+END
+ELSE
+    PRINT 'ExchangeRates table already exists.';
+GO
+
+IF NOT EXISTS (SELECT 1 FROM dbo.ExchangeRates WHERE currency = 'USD' AND valid_FROM = '2000-01-01')
+    INSERT INTO dbo.ExchangeRates (currency, valid_FROM, rate_TO_BASE)
+    VALUES ('USD', '2000-01-01', 1.0);
+GO
+
 PRINT 'Reference tables created and populated successfully.';
 GO
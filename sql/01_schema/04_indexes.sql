@@ -30,6 +30,8 @@ CREATE INDEX IX_Orders_UserID ON dbo.Orders(user_ID);
 CREATE INDEX IX_Orders_OrderStatusID ON dbo.Orders(order_STATUS_ID);
 CREATE INDEX IX_Orders_DeliveryStatusID ON dbo.Orders(delivery_STATUS_ID);
 CREATE INDEX IX_Orders_Status_Date_New ON dbo.Orders(order_STATUS_ID, order_DATE);
+-- Carrier event ingest looks orders up by tracking number (apps/orders/delivery.py)
+CREATE INDEX IX_Orders_TrackingNumber ON dbo.Orders(tracking_NUMBER) INCLUDE (delivery_STATUS_ID);
 
 -- OrderItems Indexes
 CREATE INDEX IX_OrderItems_OrderID ON dbo.OrderItems(order_ID);
@@ -44,6 +46,8 @@ CREATE INDEX IX_Payments_Status_Date_New ON dbo.Payments(payment_STATUS_ID, paym
 -- Review Indexes
 CREATE INDEX IX_Review_UserID ON dbo.Review(user_ID);
 CREATE INDEX IX_Review_ProductID ON dbo.Review(product_ID);
+-- Keyset-paginated review lists per product (apps/products/reviews.py)
+CREATE INDEX IX_Review_Product_Date ON dbo.Review(product_ID, rew_DATE DESC, rew_ID DESC) INCLUDE (user_ID, rew_RATING);
 
 -- Wishlist Indexes
 CREATE INDEX IX_Wishlist_UserID_DateAdded ON dbo.Wishlist(user_ID, added_AT);
@@ -0,0 +1,170 @@
+-- =====================================================================
+-- WinStore - Read Models
+-- =====================================================================
+-- Description: Creates denormalized read model tables that are maintained
+--              by the application layer on each write (no triggers).
+--              Dashboards and Directus lists read these narrow tables
+--              instead of joining the normalized schema at query time.
+-- Author:      WinStore Development Team
+-- Created:     2026-10-19
+-- Modified:    2026-10-19
+-- Version:     1.4.0
+-- =====================================================================
+-- Dependencies: 01_core_schema.sql, 02_reference_data.sql
+-- =====================================================================
+
+USE WinStore
+GO
+
+-- =====================================================================
+-- Order Summary Read Model
+-- =====================================================================
+-- One row per order; rewritten by OrderSummaryService (apps/orders/services.py)
+-- whenever the order, its items or its payments change.
+IF OBJECT_ID('dbo.OrderSummary', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.OrderSummary (
+        order_ID INT NOT NULL PRIMARY KEY,
+        user_ID INT NOT NULL,
+        order_DATE DATETIME NULL,
+        order_STATUS_ID INT NULL,
+        delivery_STATUS_ID INT NULL,
+        payment_STATUS_ID INT NULL,             -- Status of the latest non-refund payment
+        order_AMOUNT DECIMAL(10,2) NOT NULL,
+        promo_SAVINGS DECIMAL(10,2) NOT NULL DEFAULT 0,
+        paid_AMOUNT DECIMAL(10,2) NOT NULL DEFAULT 0,
+        refunded_AMOUNT DECIMAL(10,2) NOT NULL DEFAULT 0,
+        item_COUNT INT NOT NULL DEFAULT 0,
+        total_QUANTITY INT NOT NULL DEFAULT 0,
+        updated_AT DATETIME NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT FK_OrderSummary_Orders FOREIGN KEY (order_ID) REFERENCES dbo.Orders(order_ID) ON DELETE CASCADE
+    );
+
+    -- Dashboard list: filter by status, newest first
+    CREATE NONCLUSTERED INDEX IX_OrderSummary_Status_Date
+    ON dbo.OrderSummary(order_STATUS_ID, order_DATE DESC)
+    INCLUDE (user_ID, payment_STATUS_ID, delivery_STATUS_ID, order_AMOUNT, item_COUNT);
+
+    -- Customer order history
+    CREATE NONCLUSTERED INDEX IX_OrderSummary_User_Date
+    ON dbo.OrderSummary(user_ID, order_DATE DESC)
+    INCLUDE (order_STATUS_ID, payment_STATUS_ID, order_AMOUNT, item_COUNT);
+
+    PRINT 'OrderSummary table created successfully.';
+END
+ELSE
+    PRINT 'OrderSummary table already exists.';
+GO
+
+-- =====================================================================
+-- Payment Rollup
+-- =====================================================================
+-- Payment counts and totals per hour, method, status and currency.
+-- Maintained incrementally by PaymentRollupService (apps/payments/rollups.py)
+-- on every payment insert and status change; daily totals sum 24 rows.
+IF OBJECT_ID('dbo.PaymentRollup', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.PaymentRollup (
+        bucket_DATE DATE NOT NULL,
+        bucket_HOUR TINYINT NOT NULL,
+        payment_METHOD NVARCHAR(50) NOT NULL,
+        payment_STATUS_ID INT NOT NULL,
+        currency NCHAR(3) NOT NULL,
+        payment_COUNT INT NOT NULL DEFAULT 0,
+        total_AMOUNT DECIMAL(18,2) NOT NULL DEFAULT 0,
+        updated_AT DATETIME NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT PK_PaymentRollup PRIMARY KEY (bucket_DATE, bucket_HOUR, payment_METHOD, payment_STATUS_ID, currency)
+    );
+
+    PRINT 'PaymentRollup table created successfully.';
+END
+ELSE
+    PRINT 'PaymentRollup table already exists.';
+GO
+
+-- =====================================================================
+-- Product Wishlist Counters
+-- =====================================================================
+-- Number of wishlists containing each product; adjusted by WishlistService
+-- (apps/promotions/services.py) on every add/remove.
+IF OBJECT_ID('dbo.ProductWishlistCounts', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.ProductWishlistCounts (
+        product_ID INT NOT NULL PRIMARY KEY,
+        wishlist_COUNT INT NOT NULL DEFAULT 0,
+        updated_AT DATETIME NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT FK_ProductWishlistCounts_Products FOREIGN KEY (product_ID) REFERENCES dbo.Products(product_ID) ON DELETE CASCADE
+    );
+
+    -- "Most wishlisted" merchandising lists
+    CREATE NONCLUSTERED INDEX IX_ProductWishlistCounts_Count
+    ON dbo.ProductWishlistCounts(wishlist_COUNT DESC, product_ID);
+
+    PRINT 'ProductWishlistCounts table created successfully.';
+END
+ELSE
+    PRINT 'ProductWishlistCounts table already exists.';
+GO
+
+-- =====================================================================
+-- Product Rating Summary
+-- =====================================================================
+-- Review count, rating sum and 1-5 histogram per product; adjusted by
+-- ReviewService (apps/products/reviews.py) on every review upsert.
+IF OBJECT_ID('dbo.ProductRatingSummary', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.ProductRatingSummary (
+        product_ID INT NOT NULL PRIMARY KEY,
+        review_COUNT INT NOT NULL DEFAULT 0,
+        rating_SUM INT NOT NULL DEFAULT 0,
+        rating_1 INT NOT NULL DEFAULT 0,
+        rating_2 INT NOT NULL DEFAULT 0,
+        rating_3 INT NOT NULL DEFAULT 0,
+        rating_4 INT NOT NULL DEFAULT 0,
+        rating_5 INT NOT NULL DEFAULT 0,
+        updated_AT DATETIME NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT FK_ProductRatingSummary_Products FOREIGN KEY (product_ID) REFERENCES dbo.Products(product_ID) ON DELETE CASCADE
+    );
+
+    PRINT 'ProductRatingSummary table created successfully.';
+END
+ELSE
+    PRINT 'ProductRatingSummary table already exists.';
+GO
+
+-- =====================================================================
+-- Customer Segments
+-- =====================================================================
+-- Nightly RFM scores, segment and loyalty tier per user; rewritten in full
+-- by CustomerSegmentService (apps/accounts/segments.py).
+IF OBJECT_ID('dbo.CustomerSegments', 'U') IS NULL
+BEGIN
+    CREATE TABLE dbo.CustomerSegments (
+        user_ID INT NOT NULL PRIMARY KEY,
+        last_order_DATE DATETIME NULL,
+        recency_DAYS INT NULL,
+        order_COUNT INT NOT NULL DEFAULT 0,
+        total_SPENT DECIMAL(14, 2) NOT NULL DEFAULT 0,
+        r_SCORE SMALLINT NOT NULL DEFAULT 0,
+        f_SCORE SMALLINT NOT NULL DEFAULT 0,
+        m_SCORE SMALLINT NOT NULL DEFAULT 0,
+        rfm_SEGMENT NVARCHAR(30) NOT NULL,
+        loyalty_TIER NVARCHAR(20) NOT NULL,
+        is_DORMANT BIT NOT NULL DEFAULT 0,
+        computed_AT DATETIME NOT NULL DEFAULT GETDATE(),
+        CONSTRAINT FK_CustomerSegments_Users FOREIGN KEY (user_ID) REFERENCES dbo.Users(user_ID) ON DELETE CASCADE
+    );
+
+    -- Marketing audience lists by segment and tier
+    CREATE NONCLUSTERED INDEX IX_CustomerSegments_Segment
+    ON dbo.CustomerSegments(rfm_SEGMENT, loyalty_TIER)
+    INCLUDE (recency_DAYS, total_SPENT);
+
+    PRINT 'CustomerSegments table created successfully.';
+END
+ELSE
+    PRINT 'CustomerSegments table already exists.';
+GO
+
+PRINT 'Read model tables created successfully.';
+GO
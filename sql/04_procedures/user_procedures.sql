@@ -190,38 +190,31 @@ BEGIN
     BEGIN TRY
         BEGIN TRANSACTION;
 
-        IF EXISTS (
-            SELECT 1 FROM dbo.Review
-            WHERE user_ID = @UserID AND product_ID = @ProductID
-        )
-        BEGIN
-            UPDATE dbo.Review
-            SET
+        -- Single upsert; OUTPUT hands back the review ID for the audit record
+        DECLARE @Merged TABLE (rew_ID INT, merge_action NVARCHAR(10));
+
+        MERGE dbo.Review WITH (HOLDLOCK) AS t
+        USING (SELECT @UserID AS user_ID, @ProductID AS product_ID) AS s
+            ON t.user_ID = s.user_ID AND t.product_ID = s.product_ID
+        WHEN MATCHED THEN
+            UPDATE SET
                 rew_RATING  = @Rating,
                 rew_COMMENT = @Comment,
                 rew_DATE    = GETDATE()
-            WHERE
-                user_ID    = @UserID
-                AND product_ID = @ProductID;
+        WHEN NOT MATCHED THEN
+            INSERT (user_ID, product_ID, rew_RATING, rew_COMMENT, rew_DATE)
+            VALUES (@UserID, @ProductID, @Rating, @Comment, GETDATE())
+        OUTPUT inserted.rew_ID, $action INTO @Merged;
 
-            SELECT 'Review updated successfully' AS Result;
-        END
-        ELSE
-        BEGIN
-            INSERT INTO dbo.Review
-                (user_ID, product_ID, rew_RATING, rew_COMMENT, rew_DATE)
-            VALUES
-                (@UserID, @ProductID, @Rating, @Comment, GETDATE());
-
-            SELECT 'Review added successfully' AS Result;
-        END;
+        SELECT CASE merge_action
+                   WHEN 'INSERT' THEN 'Review added successfully'
+                   ELSE 'Review updated successfully'
+               END AS Result
+        FROM @Merged;
 
         -- Audit
         DECLARE @AuditReviewID NVARCHAR(50) =
-            CAST((SELECT TOP 1 rew_ID
-                  FROM dbo.Review
-                  WHERE user_ID = @UserID AND product_ID = @ProductID)
-                 AS NVARCHAR(50));
+            (SELECT CAST(rew_ID AS NVARCHAR(50)) FROM @Merged);
 
         EXEC dbo.sp_LogBusinessAuditEvent
             @UserID          = @UserID,
@@ -45,6 +45,10 @@ BEGIN TRY
     :r $(SCRIPTS_DIR)/01_schema/04_indexes.sql
     PRINT 'Completed: 01_schema/04_indexes.sql';
     
+    PRINT 'Executing: 01_schema/05_read_models.sql';
+    :r $(SCRIPTS_DIR)/01_schema/05_read_models.sql
+    PRINT 'Completed: 01_schema/05_read_models.sql';
+    
     -- =====================================================================
     -- 02_audit - Audit configuration
     -- =====================================================================